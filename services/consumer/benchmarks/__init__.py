@@ -0,0 +1 @@
+# Offline benchmarks for the enrichment pipeline
\ No newline at end of file
@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+class InMemoryConnection:
+    """Stand-in for an asyncpg connection that keeps rows in memory"""
+    
+    def __init__(self, pool: 'InMemoryPool'):
+        self.pool = pool
+    
+    async def execute(self, query: str, *args) -> str:
+        return 'OK'
+    
+    async def executemany(self, query: str, rows: Sequence[Tuple[Any, ...]]):
+        table = query.split()[2]
+        self.pool.tables.setdefault(table, []).extend(rows)
+    
+    async def copy_records_to_table(self, table: str, records: Sequence[Tuple[Any, ...]], columns=None):
+        self.pool.tables.setdefault(table, []).extend(records)
+    
+    async def fetch(self, query: str, *args) -> List[Any]:
+        return []
+
+class _Acquire:
+    def __init__(self, pool: 'InMemoryPool'):
+        self.pool = pool
+    
+    async def __aenter__(self) -> InMemoryConnection:
+        return InMemoryConnection(self.pool)
+    
+    async def __aexit__(self, *exc):
+        return False
+
+class InMemoryPool:
+    """Stand-in for an asyncpg pool"""
+    
+    def __init__(self):
+        self.tables: Dict[str, List[Tuple[Any, ...]]] = {}
+    
+    def acquire(self) -> _Acquire:
+        return _Acquire(self)
+    
+    async def close(self):
+        pass
+
+class InMemoryCollection:
+    """Stand-in for a Motor collection"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.documents: List[Dict[str, Any]] = []
+    
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True):
+        self.documents.extend(documents)
+    
+    async def insert_one(self, document: Dict[str, Any]):
+        self.documents.append(document)
+
+class InMemoryProducer:
+    """Stand-in for an AIOKafkaProducer"""
+    
+    def __init__(self):
+        self.sent = 0
+        self.bytes = 0
+    
+    async def send(self, topic: str, value: bytes = None, key: bytes = None, headers=None, **kwargs):
+        self.sent += 1
+        self.bytes += len(value or b'')
+    
+    async def stop(self):
+        pass
@@ -0,0 +1,237 @@
+"""Offline throughput and latency benchmark for EventConsumer.process_social_event.
+
+Runs synthetic events through the real processors with in-memory stand-ins
+for Kafka, asyncpg and Motor, and reports throughput plus per-stage latency
+and allocations. Run from services/consumer:
+    
+    python -m benchmarks.run --events 20000
+    python -m benchmarks.run --json bench.json
+    python -m benchmarks.run --compare bench.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from .fakes import InMemoryCollection, InMemoryPool, InMemoryProducer
+from .synthetic import SyntheticEventGenerator
+
+STAGES = [
+    'decode', 'social_processing', 'content_analysis', 'signal_extraction',
+    'pg_write', 'mongo_write', 'publish', 'pg_flush', 'mongo_flush'
+]
+
+class StageRecorder:
+    """Collects per-call latencies and allocation peaks for each stage"""
+    
+    def __init__(self, track_allocations: bool = False):
+        self.track_allocations = track_allocations
+        self.latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.allocations: Dict[str, List[int]] = {stage: [] for stage in STAGES}
+        self.enabled = False
+    
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def timed(*args, **kwargs):
+            if not self.enabled:
+                return await func(*args, **kwargs)
+            
+            if self.track_allocations:
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.latencies[stage].append(time.perf_counter() - start)
+                if self.track_allocations:
+                    self.allocations[stage].append(tracemalloc.get_traced_memory()[1] - baseline)
+        return timed
+    
+    def record(self, stage: str, func: Callable, *args):
+        """Time a synchronous call"""
+        if not self.enabled:
+            return func(*args)
+        start = time.perf_counter()
+        result = func(*args)
+        self.latencies[stage].append(time.perf_counter() - start)
+        return result
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+def build_consumer(recorder: StageRecorder, use_cache: bool):
+    # Keep the benchmark independent of local .env files
+    os.environ.setdefault('ANALYSIS_EXECUTOR', 'inline')
+    from src.consumer import EventConsumer
+    from src.sinks.mongo_sink import MongoBulkWriter
+    
+    consumer = EventConsumer()
+    consumer.use_mongo = True
+    consumer.pg_pool = InMemoryPool()
+    consumer.producer = InMemoryProducer()
+    if not use_cache:
+        consumer.analysis_cache = None
+    
+    consumer.social_writer = consumer._create_event_writer()
+    consumer.chat_writer = consumer._create_writer(
+        'chat_memory', ('creator_id', 'ts', 'role', 'content')
+    )
+    consumer.interaction_writer = MongoBulkWriter(InMemoryCollection('interactions'))
+    consumer.interaction_writer.start()
+    consumer.writers.append(consumer.interaction_writer)
+    
+    consumer.social_processor.process_with_content = recorder.wrap(
+        'social_processing', consumer.social_processor.process_with_content
+    )
+    consumer.content_analyzer.analyze = recorder.wrap('content_analysis', consumer.content_analyzer.analyze)
+    consumer.signal_extractor.extract = recorder.wrap('signal_extraction', consumer.signal_extractor.extract)
+    consumer.social_writer.add = recorder.wrap('pg_write', consumer.social_writer.add)
+    consumer.interaction_writer.add = recorder.wrap('mongo_write', consumer.interaction_writer.add)
+    consumer.producer.send = recorder.wrap('publish', consumer.producer.send)
+    consumer.social_writer._write = recorder.wrap('pg_flush', consumer.social_writer._write)
+    consumer.interaction_writer._write = recorder.wrap('mongo_flush', consumer.interaction_writer._write)
+    return consumer
+
+async def run_benchmark(events: int, warmup: int, seed: int, repeat_ratio: float,
+                        use_cache: bool, track_allocations: bool) -> Dict[str, Any]:
+    recorder = StageRecorder(track_allocations)
+    consumer = build_consumer(recorder, use_cache)
+    generator = SyntheticEventGenerator(seed=seed, repeat_ratio=repeat_ratio)
+    
+    # Pre-encode so decoding is measured but generation is not
+    messages = [consumer.codec.encode(event) for event in generator.events(warmup + events)]
+    
+    async def process(encoded):
+        value, headers = encoded
+        event = recorder.record('decode', consumer.codec.decode, value, headers)
+        await consumer.process_social_event(event)
+    
+    for encoded in messages[:warmup]:
+        await process(encoded)
+    await consumer.flush_writers()
+    
+    if track_allocations:
+        tracemalloc.start()
+    recorder.enabled = True
+    
+    start = time.perf_counter()
+    for encoded in messages[warmup:]:
+        await process(encoded)
+    await consumer.flush_writers()
+    elapsed = time.perf_counter() - start
+    
+    recorder.enabled = False
+    if track_allocations:
+        tracemalloc.stop()
+    for writer in consumer.writers:
+        await writer.close()
+    
+    stages = {}
+    for stage in STAGES:
+        latencies = recorder.latencies[stage]
+        if not latencies:
+            continue
+        stages[stage] = {
+            'calls': len(latencies),
+            'p50_us': percentile(latencies, 0.50) * 1e6,
+            'p99_us': percentile(latencies, 0.99) * 1e6,
+            'total_ms': sum(latencies) * 1e3
+        }
+        allocations = recorder.allocations[stage]
+        if allocations:
+            stages[stage]['alloc_peak_bytes_avg'] = sum(allocations) / len(allocations)
+    
+    return {
+        'events': events,
+        'seed': seed,
+        'repeat_ratio': repeat_ratio,
+        'analysis_cache': use_cache,
+        'python': sys.version.split()[0],
+        'elapsed_s': elapsed,
+        'events_per_s': events / elapsed if elapsed else 0.0,
+        'cache': consumer.analysis_cache.stats() if consumer.analysis_cache else None,
+        'stages': stages
+    }
+
+def print_report(result: Dict[str, Any]):
+    print(f"{result['events']} events in {result['elapsed_s']:.2f}s "
+          f"-> {result['events_per_s']:.0f} events/s (seed {result['seed']}, "
+          f"repeat ratio {result['repeat_ratio']}, cache {'on' if result['analysis_cache'] else 'off'})")
+    if result['cache']:
+        print(f"analysis cache hit rate {result['cache']['hit_rate']:.1%}")
+    
+    header = f"{'stage':<20}{'calls':>8}{'p50 us':>10}{'p99 us':>10}{'total ms':>11}"
+    track_allocations = any('alloc_peak_bytes_avg' in stage for stage in result['stages'].values())
+    if track_allocations:
+        header += f"{'alloc B/call':>14}"
+    print(header)
+    for name, stage in result['stages'].items():
+        line = (f"{name:<20}{stage['calls']:>8}{stage['p50_us']:>10.1f}"
+                f"{stage['p99_us']:>10.1f}{stage['total_ms']:>11.1f}")
+        if track_allocations:
+            line += f"{stage.get('alloc_peak_bytes_avg', 0):>14.0f}"
+        print(line)
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond tolerance relative to a saved baseline"""
+    regressions = []
+    if result['events_per_s'] < baseline['events_per_s'] * (1 - tolerance):
+        regressions.append(
+            f"throughput {result['events_per_s']:.0f}/s vs baseline {baseline['events_per_s']:.0f}/s"
+        )
+    for name, stage in result['stages'].items():
+        previous = baseline.get('stages', {}).get(name)
+        if previous and stage['p50_us'] > previous['p50_us'] * (1 + tolerance):
+            regressions.append(f"{name} p50 {stage['p50_us']:.1f}us vs baseline {previous['p50_us']:.1f}us")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--warmup', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat-ratio', type=float, default=0.6,
+                        help='share of events that are metric refreshes of earlier posts')
+    parser.add_argument('--no-cache', action='store_true', help='disable the analysis cache')
+    parser.add_argument('--allocations', action='store_true',
+                        help='track per-stage allocations with tracemalloc (slower)')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='baseline results file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args(argv)
+    
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    
+    result = asyncio.run(run_benchmark(
+        args.events, args.warmup, args.seed, args.repeat_ratio,
+        not args.no_cache, args.allocations
+    ))
+    print_report(result)
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
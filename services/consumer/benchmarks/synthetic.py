@@ -0,0 +1,140 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+WORDS = [
+    'the', 'a', 'this', 'my', 'your', 'new', 'today', 'just', 'so', 'really', 'check', 'out',
+    'video', 'post', 'day', 'week', 'time', 'life', 'story', 'morning', 'night', 'team', 'game',
+    'recipe', 'workout', 'trip', 'review', 'unboxing', 'tutorial', 'behind', 'scenes', 'drop',
+    'collab', 'live', 'stream', 'thanks', 'everyone', 'who', 'came', 'with', 'and', 'for', 'to',
+    'amazing', 'love', 'great', 'awesome', 'fantastic', 'bad', 'terrible', 'worst', 'okay', 'fine',
+    'click', 'share', 'comment', 'like', 'follow', 'subscribe', 'gift', 'holiday', 'valentine'
+]
+PROPER_NOUNS = ['New York', 'Los Angeles', 'Summer Vibes', 'Black Friday', 'World Cup', 'Paris', 'Tokyo']
+BRANDS = ['Nike', 'Apple', 'Google', 'Amazon', 'Microsoft', 'Coca-Cola', 'Pepsi']
+HASHTAGS = [
+    'ai', 'tech', 'fitness', 'wellness', 'travel', 'food', 'fashion', 'gaming', 'music', 'crypto',
+    'sustainability', 'beauty', 'diy', 'motivation', 'fyp', 'viral', 'ootd', 'photography'
+]
+EMOJIS = ['\U0001F600', '\U0001F602', '\U0001F60D', '\U0001F64C', '\U0001F62E']
+
+# Typical number of words in the text field of each platform
+TEXT_LENGTHS = {'twitter': (8, 40), 'youtube': (4, 12), 'instagram': (10, 60), 'tiktok': (4, 20)}
+
+class SyntheticEventGenerator:
+    """Deterministic generator of realistic social-events payloads.
+    
+    Produces events for every SocialProcessor handler with the field names
+    each platform uses. repeat_ratio is the share of events that re-send an
+    earlier post with updated metrics, which is what most production
+    traffic looks like.
+    """
+    
+    def __init__(self, seed: int = 42, creators: int = 500, repeat_ratio: float = 0.6,
+                 platforms: Optional[List[str]] = None, now: Optional[datetime] = None):
+        self.random = random.Random(seed)
+        self.creators = [f'creator-{i}' for i in range(creators)]
+        self.repeat_ratio = repeat_ratio
+        self.platforms = platforms or list(TEXT_LENGTHS)
+        self.now = now or datetime.utcnow()
+        self._posts: List[Dict[str, Any]] = []
+        self._next_id = 0
+    
+    def events(self, count: int) -> Iterator[Dict[str, Any]]:
+        for _ in range(count):
+            yield self.event()
+    
+    def event(self) -> Dict[str, Any]:
+        if self._posts and self.random.random() < self.repeat_ratio:
+            return self._refresh(self.random.choice(self._posts))
+        
+        platform = self.random.choice(self.platforms)
+        event = {
+            'creatorId': self.random.choice(self.creators),
+            'platform': platform,
+            'timestamp': (self.now - timedelta(minutes=self.random.randint(1, 72 * 60))).isoformat(),
+            'data': getattr(self, f'_{platform}_data')()
+        }
+        self._next_id += 1
+        event['data']['id'] = str(self._next_id)
+        
+        self._posts.append(event)
+        if len(self._posts) > 5000:
+            self._posts.pop(self.random.randrange(len(self._posts)))
+        return event
+    
+    def _refresh(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Same post with grown metrics"""
+        growth = 1 + self.random.random() * 0.2
+        data = {
+            key: int(value * growth) if isinstance(value, int) and key != 'duration' else value
+            for key, value in event['data'].items()
+        }
+        return {**event, 'data': data}
+    
+    def _text(self, platform: str) -> str:
+        low, high = TEXT_LENGTHS[platform]
+        words = [self.random.choice(WORDS) for _ in range(self.random.randint(low, high))]
+        
+        if self.random.random() < 0.3:
+            words.insert(self.random.randrange(len(words) + 1), self.random.choice(PROPER_NOUNS))
+        if self.random.random() < 0.2:
+            words.insert(self.random.randrange(len(words) + 1), self.random.choice(BRANDS))
+        if self.random.random() < 0.3:
+            words.append(f'@{self.random.choice(self.creators)}')
+        if self.random.random() < 0.15:
+            words.append(f'https://example.com/p/{self.random.randint(1, 10 ** 6)}')
+        if self.random.random() < 0.25:
+            words.append('?')
+        words.extend(self.random.choice(EMOJIS) for _ in range(self.random.choice([0, 0, 1, 2, 3])))
+        words.extend(f'#{tag}' for tag in self.random.sample(HASHTAGS, self.random.randint(0, 5)))
+        
+        return ' '.join(words)
+    
+    def _count(self, median: float) -> int:
+        return int(self.random.lognormvariate(0, 1.2) * median)
+    
+    def _twitter_data(self) -> Dict[str, Any]:
+        data = {
+            'text': self._text('twitter'),
+            'favorite_count': self._count(40),
+            'retweet_count': self._count(5),
+            'reply_count': self._count(3),
+            'quote_count': self._count(1),
+            'impression_count': self._count(2000)
+        }
+        if self.random.random() < 0.3:
+            data['video'] = {'duration_ms': self.random.randint(5000, 120000)}
+        return data
+    
+    def _youtube_data(self) -> Dict[str, Any]:
+        return {
+            'title': self._text('youtube'),
+            'description': self._text('instagram'),
+            'view_count': self._count(5000),
+            'like_count': self._count(200),
+            'comment_count': self._count(20),
+            'duration': self.random.randint(30, 3600),
+            'tags': self.random.sample(HASHTAGS, 3)
+        }
+    
+    def _instagram_data(self) -> Dict[str, Any]:
+        return {
+            'caption': self._text('instagram'),
+            'like_count': self._count(300),
+            'comment_count': self._count(15),
+            'saved_count': self._count(10),
+            'share_count': self._count(5),
+            'reach': self._count(4000),
+            'media_type': self.random.choice(['photo', 'video', 'carousel'])
+        }
+    
+    def _tiktok_data(self) -> Dict[str, Any]:
+        return {
+            'desc': self._text('tiktok'),
+            'play_count': self._count(10000),
+            'digg_count': self._count(800),
+            'share_count': self._count(40),
+            'comment_count': self._count(30),
+            'music': {'id': str(self.random.randint(1, 10 ** 6)), 'title': 'original sound'}
+        }
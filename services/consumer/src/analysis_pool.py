@@ -0,0 +1,180 @@
+import asyncio
+import copy
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple, Union
+from loguru import logger
+from .processors.content_analyzer import ContentAnalyzer
+from .processors.parsed_content import ParsedContent
+from .processors.signal_extractor import SignalExtractor
+from .records import EnrichedEvent, Signals
+
+AnalysisResult = Tuple[Optional[Dict[str, Any]], Signals]
+AnalysisJob = Tuple[EnrichedEvent, Optional[ParsedContent]]
+
+# Per-process analyzers, created once by the pool initializer
+_worker_analyzer: Optional[ContentAnalyzer] = None
+_worker_extractor: Optional[SignalExtractor] = None
+
+# Per-thread analyzers in thread mode; their caches and stream state are not thread-safe
+_thread_state = threading.local()
+
+def run_analysis_batch(content_analyzer: ContentAnalyzer, signal_extractor: SignalExtractor,
+                       batch: List[AnalysisJob]) -> List[Union[AnalysisResult, Exception]]:
+    """Analyze content and extract signals for a batch of enriched events.
+    
+    Returns one entry per event: its (analysis, signals), or the exception
+    it raised, so a bad event only fails itself. Signals are extracted for
+    the batch in one vectorized pass, falling back to one event at a time
+    if that pass fails. In process mode the events are copies; in thread
+    mode they are the caller's records, which are left alone so the caller
+    decides what analysis to keep.
+    """
+    results: List[Union[AnalysisResult, Exception, None]] = [None] * len(batch)
+    analyses = {}
+    jobs = []
+    for i, (enriched, parsed) in enumerate(batch):
+        try:
+            analysis = None
+            if enriched.content is not None:
+                analysis = content_analyzer.analyze_sync(enriched.content, parsed)
+                enriched = copy.copy(enriched)
+                enriched.analysis = analysis
+        except Exception as e:
+            results[i] = e
+            continue
+        analyses[i] = analysis
+        jobs.append((i, enriched, parsed))
+    
+    try:
+        signals = signal_extractor.extract_batch([(enriched, parsed) for _, enriched, parsed in jobs])
+        for (i, _, _), event_signals in zip(jobs, signals):
+            results[i] = (analyses[i], event_signals)
+    except Exception:
+        for i, enriched, parsed in jobs:
+            try:
+                results[i] = (analyses[i], signal_extractor.extract_sync(enriched, parsed))
+            except Exception as e:
+                results[i] = e
+    return results
+
+def _init_worker():
+    global _worker_analyzer, _worker_extractor
+    _worker_analyzer = ContentAnalyzer()
+    _worker_extractor = SignalExtractor()
+
+def _run_batch_in_worker(batch: List[AnalysisJob]) -> List[Union[AnalysisResult, Exception]]:
+    return run_analysis_batch(_worker_analyzer, _worker_extractor, batch)
+
+def _init_thread():
+    _thread_state.analyzer = ContentAnalyzer()
+    _thread_state.extractor = SignalExtractor()
+
+def _run_batch_in_thread(batch: List[AnalysisJob]) -> List[Union[AnalysisResult, Exception]]:
+    return run_analysis_batch(_thread_state.analyzer, _thread_state.extractor, batch)
+
+def is_free_threaded() -> bool:
+    """True on free-threaded (no-GIL) Python builds"""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+class AnalysisPool:
+    """Run ContentAnalyzer and SignalExtractor work outside the event loop.
+    
+    Submissions are collected into batches of up to batch_size events (or
+    whatever arrived within batch_wait seconds) and each batch is sent to the
+    pool as one task, which keeps IPC overhead per event low. mode is
+    'process', 'thread', or 'auto' (threads on free-threaded builds, where
+    they run in parallel, processes otherwise).
+    """
+    
+    def __init__(self, mode: str = 'auto', workers: Optional[int] = None,
+                 batch_size: int = 32, batch_wait: float = 0.002):
+        if mode == 'auto':
+            mode = 'thread' if is_free_threaded() else 'process'
+        if mode not in ('process', 'thread'):
+            raise ValueError(f"Unknown analysis pool mode: {mode}")
+        
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        
+        self.executor: Optional[Executor] = None
+        self._run = None
+        self._pending: List[Tuple[AnalysisJob, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    def start(self):
+        """Create the worker pool"""
+        if self.mode == 'process':
+            # spawn avoids forking a process that already runs an event loop
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+            self._run = _run_batch_in_worker
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='analysis', initializer=_init_thread
+            )
+            self._run = _run_batch_in_thread
+        
+        logger.info(f"Analysis pool started: {self.workers} {self.mode} workers")
+    
+    async def submit(self, enriched: EnrichedEvent,
+                     parsed: Optional[ParsedContent] = None) -> AnalysisResult:
+        """Queue an event for analysis and wait for (analysis, signals)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((enriched, parsed), future))
+        
+        if len(self._pending) >= self.batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_wait, self._dispatch)
+        
+        return await future
+    
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        
+        batch, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, self._run, [job for job, _ in batch])
+        task.add_done_callback(partial(self._resolve, [future for _, future in batch]))
+    
+    def _resolve(self, futures: List[asyncio.Future], task: asyncio.Future):
+        if task.cancelled():
+            results = [None] * len(futures)
+        elif task.exception() is not None:
+            # The batch as a whole failed (e.g. a worker process died)
+            results = [task.exception()] * len(futures)
+        else:
+            results = task.result()
+        
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if result is None:
+                future.cancel()
+            elif isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    async def close(self):
+        """Shut the pool down, waiting for running batches"""
+        self._dispatch()
+        if self.executor:
+            await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+            self.executor = None
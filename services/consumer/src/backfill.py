@@ -0,0 +1,386 @@
+"""Re-enrich stored social events after scoring weights or keyword tables change.
+
+Streams the events table (raw_social_data, or social_events with
+STORAGE_LAYOUT=compact) in heap-block chunks, re-runs enrichment in a process
+pool and writes the results back in place. Progress is kept in Postgres, so
+an interrupted job resumes where it stopped. With BACKFILL_DEFERRED_ONLY=true
+only events stored without content analysis while shedding load are
+re-enriched.
+
+Only the compact layout stores signals. raw_social_data rows hold the
+enriched event alone, so the json layout can only re-run content analysis,
+and the job refuses to start there unless BACKFILL_ANALYSIS_ONLY=true.
+Run with:
+    
+    python -m src.backfill
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import Any, List, Optional, Tuple
+import asyncpg
+from dotenv import load_dotenv
+from loguru import logger
+from .codec import JsonCodec
+from .processors.content_analyzer import ContentAnalyzer
+from .processors.parsed_content import ParsedContent
+from .processors.signal_extractor import SignalExtractor
+from .processors.social_processor import SocialProcessor
+from .records import EnrichedEvent, Signals, SocialEvent
+from .sinks.event_store import SIGNAL_COLUMNS, STREAM_COLUMNS, CompactEventLayout
+
+# Stream inputs are read back and passed to the extractor, not rewritten
+RESCORED_COLUMNS = tuple(column for column in SIGNAL_COLUMNS if column not in STREAM_COLUMNS)
+_rescored_values = itemgetter(*(SIGNAL_COLUMNS.index(column) for column in RESCORED_COLUMNS))
+
+# Marks left by how an event was first processed; a fresh analysis replaces them
+PROCESSING_MARKS = ('analysis_deferred', 'duplicate_of')
+
+# Per-process rescorer, created once by the pool initializer
+_worker_rescorer: Optional['Rescorer'] = None
+
+class Rescorer:
+    """Re-run enrichment for stored rows with this build's processors"""
+    
+    def __init__(self, layout: str):
+        self.layout = layout
+        self.json = JsonCodec()
+        self.social_processor = SocialProcessor()
+        self.content_analyzer = ContentAnalyzer()
+        self.signal_extractor = SignalExtractor()
+        self.event_layout = CompactEventLayout(self.json.encode)
+    
+    def rescore(self, rows: List[tuple]) -> Tuple[List[tuple], int]:
+        """(ctid, new values) for each row that could be re-enriched, and how many were skipped"""
+        if self.layout == 'json':
+            return self._rescore_each(rows, self._json)
+        
+        # (ctid, enriched, parsed, engagement velocity, trend alignment, audience quality)
+        enriched_rows = []
+        skipped = 0
+        for ctid, payload, *stream in rows:
+            try:
+                enriched, parsed = self._enrich(CompactEventLayout.decode_payload(payload, self.json.decode))
+            except Exception as e:
+                skipped += 1
+                logger.warning(f"Skipping row {ctid}: {e}")
+                continue
+            enriched_rows.append((ctid, enriched, parsed, *stream))
+        
+        if not enriched_rows:
+            return [], skipped
+        
+        _, enriched, parsed, velocity, alignment, quality = zip(*enriched_rows)
+        try:
+            batch = self.signal_extractor.extract_stored_batch(
+                list(zip(enriched, parsed)), velocity, alignment, quality
+            )
+        except Exception:
+            # Find the rows that can't be scored one at a time
+            results, failed = self._rescore_each(enriched_rows, self._compact)
+            return results, skipped + failed
+        
+        return [
+            self._values(row[0], row[1], signals) for row, signals in zip(enriched_rows, batch)
+        ], skipped
+    
+    def _rescore_each(self, rows: List[tuple], rescore) -> Tuple[List[tuple], int]:
+        results = []
+        skipped = 0
+        for row in rows:
+            try:
+                results.append(rescore(*row))
+            except Exception as e:
+                skipped += 1
+                logger.warning(f"Skipping row {row[0]}: {e}")
+        return results, skipped
+    
+    def _enrich(self, raw: Any) -> Tuple[EnrichedEvent, Optional[ParsedContent]]:
+        enriched, parsed = self.social_processor.process_sync(SocialEvent.from_dict(raw))
+        if enriched.content is not None:
+            enriched.analysis = self.content_analyzer.analyze_sync(enriched.content, parsed)
+        return enriched, parsed
+    
+    def _compact(self, ctid: tuple, enriched: EnrichedEvent, parsed: Optional[ParsedContent],
+                 engagement_velocity: float, trend_alignment: float,
+                 audience_quality: Optional[float]) -> tuple:
+        signals = self.signal_extractor.extract_stored(
+            enriched, parsed, engagement_velocity, trend_alignment, audience_quality
+        )
+        return self._values(ctid, enriched, signals)
+    
+    def _values(self, ctid: tuple, enriched: EnrichedEvent, signals: Signals) -> tuple:
+        return (ctid,) + _rescored_values(self.event_layout.signal_values(enriched, signals))
+    
+    def _json(self, ctid: tuple, payload_json: str) -> tuple:
+        # The stored payload is the enriched event, which to_dict() starts from
+        raw = self.json.decode(payload_json)
+        if isinstance(raw, dict):
+            for key in PROCESSING_MARKS:
+                raw.pop(key, None)
+        enriched, _ = self._enrich(raw)
+        return ctid, self.json.encode_text(enriched.to_dict())
+
+def _init_worker(layout: str, niceness: int):
+    global _worker_rescorer
+    if niceness:
+        os.nice(niceness)
+    _worker_rescorer = Rescorer(layout)
+
+def _rescore_in_worker(rows: List[tuple]) -> Tuple[List[tuple], int]:
+    return _worker_rescorer.rescore(rows)
+
+class RateLimiter:
+    """Spread work to at most `rate` units per second across every caller; 0 disables it"""
+    
+    def __init__(self, rate: float = 0):
+        self.rate = rate
+        self._next = time.monotonic()
+    
+    async def acquire(self, units: int):
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        start = max(self._next, now)
+        self._next = start + units / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+class Backfill:
+    """Re-enrich every stored event of a table, in parallel and resumably.
+    
+    When a job is first planned, each partition of the table is split into
+    chunks of chunk_blocks heap blocks, recorded in backfill_chunks.
+    `concurrency` tasks then repeatedly claim an unfinished chunk (FOR
+    UPDATE SKIP LOCKED), read it through a server-side cursor with a TID
+    range scan, re-score batch_size rows at a time in the process pool,
+    COPY the results into a temp table and apply them with one UPDATE. The
+    chunk is marked done in the same transaction: a stopped job loses only
+    its chunks in flight, and several backfill processes can share a job.
+    
+    Re-scoring is idempotent, so rows moved by the update into a later
+    chunk are harmlessly scored twice. Only the heap blocks that existed
+    when the job was planned are covered; newer rows were scored live.
+    TID range scans need PostgreSQL 14 or later. With deferred_only, rows
+    that were fully analyzed are read but left alone.
+    
+    The json layout keeps no signals to re-score, only the enriched event;
+    it needs analysis_only, to make clear that only the analysis changes.
+    """
+    
+    def __init__(self, pool, job: str = 'rescore', layout: str = 'compact', table: str = 'social_events',
+                 workers: Optional[int] = None, concurrency: Optional[int] = None, chunk_blocks: int = 1024,
+                 batch_size: int = 1000, max_rows_per_s: float = 0, niceness: int = 10,
+                 progress_table: str = 'backfill_chunks', deferred_only: bool = False,
+                 analysis_only: bool = False):
+        if layout not in ('compact', 'json'):
+            raise ValueError(f"Unknown storage layout: {layout}")
+        if layout == 'json' and not analysis_only:
+            raise ValueError(
+                "raw_social_data (STORAGE_LAYOUT=json) stores no signals, so they can't be re-scored; "
+                "set BACKFILL_ANALYSIS_ONLY=true to re-run content analysis only, "
+                "or use STORAGE_LAYOUT=compact"
+            )
+        self.pool = pool
+        self.job = job
+        self.layout = layout
+        self.table = table
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency or self.workers * 2
+        self.chunk_blocks = chunk_blocks
+        self.batch_size = batch_size
+        self.limiter = RateLimiter(max_rows_per_s)
+        self.niceness = niceness
+        self.progress_table = progress_table
+        
+        if layout == 'compact':
+            self.read_columns = ('payload',) + STREAM_COLUMNS
+            self.write_columns = RESCORED_COLUMNS
+            self.row_filter = 'analysis_deferred'
+        else:
+            self.read_columns = ('payload_json::text',)
+            self.write_columns = ('payload_json',)
+            self.row_filter = "payload_json ? 'analysis_deferred'"
+        if not deferred_only:
+            self.row_filter = 'true'
+        
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.rows = 0
+        self.skipped = 0
+        self.chunks = 0
+    
+    async def ensure_table(self):
+        async with self.pool.acquire() as conn:
+            await conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.progress_table} (
+                    job TEXT NOT NULL,
+                    relation TEXT NOT NULL,
+                    start_block BIGINT NOT NULL,
+                    end_block BIGINT NOT NULL,
+                    rows BIGINT,
+                    skipped BIGINT,
+                    finished_at TIMESTAMPTZ,
+                    PRIMARY KEY (job, relation, start_block)
+                )
+            """)
+    
+    async def plan(self, restart: bool = False) -> int:
+        """Record the job's chunks unless it was planned before; returns the chunks left"""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                # Processes starting the same job together plan it once
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", self.job)
+                if restart:
+                    await conn.execute(f"DELETE FROM {self.progress_table} WHERE job = $1", self.job)
+                
+                planned = await conn.fetchval(
+                    f"SELECT count(*) FROM {self.progress_table} WHERE job = $1", self.job
+                )
+                if not planned:
+                    relations = await conn.fetch("""
+                        SELECT relid::regclass::text AS relation,
+                               pg_relation_size(relid) / current_setting('block_size')::bigint AS blocks
+                        FROM pg_partition_tree($1::regclass)
+                        WHERE isleaf
+                    """, self.table)
+                    chunks = [
+                        (self.job, relation, start, min(start + self.chunk_blocks, blocks))
+                        for relation, blocks in relations
+                        for start in range(0, blocks, self.chunk_blocks)
+                    ]
+                    await conn.copy_records_to_table(
+                        self.progress_table, records=chunks,
+                        columns=('job', 'relation', 'start_block', 'end_block')
+                    )
+                    logger.info(
+                        f"Planned backfill {self.job}: {len(chunks)} chunks in {len(relations)} relations"
+                    )
+                
+                return await conn.fetchval(
+                    f"SELECT count(*) FROM {self.progress_table} WHERE job = $1 AND finished_at IS NULL",
+                    self.job
+                )
+    
+    async def run(self):
+        """Process chunks until none are left"""
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.layout, self.niceness)
+        )
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*(self._work() for _ in range(self.concurrency)))
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Backfill {self.job} finished: {self.rows} rows in {self.chunks} chunks, "
+            f"{self.skipped} skipped, {self.rows / max(elapsed, 1e-9):.0f} rows/s"
+        )
+    
+    async def _work(self):
+        while True:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    chunk = await conn.fetchrow(f"""
+                        SELECT relation, start_block, end_block FROM {self.progress_table}
+                        WHERE job = $1 AND finished_at IS NULL
+                        ORDER BY relation, start_block
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    """, self.job)
+                    if chunk is None:
+                        return
+                    relation, start_block, end_block = chunk
+                    
+                    # A commit lost in a crash only means the chunk is done again
+                    await conn.execute("SET LOCAL synchronous_commit TO OFF")
+                    rows, skipped = await self._process_chunk(conn, relation, start_block, end_block)
+                    await conn.execute(f"""
+                        UPDATE {self.progress_table} SET rows = $4, skipped = $5, finished_at = NOW()
+                        WHERE job = $1 AND relation = $2 AND start_block = $3
+                    """, self.job, relation, start_block, rows, skipped)
+            
+            self.rows += rows
+            self.skipped += skipped
+            self.chunks += 1
+            logger.debug(f"Backfilled {relation} blocks {start_block}-{end_block}: {rows} rows")
+    
+    async def _process_chunk(self, conn, relation: str, start_block: int, end_block: int) -> Tuple[int, int]:
+        """Re-score one chunk inside the caller's transaction"""
+        await conn.execute(f"""
+            CREATE TEMP TABLE backfill_rows ON COMMIT DROP AS
+            SELECT ctid AS row_ctid, {', '.join(self.write_columns)} FROM {relation} WITH NO DATA
+        """)
+        cursor = await conn.cursor(
+            f"SELECT ctid, {', '.join(self.read_columns)} FROM {relation} "
+            f"WHERE ctid >= $1::tid AND ctid < $2::tid AND {self.row_filter}",
+            (start_block, 0), (end_block, 0)
+        )
+        
+        loop = asyncio.get_running_loop()
+        rows = skipped = 0
+        while True:
+            batch = await cursor.fetch(self.batch_size)
+            if not batch:
+                break
+            await self.limiter.acquire(len(batch))
+            results, batch_skipped = await loop.run_in_executor(
+                self.executor, _rescore_in_worker, [tuple(row) for row in batch]
+            )
+            if results:
+                await conn.copy_records_to_table(
+                    'backfill_rows', records=results, columns=('row_ctid',) + self.write_columns
+                )
+            rows += len(results)
+            skipped += batch_skipped
+        
+        if rows:
+            updates = ', '.join(f'{column} = s.{column}' for column in self.write_columns)
+            await conn.execute(
+                f"UPDATE {relation} AS t SET {updates} FROM backfill_rows AS s WHERE t.ctid = s.row_ctid"
+            )
+        return rows, skipped
+
+async def main():
+    load_dotenv()
+    layout = os.getenv('STORAGE_LAYOUT', 'json').lower()
+    workers = int(os.getenv('BACKFILL_WORKERS', '0')) or os.cpu_count() or 1
+    concurrency = int(os.getenv('BACKFILL_CONCURRENCY', '0')) or workers * 2
+    
+    # One connection per chunk in flight, plus one for planning
+    pool = await asyncpg.create_pool(
+        os.getenv('DATABASE_URL'), min_size=1, max_size=concurrency + 1,
+        server_settings={'application_name': 'backfill'}
+    )
+    try:
+        backfill = Backfill(
+            pool,
+            job=os.getenv('BACKFILL_JOB', 'rescore'),
+            layout=layout,
+            table=os.getenv('EVENTS_TABLE', 'social_events') if layout == 'compact' else 'raw_social_data',
+            workers=workers,
+            concurrency=concurrency,
+            chunk_blocks=int(os.getenv('BACKFILL_CHUNK_BLOCKS', '1024')),
+            batch_size=int(os.getenv('BACKFILL_BATCH_SIZE', '1000')),
+            max_rows_per_s=float(os.getenv('BACKFILL_MAX_ROWS_PER_S', '0')),
+            niceness=int(os.getenv('BACKFILL_NICE', '10')),
+            deferred_only=os.getenv('BACKFILL_DEFERRED_ONLY', 'false').lower() == 'true',
+            analysis_only=os.getenv('BACKFILL_ANALYSIS_ONLY', 'false').lower() == 'true'
+        )
+        await backfill.ensure_table()
+        remaining = await backfill.plan(restart=os.getenv('BACKFILL_RESTART', 'false').lower() == 'true')
+        logger.info(f"Backfill {backfill.job}: {remaining} chunks to go")
+        await backfill.run()
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
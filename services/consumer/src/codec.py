@@ -0,0 +1,99 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CONTENT_TYPE_HEADER = 'content-type'
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+
+Headers = Sequence[Tuple[str, bytes]]
+
+class JsonCodec:
+    """JSON codec, using orjson when it is installed"""
+    
+    content_type = JSON_CONTENT_TYPE
+    
+    def encode(self, value: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # e.g. integers wider than 64 bits; stdlib handles those
+                pass
+        return json.dumps(value).encode('utf-8')
+    
+    def decode(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data.decode('utf-8'))
+    
+    def encode_text(self, value: Any) -> str:
+        """Encode to a JSON string, e.g. for json/jsonb columns"""
+        return self.encode(value).decode('utf-8')
+
+class MsgpackCodec:
+    """Compact binary codec based on MessagePack"""
+    
+    content_type = MSGPACK_CONTENT_TYPE
+    
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+    
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+class CodecRegistry:
+    """Pick a codec per message from its content-type header.
+    
+    Messages without a content-type header (e.g. from the Node server) are
+    decoded as JSON, and JSON is used for encoding unless another available
+    format is requested.
+    """
+    
+    def __init__(self, wire_format: str = 'json'):
+        self.json = JsonCodec()
+        self.codecs: Dict[str, Any] = {JSON_CONTENT_TYPE: self.json}
+        if msgpack is not None:
+            self.codecs[MSGPACK_CONTENT_TYPE] = MsgpackCodec()
+        
+        self.encoder = self._resolve(wire_format)
+    
+    def _resolve(self, wire_format: str):
+        aliases = {'json': JSON_CONTENT_TYPE, 'msgpack': MSGPACK_CONTENT_TYPE}
+        content_type = aliases.get(wire_format.lower(), wire_format.lower())
+        codec = self.codecs.get(content_type)
+        if codec is None:
+            logger.warning(f"Wire format {wire_format} unavailable, falling back to JSON")
+            return self.json
+        return codec
+    
+    def decode(self, data: bytes, headers: Optional[Headers] = None) -> Any:
+        """Decode a message value using its content-type header"""
+        content_type = self._content_type(headers) or JSON_CONTENT_TYPE
+        codec = self.codecs.get(content_type)
+        if codec is None:
+            raise ValueError(f"Unsupported content type: {content_type}")
+        return codec.decode(data)
+    
+    def encode(self, value: Any) -> Tuple[bytes, List[Tuple[str, bytes]]]:
+        """Encode a value once, returning the bytes and the headers to send"""
+        return (
+            self.encoder.encode(value),
+            [(CONTENT_TYPE_HEADER, self.encoder.content_type.encode('ascii'))]
+        )
+    
+    def _content_type(self, headers: Optional[Headers]) -> Optional[str]:
+        for key, value in headers or ():
+            if key.lower() == CONTENT_TYPE_HEADER and value:
+                return value.decode('ascii').split(';')[0].strip().lower()
+        return None
@@ -1,15 +1,37 @@
 import asyncio
-import json
 import os
-from typing import Dict, Any
-from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+import signal
+import time
+from datetime import datetime, timezone
+from functools import partial
+from typing import Dict, Any, List, Optional, Tuple
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from aiokafka.errors import CommitFailedError, IllegalStateError, KafkaError
 from loguru import logger
 import asyncpg
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
+from .analysis_pool import AnalysisPool
+from .codec import CodecRegistry
+from .load_shedder import LoadShedder
+from . import metrics
+from .pipeline import ConsumerLane, Pipeline, PipelineEvent, RevocationListener, Stage
+from .records import EnrichedEvent, SocialEvent
+from .retry import RetryRouter, is_retryable, retry_metadata
+from .shared_cache import create_shared_cache
 from .processors.social_processor import SocialProcessor
 from .processors.content_analyzer import ContentAnalyzer
+from .processors.analysis_cache import AnalysisCache
+from .processors.near_duplicates import NearDuplicateIndex
+from .processors.parsed_content import ParsedContent
+from .processors.sentiment import DEFAULT_MODEL, create_sentiment_backend
+from .processors.creator_state import CreatorStateStore
 from .processors.signal_extractor import SignalExtractor
+from .processors.trend_detector import TrendDetector
+from .processors.window_aggregator import WindowAggregator
+from .sinks.postgres_sink import PostgresBulkWriter
+from .sinks.mongo_sink import MongoBulkWriter
+from .sinks.event_store import CompactEventLayout
 
 load_dotenv()
 
@@ -20,48 +42,270 @@ class EventConsumer:
         self.mongo_url = os.getenv('MONGO_URL')
         self.use_mongo = os.getenv('USE_MONGO', 'false').lower() == 'true'
         
+        # Observability
+        self.metrics_port = int(os.getenv('METRICS_PORT', '9100'))
+        self.log_sampler = metrics.LogSampler(float(os.getenv('LOG_SAMPLE_INTERVAL_S', '1')))
+        
+        # Staged pipeline: bounded queues between stages, partitions paused when full
+        self.pipeline_mode = os.getenv('CONSUMER_PIPELINE', 'true').lower() == 'true'
+        self.pipeline_queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', '100'))
+        # 0: derived from the stages' queue sizes and worker counts (see ConsumerLane)
+        self.pipeline_max_inflight = int(os.getenv('PIPELINE_MAX_INFLIGHT', '0'))
+        self.pipeline_commit_interval = int(os.getenv('PIPELINE_COMMIT_INTERVAL_MS', '500')) / 1000
+        self.pipeline_drain_timeout = float(os.getenv('PIPELINE_DRAIN_TIMEOUT_S', '30'))
+        self.stage_concurrency = {
+            stage: int(os.getenv(f'PIPELINE_{stage.upper()}_WORKERS', default))
+            for stage, default in (('enrich', '4'), ('analyze', '4'), ('persist', '4'), ('publish', '2'))
+        }
+        
+        # Chat lane: assistant-requests get their own consumer, tuned for latency
+        self.chat_workers = int(os.getenv('CHAT_LANE_WORKERS', '4'))
+        self.chat_queue_size = int(os.getenv('CHAT_LANE_QUEUE_SIZE', '50'))
+        self.chat_max_inflight = int(os.getenv('CHAT_LANE_MAX_INFLIGHT', '0'))
+        self.chat_max_batch_size = int(os.getenv('CHAT_LANE_MAX_BATCH_SIZE', '50'))
+        self.chat_fetch_timeout_ms = int(os.getenv('CHAT_LANE_FETCH_TIMEOUT_MS', '10'))
+        self.chat_commit_interval = int(os.getenv('CHAT_LANE_COMMIT_INTERVAL_MS', '100')) / 1000
+        self.chat_batch_max_rows = int(os.getenv('CHAT_BATCH_MAX_ROWS', '100'))
+        self.chat_batch_max_delay = int(os.getenv('CHAT_BATCH_MAX_DELAY_MS', '5')) / 1000
+        
+        # Failed events: delayed retry topics for transient errors (pipeline mode), then <topic>-dlq;
+        # rows a database rejects go to the storage dead-letter topic
+        self.retry_delays = [
+            float(delay) for delay in os.getenv('RETRY_DELAYS_S', '5,30,300').split(',') if delay.strip()
+        ]
+        self.retry_max_inflight = int(os.getenv('RETRY_LANE_MAX_INFLIGHT', '200'))
+        self.storage_dlq_topic = os.getenv('STORAGE_DLQ_TOPIC', 'storage-dlq')
+        self.db_retry_attempts = int(os.getenv('DB_RETRY_ATTEMPTS', '3'))
+        self.db_retry_max_wait = int(os.getenv('DB_RETRY_MAX_WAIT_MS', '2000')) / 1000
+        
+        # Batched consumption settings
+        self.batch_mode = os.getenv('CONSUMER_BATCH_MODE', 'true').lower() == 'true'
+        self.max_batch_size = int(os.getenv('CONSUMER_MAX_BATCH_SIZE', '500'))
+        self.max_inflight_batches = int(os.getenv('CONSUMER_MAX_INFLIGHT_BATCHES', '8'))
+        self.fetch_timeout_ms = int(os.getenv('CONSUMER_FETCH_TIMEOUT_MS', '100'))
+        self.commit_interval = int(os.getenv('CONSUMER_COMMIT_INTERVAL_MS', '500')) / 1000
+        
+        # Wire format for published results and producer batching
+        self.codec = CodecRegistry(os.getenv('KAFKA_WIRE_FORMAT', 'json'))
+        self.producer_compression = os.getenv('KAFKA_PRODUCER_COMPRESSION') or None
+        self.producer_linger_ms = int(os.getenv('KAFKA_PRODUCER_LINGER_MS', '5'))
+        self.producer_max_batch_bytes = int(os.getenv('KAFKA_PRODUCER_MAX_BATCH_BYTES', '65536'))
+        
+        # Windowed per-creator rollups of signals (AGGREGATION_WINDOW_S=0 disables
+        # them); per-event results can be switched off once consumers use rollups
+        aggregation_window = float(os.getenv('AGGREGATION_WINDOW_S', '0'))
+        self.window_aggregator = None
+        if aggregation_window > 0:
+            self.window_aggregator = WindowAggregator(
+                aggregation_window,
+                float(os.getenv('AGGREGATION_SLIDE_S', '0')) or None,
+                max_recommendations=int(os.getenv('AGGREGATION_MAX_RECOMMENDATIONS', '5'))
+            )
+        self.aggregation_topic = os.getenv('AGGREGATION_TOPIC', 'creator-aggregates')
+        self.publish_event_results = os.getenv('PUBLISH_EVENT_RESULTS', 'true').lower() == 'true'
+        self.aggregation_task = None
+        
+        # Analysis execution: inline on the event loop, or in a worker pool
+        self.analysis_executor = os.getenv('ANALYSIS_EXECUTOR', 'inline').lower()
+        self.analysis_workers = int(os.getenv('ANALYSIS_WORKERS', '0')) or None
+        self.analysis_batch_size = int(os.getenv('ANALYSIS_BATCH_SIZE', '32'))
+        self.analysis_batch_wait = int(os.getenv('ANALYSIS_BATCH_WAIT_MS', '2')) / 1000
+        
+        # Storage layout: json (the whole enriched event in raw_social_data) or
+        # compact (typed columns, compressed raw event, daily partitions)
+        self.event_layout = None
+        if os.getenv('STORAGE_LAYOUT', 'json').lower() == 'compact':
+            self.event_layout = CompactEventLayout(
+                self.codec.json.encode,
+                table=os.getenv('EVENTS_TABLE', 'social_events'),
+                compression_level=int(os.getenv('STORAGE_COMPRESSION_LEVEL', '6')),
+                days_ahead=int(os.getenv('STORAGE_PARTITION_DAYS_AHEAD', '3'))
+            )
+        self.partition_task = None
+        
+        # Bulk Postgres write settings
+        self.pg_batch_max_rows = int(os.getenv('PG_BATCH_MAX_ROWS', '500'))
+        self.pg_batch_max_delay = int(os.getenv('PG_BATCH_MAX_DELAY_MS', '50')) / 1000
+        self.pg_use_copy = os.getenv('PG_BULK_METHOD', 'executemany').lower() == 'copy'
+        
+        # Bulk Mongo write settings
+        self.mongo_batch_max_docs = int(os.getenv('MONGO_BATCH_MAX_DOCS', '500'))
+        self.mongo_batch_max_bytes = int(os.getenv('MONGO_BATCH_MAX_BYTES', str(16 * 1024 * 1024)))
+        self.mongo_batch_max_delay = int(os.getenv('MONGO_BATCH_MAX_DELAY_MS', '50')) / 1000
+        
         self.consumer = None
         self.producer = None
+        self.retry_router = None
+        self.lanes: List[ConsumerLane] = []
         self.pg_pool = None
         self.mongo_client = None
+        self.analysis_pool = None
+        self.social_writer = None
+        self.chat_writer = None
+        self.interaction_writer = None
+        self.writers = []
         
         # Initialize processors
         self.social_processor = SocialProcessor()
-        self.content_analyzer = ContentAnalyzer()
-        self.signal_extractor = SignalExtractor()
+        self.sentiment_backend = create_sentiment_backend(
+            os.getenv('SENTIMENT_BACKEND', 'keyword'),
+            model_name=os.getenv('SENTIMENT_MODEL', DEFAULT_MODEL),
+            max_batch_size=int(os.getenv('SENTIMENT_BATCH_SIZE', '32')),
+            batch_wait=int(os.getenv('SENTIMENT_BATCH_WAIT_MS', '10')) / 1000,
+            max_pending=int(os.getenv('SENTIMENT_MAX_PENDING', '256')),
+            timeout=int(os.getenv('SENTIMENT_TIMEOUT_MS', '500')) / 1000,
+            threads=int(os.getenv('SENTIMENT_THREADS', '0')) or None
+        )
+        self.content_analyzer = ContentAnalyzer(self.sentiment_backend)
+        self.analysis_cache = None
+        if os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true':
+            self.analysis_cache = AnalysisCache(
+                max_entries=int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '20000')),
+                ttl=float(os.getenv('ANALYSIS_CACHE_TTL_S', '3600'))
+            )
+        self.near_duplicates = None
+        if os.getenv('NEAR_DUPLICATE_INDEX', 'false').lower() == 'true':
+            self.near_duplicates = NearDuplicateIndex(
+                threshold=float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8')),
+                max_entries=int(os.getenv('NEAR_DUPLICATE_MAX_ENTRIES', '50000')),
+                ttl=float(os.getenv('NEAR_DUPLICATE_TTL_S', '86400'))
+            )
+        self.trend_detector = TrendDetector(
+            capacity=int(os.getenv('TREND_CAPACITY', '5000')),
+            half_life=float(os.getenv('TREND_HALF_LIFE_S', '3600')),
+            top_n=int(os.getenv('TREND_TOP_N', '100')),
+            min_count=float(os.getenv('TREND_MIN_COUNT', '5'))
+        )
+        self.creator_state = CreatorStateStore(
+            max_creators=int(os.getenv('CREATOR_STATE_MAX_CREATORS', '100000')),
+            alpha=float(os.getenv('CREATOR_STATE_ALPHA', '0.2'))
+        )
+        self.creator_state_checkpoint_s = float(os.getenv('CREATOR_STATE_CHECKPOINT_S', '60'))
+        self.checkpoint_task = None
+        self.shared_cache = create_shared_cache(
+            os.getenv('SHARED_CACHE', 'off'),
+            url=os.getenv('REDIS_URL'),
+            near_ttl=int(os.getenv('SHARED_CACHE_NEAR_TTL_MS', '1000')) / 1000,
+            flush_interval=int(os.getenv('SHARED_CACHE_FLUSH_INTERVAL_MS', '100')) / 1000,
+            trend_window=int(os.getenv('SHARED_CACHE_TREND_WINDOW_S', '3600')),
+            trend_refresh=float(os.getenv('SHARED_CACHE_TREND_REFRESH_S', '10')),
+            top_n=int(os.getenv('TREND_TOP_N', '100')),
+            min_count=float(os.getenv('TREND_MIN_COUNT', '5'))
+        )
+        self.signal_extractor = SignalExtractor(self.trend_detector, self.creator_state, self.shared_cache)
         
+        # Under lag or latency spikes, low-reach events get metrics-only signals
+        self.load_shedder = None
+        if os.getenv('LOAD_SHEDDING', 'false').lower() == 'true':
+            self.load_shedder = LoadShedder(
+                lag_high=int(os.getenv('LOAD_SHED_LAG_HIGH', '50000')),
+                lag_low=int(os.getenv('LOAD_SHED_LAG_LOW', '5000')),
+                latency_high=int(os.getenv('LOAD_SHED_LATENCY_HIGH_MS', '2000')) / 1000,
+                latency_low=int(os.getenv('LOAD_SHED_LATENCY_LOW_MS', '500')) / 1000,
+                min_reach=float(os.getenv('LOAD_SHED_MIN_REACH', '10000')),
+                sample_rate=float(os.getenv('LOAD_SHED_SAMPLE_RATE', '0.05')),
+                min_hold=float(os.getenv('LOAD_SHED_MIN_HOLD_S', '30')),
+                creator_state=self.creator_state
+            )
+    
     async def start(self):
         """Initialize connections and start consuming"""
         logger.info("Starting event consumer...")
+        metrics.start_metrics_server(self.metrics_port)
+        
+        # Start analysis workers before opening any connections
+        if self.analysis_executor != 'inline':
+            self.analysis_pool = AnalysisPool(
+                mode=self.analysis_executor,
+                workers=self.analysis_workers,
+                batch_size=self.analysis_batch_size,
+                batch_wait=self.analysis_batch_wait
+            )
+            self.analysis_pool.start()
         
         # Initialize PostgreSQL
         self.pg_pool = await asyncpg.create_pool(self.postgres_url)
+        if self.event_layout is not None:
+            await self.event_layout.ensure_schema(self.pg_pool)
+            await self.event_layout.ensure_partitions(self.pg_pool)
+            self.partition_task = asyncio.create_task(self.maintain_partitions())
+        self.social_writer = self._create_event_writer()
+        self.chat_writer = self._create_writer(
+            'chat_memory', ('creator_id', 'ts', 'role', 'content'),
+            max_rows=self.chat_batch_max_rows,
+            max_delay=self.chat_batch_max_delay
+        )
+        await self.creator_state.ensure_table(self.pg_pool)
+        await self.creator_state.restore(self.pg_pool)
+        self.checkpoint_task = asyncio.create_task(self.checkpoint_creator_state())
         logger.info("PostgreSQL connected")
         
+        if self.shared_cache is not None:
+            self.shared_cache.start()
+        
         # Initialize MongoDB if enabled
         if self.use_mongo:
             self.mongo_client = AsyncIOMotorClient(self.mongo_url)
             self.mongo_db = self.mongo_client.veri_signal
+            self.interaction_writer = MongoBulkWriter(
+                self.mongo_db.interactions,
+                max_docs=self.mongo_batch_max_docs,
+                max_delay=self.mongo_batch_max_delay,
+                max_bytes=self.mongo_batch_max_bytes,
+                on_failure=partial(self._dead_letter_record, 'interactions'),
+                retry_attempts=self.db_retry_attempts,
+                retry_max_wait=self.db_retry_max_wait
+            )
+            self.interaction_writer.start()
+            self.writers.append(self.interaction_writer)
             logger.info("MongoDB connected")
         
-        # Initialize Kafka
-        self.consumer = AIOKafkaConsumer(
-            'social-events',
-            'assistant-requests',
-            bootstrap_servers=self.kafka_brokers,
-            value_deserializer=lambda m: json.loads(m.decode('utf-8')),
-            group_id='enrichment-consumer'
-        )
-        
+        # Values are encoded by self.codec before sending
         self.producer = AIOKafkaProducer(
             bootstrap_servers=self.kafka_brokers,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8')
+            compression_type=self.producer_compression,
+            linger_ms=self.producer_linger_ms,
+            max_batch_size=self.producer_max_batch_bytes
+        )
+        # Retry topics are only consumed by pipeline lanes; other modes dead-letter directly
+        self.retry_router = RetryRouter(
+            self.producer, self.codec, self.retry_delays,
+            retry_topics=('social-events',) if self.pipeline_mode else (),
+            storage_topic=self.storage_dlq_topic
         )
         
-        await self.consumer.start()
+        # Initialize Kafka
+        if self.pipeline_mode:
+            # One consumer per lane; lanes commit offsets themselves once events are done
+            self.lanes = self.build_lanes()
+            for lane in self.lanes:
+                lane.consumer = AIOKafkaConsumer(
+                    bootstrap_servers=self.kafka_brokers,
+                    group_id='enrichment-consumer',
+                    enable_auto_commit=False
+                )
+                lane.consumer.subscribe(
+                    list(lane.topics), listener=RevocationListener(partial(self._partitions_revoked, lane))
+                )
+        else:
+            self.consumer = AIOKafkaConsumer(
+                bootstrap_servers=self.kafka_brokers,
+                group_id='enrichment-consumer',
+                # Offsets are committed only once the rows of their events are flushed
+                enable_auto_commit=False
+            )
+            self.consumer.subscribe(
+                ['social-events', 'assistant-requests'], listener=RevocationListener(self._lag_revoked)
+            )
+        
+        for consumer in self._kafka_consumers():
+            await consumer.start()
         await self.producer.start()
         logger.info("Kafka consumer and producer started")
         
+        if self.window_aggregator is not None:
+            self.aggregation_task = asyncio.create_task(self.publish_aggregates())
+        
         # Start consuming
         try:
             await self.consume()
@@ -70,66 +314,734 @@ class EventConsumer:
     
     async def consume(self):
         """Main consumption loop"""
-        async for msg in self.consumer:
+        if self.pipeline_mode:
+            await self.consume_lanes()
+            return
+        
+        if self.batch_mode:
+            await self.consume_batches()
+            return
+        
+        await self.consume_messages()
+    
+    async def consume_messages(self):
+        """One message at a time; offsets are committed every commit_interval
+        seconds, after the writers have flushed"""
+        positions: Dict[TopicPartition, int] = {}
+        next_commit = time.monotonic() + self.commit_interval
+        try:
+            async for msg in self.consumer:
+                tp = TopicPartition(msg.topic, msg.partition)
+                await self._consume_message(msg)
+                positions[tp] = msg.offset + 1
+                self._record_lag(self.consumer, tp, msg.offset)
+                
+                if time.monotonic() >= next_commit:
+                    if await self._flush_and_commit(positions):
+                        positions.clear()
+                    next_commit = time.monotonic() + self.commit_interval
+        finally:
+            if positions:
+                await self._flush_and_commit(positions)
+    
+    async def _consume_message(self, msg):
+        try:
+            value = self.decode(msg)
+        except Exception as e:
+            self._record_error(msg.topic, None)
+            try:
+                await self._dead_letter_undecodable(msg.topic, msg, e)
+            except Exception as dlq_error:
+                logger.critical(f"Dropping undecodable message {msg.topic}@{msg.offset}: {dlq_error}")
+            return
+        
+        try:
+            await self.process_message(msg, value)
+        except Exception as e:
+            self._record_error(msg.topic, value)
             try:
-                await self.process_message(msg)
+                await self._route_failure(msg.topic, value, 0, e, 'consumer')
+            except Exception as dlq_error:
+                # Offsets move past failed events in this mode; only the log keeps the event
+                logger.critical(f"Dropping failed event {msg.topic}@{msg.offset} {value}: {dlq_error}")
+    
+    async def _flush_and_commit(self, offsets: Dict[TopicPartition, int]) -> bool:
+        """Commit offsets once buffered rows are written; False if the flush failed"""
+        try:
+            await self.flush_writers()
+        except Exception as e:
+            metrics.FLUSH_FAILURES.inc()
+            logger.error(f"Flush failed, not committing offsets: {e}")
+            return False
+        
+        assigned = self.consumer.assignment()
+        offsets = {tp: position for tp, position in offsets.items() if tp in assigned}
+        try:
+            if offsets:
+                await self.consumer.commit(offsets)
+        except KafkaError as e:
+            # Partitions were reassigned; the new owner will reprocess
+            logger.warning(f"Offset commit failed: {e}")
+        return True
+    
+    def build_lanes(self) -> List[ConsumerLane]:
+        """Enrichment and chat lanes, so chat never queues behind social-event bursts,
+        plus one lane per retry tier so retried events never hold up fresh ones"""
+        event_writers = [self.social_writer] + ([self.interaction_writer] if self.use_mongo else [])
+        enrichment = ConsumerLane(
+            'enrichment', ('social-events',), self._enrichment_stages(), event_writers,
+            max_inflight=self.pipeline_max_inflight,
+            max_batch_size=self.max_batch_size,
+            fetch_timeout_ms=self.fetch_timeout_ms,
+            commit_interval=self.pipeline_commit_interval
+        )
+        
+        chat = ConsumerLane(
+            'chat', ('assistant-requests',),
+            [Stage('chat', self.chat_event, self.chat_workers, self.chat_queue_size)],
+            [self.chat_writer],
+            max_inflight=self.chat_max_inflight,
+            max_batch_size=self.chat_max_batch_size,
+            fetch_timeout_ms=self.chat_fetch_timeout_ms,
+            commit_interval=self.chat_commit_interval
+        )
+        
+        retries = [
+            ConsumerLane(
+                f'retry-{tier}', (topic,),
+                self._enrichment_stages(),
+                event_writers,
+                max_inflight=self.retry_max_inflight,
+                max_batch_size=self.max_batch_size,
+                fetch_timeout_ms=self.fetch_timeout_ms,
+                commit_interval=self.pipeline_commit_interval,
+                delayed=True
+            )
+            for tier, (topic, _) in enumerate(self.retry_router.tiers('social-events'), start=1)
+        ]
+        return [enrichment, chat] + retries
+    
+    def _enrichment_stages(self) -> List[Stage]:
+        return [
+            Stage(name, handler, self.stage_concurrency[name], self.pipeline_queue_size)
+            for name, handler in (
+                ('enrich', self.enrich_event),
+                ('analyze', self.analyze_event),
+                ('persist', self.persist_event),
+                ('publish', self.publish_event)
+            )
+        ]
+    
+    async def consume_lanes(self):
+        """Run every lane; if one stops, the others are drained and stopped too"""
+        tasks = [asyncio.create_task(self.consume_lane(lane)) for lane in self.lanes]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for task in done:
+            task.result()
+    
+    async def consume_lane(self, lane: ConsumerLane):
+        """Fetch loop feeding one lane's staged pipeline.
+        
+        Events are admitted until max_inflight are in the pipeline, then
+        every assigned partition is paused (polling continues so the group
+        membership stays alive) until half of them have drained. Offsets
+        are committed by commit_offsets() once events have left the last
+        stage and their rows are flushed. On a delayed lane, partitions
+        whose next retry is not due are held (see _hold_until_due).
+        """
+        lane.pipeline = Pipeline(
+            lane.stages, partial(self._event_done, lane), self._event_failed, lane.max_inflight
+        )
+        lane.pipeline.start()
+        committer = asyncio.create_task(self.commit_offsets(lane))
+        consumer, pipeline = lane.consumer, lane.pipeline
+        paused = False
+        
+        inflight_gauge = metrics.PIPELINE_INFLIGHT.labels(lane.name)
+        paused_gauge = metrics.PARTITIONS_PAUSED.labels(lane.name)
+        depth_gauges = [metrics.STAGE_QUEUE_DEPTH.labels(lane.name, stage.name) for stage in lane.stages]
+        
+        try:
+            while True:
+                inflight_gauge.set(pipeline.inflight)
+                for stage, gauge in zip(lane.stages, depth_gauges):
+                    gauge.set(stage.depth)
+                
+                self._release_due(lane, resume=not paused)
+                if not paused and pipeline.saturated:
+                    consumer.pause(*consumer.assignment())
+                    paused_gauge.set(1)
+                    paused = True
+                elif paused and pipeline.has_capacity:
+                    consumer.resume(*(tp for tp in consumer.paused() if tp not in lane.held))
+                    paused_gauge.set(0)
+                    paused = False
+                
+                batch = await consumer.getmany(
+                    timeout_ms=lane.fetch_timeout_ms,
+                    max_records=lane.max_batch_size
+                )
+                for tp, messages in batch.items():
+                    last = None
+                    for msg in messages:
+                        if lane.delayed and self._hold_until_due(lane, tp, msg):
+                            break
+                        await self._admit(lane, tp, msg)
+                        last = msg
+                    if last is not None:
+                        self._record_lag(consumer, tp, last.offset)
+        finally:
+            committer.cancel()
+            try:
+                await asyncio.wait_for(pipeline.drain(), timeout=self.pipeline_drain_timeout)
+                await self._commit_completed(lane)
             except Exception as e:
-                logger.error(f"Error processing message: {e}")
+                logger.error(f"{lane.name} lane did not drain cleanly: {e}")
+            await pipeline.stop()
+    
+    def _hold_until_due(self, lane: ConsumerLane, tp: TopicPartition, msg) -> bool:
+        """Pause a retry partition at a message that is not due yet.
+        
+        Retry topics are written in due order, so the rest of the fetched
+        messages wait too; they are fetched again from msg once the
+        partition is resumed.
+        """
+        _, due, _ = retry_metadata(msg.headers)
+        if due <= time.time():
+            return False
+        lane.consumer.seek(tp, msg.offset)
+        lane.consumer.pause(tp)
+        lane.held[tp] = due
+        return True
+    
+    def _release_due(self, lane: ConsumerLane, resume: bool = True):
+        """Resume held partitions whose next message is due, unless the lane is paused"""
+        now = time.time()
+        due = [tp for tp, at in lane.held.items() if at <= now]
+        for tp in due:
+            del lane.held[tp]
+        # A paused lane resumes them with the rest once it has capacity
+        due = [tp for tp in due if tp in lane.consumer.assignment()]
+        if resume and due:
+            lane.consumer.resume(*due)
+    
+    async def _admit(self, lane: ConsumerLane, tp: TopicPartition, msg):
+        lane.offset_tracker.track(tp, msg.offset)
+        attempt, due, origin = retry_metadata(msg.headers)
+        origin = origin or tp.topic
+        value = record = None
+        decoded = False
+        try:
+            start = time.perf_counter()
+            value = self.decode(msg)
+            decoded = True
+            if origin == 'social-events':
+                record = SocialEvent.from_dict(value)
+            metrics.stage_timers['decode'].observe(time.perf_counter() - start)
+            
+            self._log_message(origin, value)
+            event = PipelineEvent(
+                value, tp, msg.offset, self._ordering_key(msg, value), origin=origin, attempt=attempt, due=due,
+                record=record
+            )
+        except Exception as e:
+            self._record_error(origin, value if decoded else None)
+            try:
+                if decoded:
+                    await self._route_failure(origin, value, attempt, e, 'admission')
+                else:
+                    await self._dead_letter_undecodable(origin, msg, e)
+            except Exception as dlq_error:
+                logger.critical(
+                    f"Could not dead-letter {tp.topic}[{tp.partition}]@{msg.offset}, "
+                    f"holding back its offset: {dlq_error}"
+                )
+                return
+            lane.offset_tracker.complete(tp, msg.offset)
+            return
+        
+        await lane.pipeline.submit(event)
+    
+    def _event_done(self, lane: ConsumerLane, event: PipelineEvent):
+        lane.offset_tracker.complete(event.tp, event.offset)
+        elapsed = time.perf_counter() - event.admitted_at
+        metrics.EVENT_SECONDS.labels(lane.name).observe(elapsed)
+        if self.load_shedder is not None and lane.name == 'enrichment':
+            self.load_shedder.observe_latency(elapsed)
+    
+    async def _event_failed(self, event: PipelineEvent, stage: Stage, error: Exception):
+        self._record_error(event.origin, event.value)
+        await self._route_failure(event.origin, event.value, event.attempt, error, f'{stage.name} stage')
+    
+    async def _route_failure(self, topic: str, value: Any, attempt: int, error: Exception, where: str):
+        """Hand a failed event to its next retry topic, or dead-letter it"""
+        # Retrying won't fix a malformed event or a bug; only transient I/O errors get another go
+        target = await self.retry_router.route(topic, value, attempt, error, retry=is_retryable(error))
+        metrics.FAILED_EVENTS.labels(target).inc()
+        logger.error(f"Error processing message in {where}, sent to {target}: {error}")
+    
+    async def _dead_letter_undecodable(self, topic: str, msg, error: Exception):
+        target = await self.retry_router.dead_letter_raw(topic, msg.value, msg.headers, error)
+        metrics.FAILED_EVENTS.labels(target).inc()
+        logger.error(f"Undecodable message {msg.topic}[{msg.partition}]@{msg.offset} sent to {target}: {error}")
     
-    async def process_message(self, msg):
+    async def _dead_letter_row(self, table: str, columns: tuple, row: tuple, error: Exception):
+        await self._dead_letter_record(table, dict(zip(columns, row)), error)
+    
+    async def _dead_letter_record(self, source: str, record: Dict[str, Any], error: Any):
+        """Sink failure handler: send a rejected row or document to the storage dead-letter topic"""
+        metrics.DB_REJECTED.labels(source).inc()
+        logger.error(f"{source} rejected a record, sending it to {self.retry_router.storage_topic}: {error}")
+        await self.retry_router.dead_letter_record(source, record, error)
+    
+    async def commit_offsets(self, lane: ConsumerLane):
+        """Periodically commit positions of events that cleared the lane's pipeline"""
+        while True:
+            await asyncio.sleep(lane.commit_interval)
+            try:
+                await self._commit_completed(lane)
+            except Exception as e:
+                # Keep committing; a dead loop would stall the lane's offsets for good
+                logger.error(f"Committing {lane.name} offsets failed: {e}")
+    
+    async def _commit_completed(self, lane: ConsumerLane):
+        # Take positions before flushing so they only cover rows in this flush
+        offsets = lane.offset_tracker.committable()
+        if not offsets:
+            return
+        
+        try:
+            await asyncio.gather(*(writer.flush() for writer in lane.writers))
+        except Exception as e:
+            metrics.FLUSH_FAILURES.inc()
+            logger.error(f"Flush failed, not committing {lane.name} offsets: {e}")
+            return
+        
+        # Partitions revoked meanwhile belong to another member now
+        assigned = lane.consumer.assignment()
+        offsets = {tp: position for tp, position in offsets.items() if tp in assigned}
+        if not offsets:
+            return
+        
+        try:
+            await lane.consumer.commit(offsets)
+            lane.offset_tracker.mark_committed(offsets)
+        except KafkaError as e:
+            # Partitions were reassigned (CommitFailedError) or revoked (IllegalStateError);
+            # the new owner will reprocess. Others are retried on the next tick.
+            logger.warning(f"Offset commit failed for {lane.name} lane: {e}")
+            assigned = lane.consumer.assignment()
+            lane.offset_tracker.forget([tp for tp in offsets if tp not in assigned])
+    
+    async def _partitions_revoked(self, lane: ConsumerLane, revoked):
+        """Rebalance callback: commit what is done on revoked partitions, then drop their offsets"""
+        if lane.offset_tracker.committable():
+            await self._commit_completed(lane)
+        lane.offset_tracker.forget(revoked)
+        for tp in revoked:
+            lane.held.pop(tp, None)
+        self._forget_lag(revoked)
+    
+    async def _lag_revoked(self, revoked):
+        """Rebalance callback of the single consumer: only the lag needs dropping"""
+        self._forget_lag(revoked)
+    
+    def _forget_lag(self, partitions):
+        for tp in partitions:
+            metrics.forget_lag(tp.topic, tp.partition)
+            if self.load_shedder is not None and tp.topic == 'social-events':
+                self.load_shedder.forget_lag(tp.partition)
+    
+    async def consume_batches(self):
+        """Batched consumption loop built on getmany().
+        
+        Each fetched partition batch runs as its own task so partitions are
+        processed concurrently. Batches of the same partition are chained so
+        they never overlap, and at most max_inflight_batches run at once.
+        """
+        inflight = asyncio.Semaphore(self.max_inflight_batches)
+        partition_tails: Dict[TopicPartition, asyncio.Task] = {}
+        
+        try:
+            while True:
+                batch = await self.consumer.getmany(
+                    timeout_ms=self.fetch_timeout_ms,
+                    max_records=self.max_batch_size
+                )
+                
+                for tp, messages in batch.items():
+                    if not messages:
+                        continue
+                    
+                    await inflight.acquire()
+                    task = asyncio.create_task(
+                        self.process_partition_batch(tp, messages, partition_tails.get(tp))
+                    )
+                    task.add_done_callback(lambda _: inflight.release())
+                    partition_tails[tp] = task
+                
+                # Forget partitions whose last batch has completed; stop if one
+                # could not hand off its failed events, so they are consumed again
+                for tp in [tp for tp, task in partition_tails.items() if task.done()]:
+                    partition_tails.pop(tp).result()
+        finally:
+            if partition_tails:
+                await asyncio.gather(*partition_tails.values(), return_exceptions=True)
+    
+    async def process_partition_batch(self, tp: TopicPartition, messages: List[Any],
+                                      previous: Optional[asyncio.Task] = None):
+        """Process one partition batch and commit its offsets.
+        
+        Messages are grouped by creator: groups run concurrently while events
+        of the same creator keep their partition order.
+        """
+        if previous is not None:
+            await asyncio.wait([previous])
+            if not previous.cancelled() and previous.exception() is not None:
+                # Never commit past a batch whose failed events could not be handed off
+                raise previous.exception()
+        
+        metrics.INFLIGHT_BATCHES.inc()
+        metrics.BATCH_SIZE.observe(len(messages))
+        try:
+            await self._process_partition_batch(tp, messages)
+        finally:
+            metrics.INFLIGHT_BATCHES.dec()
+        self._record_lag(self.consumer, tp, messages[-1].offset)
+    
+    async def _process_partition_batch(self, tp: TopicPartition, messages: List[Any]):
+        groups: Dict[str, List[Any]] = {}
+        for msg in messages:
+            try:
+                start = time.perf_counter()
+                value = self.decode(msg)
+                metrics.stage_timers['decode'].observe(time.perf_counter() - start)
+            except Exception as e:
+                self._record_error(tp.topic, None)
+                await self._dead_letter_undecodable(tp.topic, msg, e)
+                continue
+            groups.setdefault(self._ordering_key(msg, value), []).append((msg, value))
+        
+        await asyncio.gather(*(self._process_in_order(group) for group in groups.values()))
+        
+        # Offsets may only move past rows that are durably written
+        try:
+            await self.flush_writers()
+        except Exception as e:
+            metrics.FLUSH_FAILURES.inc()
+            logger.error(f"Flush failed, not committing {tp.topic}[{tp.partition}]: {e}")
+            return
+        
+        if tp not in self.consumer.assignment():
+            # Partition was revoked mid-batch; the new owner will reprocess
+            logger.warning(f"{tp.topic}[{tp.partition}] was revoked, not committing its batch")
+            return
+        
+        try:
+            await self.consumer.commit({tp: messages[-1].offset + 1})
+        except (CommitFailedError, IllegalStateError) as e:
+            # Partition was reassigned mid-batch; the new owner will reprocess
+            logger.warning(f"Offset commit failed for {tp.topic}[{tp.partition}]: {e}")
+    
+    async def _process_in_order(self, messages: List[Any]):
+        """Process decoded messages sequentially, preserving their order"""
+        for msg, value in messages:
+            try:
+                await self.process_message(msg, value)
+            except Exception as e:
+                self._record_error(msg.topic, value)
+                await self._route_failure(msg.topic, value, 0, e, 'batch')
+    
+    def _record_error(self, topic: str, value: Optional[Dict[str, Any]]):
+        platform = value.get('platform') if isinstance(value, dict) else None
+        metrics.ERRORS.labels(topic, platform or 'unknown').inc()
+    
+    def _record_lag(self, consumer: AIOKafkaConsumer, tp: TopicPartition, offset: int):
+        """Update the lag gauge from the partition high watermark"""
+        highwater = consumer.highwater(tp)
+        if highwater is not None:
+            lag = max(highwater - offset - 1, 0)
+            metrics.CONSUMER_LAG.labels(tp.topic, str(tp.partition)).set(lag)
+            if self.load_shedder is not None and tp.topic == 'social-events':
+                self.load_shedder.observe_lag(tp.partition, lag)
+    
+    async def checkpoint_creator_state(self):
+        """Periodically persist per-creator aggregates"""
+        while True:
+            await asyncio.sleep(self.creator_state_checkpoint_s)
+            try:
+                saved = await self.creator_state.checkpoint(self.pg_pool)
+                if saved:
+                    logger.debug(f"Checkpointed state for {saved} creators")
+            except Exception as e:
+                logger.error(f"Creator state checkpoint failed: {e}")
+    
+    def _create_event_writer(self) -> PostgresBulkWriter:
+        if self.event_layout is not None:
+            return self._create_writer(self.event_layout.table, self.event_layout.columns)
+        return self._create_writer(
+            'raw_social_data', ('creator_id', 'platform', 'payload_json', 'created_at')
+        )
+    
+    async def maintain_partitions(self):
+        """Keep daily event partitions created ahead of time"""
+        while True:
+            await asyncio.sleep(3600)
+            try:
+                await self.event_layout.ensure_partitions(self.pg_pool)
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+    
+    def _create_writer(self, table: str, columns: tuple, max_rows: Optional[int] = None,
+                       max_delay: Optional[float] = None) -> PostgresBulkWriter:
+        writer = PostgresBulkWriter(
+            self.pg_pool, table, columns,
+            max_rows=max_rows or self.pg_batch_max_rows,
+            max_delay=max_delay if max_delay is not None else self.pg_batch_max_delay,
+            use_copy=self.pg_use_copy,
+            on_failure=partial(self._dead_letter_row, table, columns),
+            retry_attempts=self.db_retry_attempts,
+            retry_max_wait=self.db_retry_max_wait
+        )
+        writer.start()
+        self.writers.append(writer)
+        return writer
+    
+    async def flush_writers(self):
+        """Flush all buffered Postgres rows and Mongo documents"""
+        await asyncio.gather(*(writer.flush() for writer in self.writers))
+    
+    def decode(self, msg) -> Dict[str, Any]:
+        """Decode a message value according to its content-type header"""
+        return self.codec.decode(msg.value, msg.headers)
+    
+    def _ordering_key(self, msg, value: Any) -> str:
+        """Key that must be processed in order within a partition"""
+        if isinstance(value, dict) and value.get('creatorId') is not None:
+            return str(value['creatorId'])
+        return str(msg.key) if msg.key is not None else ''
+    
+    async def process_message(self, msg, value: Optional[Dict[str, Any]] = None):
         """Process individual messages based on topic"""
         topic = msg.topic
-        value = msg.value
-        
-        logger.info(f"Processing message from {topic}: {value.get('creatorId', 'unknown')}")
+        if value is None:
+            value = self.decode(msg)
         
+        self._log_message(topic, value)
         if topic == 'social-events':
             await self.process_social_event(value)
         elif topic == 'assistant-requests':
             await self.process_assistant_request(value)
     
+    def _log_message(self, topic: str, value: Any):
+        metrics.MESSAGES.labels(topic).inc()
+        skipped = self.log_sampler.sample()
+        if skipped is not None:
+            # Chat requests are any JSON value, not necessarily an object
+            creator_id = value.get('creatorId', 'unknown') if isinstance(value, dict) else 'unknown'
+            logger.info(
+                f"Processing message from {topic}: {creator_id}"
+                f" ({skipped} messages since last log)"
+            )
+    
     async def process_social_event(self, event: Dict[str, Any]):
         """Process social media events"""
-        creator_id = event['creatorId']
-        platform = event['platform']
+        start = time.perf_counter()
+        record = SocialEvent.from_dict(event)
+        pipeline_event = PipelineEvent(event, record=record)
+        await self.enrich_event(pipeline_event)
+        await self.analyze_event(pipeline_event)
+        await self.persist_event(pipeline_event)
+        await self.publish_event(pipeline_event)
+        if self.load_shedder is not None:
+            self.load_shedder.observe_latency(time.perf_counter() - start)
         
-        # Enrich social data
-        enriched_data = await self.social_processor.process(event)
+        logger.debug(f"Processed social event for creator {record.creator_id}")
+    
+    async def enrich_event(self, event: PipelineEvent):
+        """Pipeline stage: normalize the raw event and parse its text"""
+        start = time.perf_counter()
+        event.enriched, event.parsed = await self.social_processor.process_with_content(event.record)
+        metrics.stage_timers['social_processing'].observe(time.perf_counter() - start)
+    
+    async def analyze_event(self, event: PipelineEvent):
+        """Pipeline stage: content analysis and signal extraction"""
+        timers = metrics.stage_timers
+        clock = time.perf_counter
+        enriched, parsed = event.enriched, event.parsed
+        content = enriched.content
         
-        # Analyze content if applicable
-        if 'content' in enriched_data:
-            content_analysis = await self.content_analyzer.analyze(enriched_data['content'])
-            enriched_data['analysis'] = content_analysis
+        # Reuse the analysis of identical text (e.g. metric-only updates)
+        has_content = content is not None
+        content_analysis = self._cached_analysis(content) if has_content else None
         
-        # Extract signals
-        signals = await self.signal_extractor.extract(enriched_data)
+        # Near-copies of a recent post (cross-posts, reposts) reuse its analysis
+        if has_content and self.near_duplicates is not None:
+            start = clock()
+            record = enriched.event
+            duplicate = self.near_duplicates.check(
+                parsed if parsed is not None else ParsedContent(content),
+                record.creator_id, record.platform, record.data.get('id')
+            )
+            timers['near_duplicate'].observe(clock() - start)
+            if duplicate is not None:
+                enriched.duplicate_of = duplicate.to_signal()
+                metrics.NEAR_DUPLICATES.inc()
+                if content_analysis is None:
+                    content_analysis = duplicate.analysis
+        
+        # Metrics-only tier while shedding load; the backfill analyzes the event later
+        if (has_content and content_analysis is None and self.load_shedder is not None
+                and not self.load_shedder.should_analyze(enriched)):
+            has_content = False
+            enriched.analysis_deferred = True
+            metrics.DEFERRED_ANALYSES.inc()
+        
+        if self.analysis_pool and has_content and content_analysis is None:
+            # Analyze content and extract signals in the worker pool
+            start = clock()
+            content_analysis, signals = await self.analysis_pool.submit(enriched, parsed)
+            timers['analysis_pool'].observe(clock() - start)
+            
+            # The sentiment model batches across events in this process, not in the workers
+            scored = True
+            if content_analysis and self.sentiment_backend is not None:
+                start = clock()
+                scored = await self.content_analyzer.apply_sentiment_backend(
+                    content_analysis, parsed.text if parsed is not None else content
+                )
+                timers['sentiment_model'].observe(clock() - start)
+            enriched.analysis = content_analysis
+            if scored:
+                self._cache_analysis(enriched, content_analysis)
+            
+            # Workers only see part of the stream; trends and creator state are shared here
+            self.signal_extractor.update_stream_signals(signals, enriched, parsed)
+        else:
+            # Analyze content if applicable
+            if has_content:
+                if content_analysis is None:
+                    start = clock()
+                    content_analysis = self.content_analyzer.analyze_sync(content, parsed)
+                    scored = await self.content_analyzer.apply_sentiment_backend(
+                        content_analysis, parsed.text if parsed is not None else content
+                    )
+                    timers['content_analysis'].observe(clock() - start)
+                    # Keyword fallbacks of the sentiment model are not reused once it is ready
+                    if scored:
+                        self._cache_analysis(enriched, content_analysis)
+                enriched.analysis = content_analysis
+            
+            # Extract signals
+            start = clock()
+            signals = await self.signal_extractor.extract(enriched, parsed)
+            timers['signal_extraction'].observe(clock() - start)
+        
+        event.signals = signals
+    
+    async def persist_event(self, event: PipelineEvent):
+        """Pipeline stage: buffer the enriched event for the bulk writers"""
+        timers = metrics.stage_timers
+        clock = time.perf_counter
+        record, enriched = event.record, event.enriched
         
-        # Store in PostgreSQL
-        async with self.pg_pool.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO raw_social_data (creator_id, platform, payload_json, created_at)
-                VALUES ($1, $2, $3, NOW())
-            """, creator_id, platform, json.dumps(enriched_data))
+        # Store in PostgreSQL (buffered, written in bulk)
+        start = clock()
+        enriched_data = None
+        if self.event_layout is not None:
+            row = self.event_layout.row(record, enriched, event.signals, datetime.now(timezone.utc))
+            size = len(row[-1])
+        else:
+            enriched_data = enriched.to_dict()
+            event.payload_json = self.codec.json.encode_text(enriched_data)
+            row = (record.creator_id, record.platform, event.payload_json, datetime.utcnow())
+            size = len(event.payload_json)
+        await self.social_writer.add(row)
+        timers['pg_write'].observe(clock() - start)
         
-        # Store in MongoDB if enabled
+        # Store in MongoDB if enabled (buffered, written in bulk)
         if self.use_mongo:
-            await self.mongo_db.interactions.insert_one({
-                'creator_id': creator_id,
-                'platform': platform,
-                'enriched_data': enriched_data,
-                'signals': signals,
-                'timestamp': event['timestamp']
-            })
-        
-        # Publish enrichment results
-        await self.producer.send('enrichment-results', {
-            'creatorId': creator_id,
-            'platform': platform,
-            'signals': signals,
-            'timestamp': event['timestamp']
-        })
-        
-        logger.info(f"Processed social event for creator {creator_id}")
+            start = clock()
+            document = {
+                'creator_id': record.creator_id,
+                'platform': record.platform,
+                'signals': event.signals.to_dict(),
+                'timestamp': record.timestamp
+            }
+            if enriched.analysis_deferred:
+                document['analysis_deferred'] = True
+            # The compact layout already keeps the raw event in Postgres
+            if enriched_data is not None:
+                document['enriched_data'] = enriched_data
+            await self.interaction_writer.add(document, size=size)
+            timers['mongo_write'].observe(clock() - start)
+    
+    async def publish_event(self, event: PipelineEvent):
+        """Pipeline stage: publish enrichment results"""
+        record = event.record
+        start = time.perf_counter()
+        if self.window_aggregator is not None:
+            self.window_aggregator.add(str(record.creator_id), record.platform, event.signals)
+        if not self.publish_event_results:
+            metrics.stage_timers['publish'].observe(time.perf_counter() - start)
+            return
+        
+        result = {
+            'creatorId': record.creator_id,
+            'platform': record.platform,
+            'signals': event.signals.to_dict(),
+            'timestamp': record.timestamp
+        }
+        # Content signals are defaults until the event is analyzed
+        if event.enriched.analysis_deferred:
+            result['analysisDeferred'] = True
+        payload, headers = self.codec.encode(result)
+        await self.producer.send('enrichment-results', payload, headers=headers)
+        metrics.stage_timers['publish'].observe(time.perf_counter() - start)
+    
+    async def publish_aggregates(self):
+        """Publish per-creator rollups as their windows close"""
+        slide = self.window_aggregator.slide
+        while True:
+            await asyncio.sleep(slide - time.time() % slide)
+            try:
+                await self._send_aggregates(self.window_aggregator.due())
+            except Exception as e:
+                logger.error(f"Failed to publish creator aggregates: {e}")
+    
+    async def _send_aggregates(self, records: List[Dict[str, Any]]):
+        for record in records:
+            payload, headers = self.codec.encode(record)
+            await self.producer.send(
+                self.aggregation_topic, payload, key=record['creatorId'].encode(), headers=headers
+            )
+        if records:
+            logger.debug(f"Published {len(records)} creator aggregates")
+    
+    def _cached_analysis(self, content: str) -> Optional[Dict[str, Any]]:
+        if self.analysis_cache is None or not content:
+            return None
+        return self.analysis_cache.get(content)
+    
+    def _cache_analysis(self, enriched: EnrichedEvent, analysis: Optional[Dict[str, Any]]):
+        content = enriched.content
+        if self.analysis_cache is not None and content and analysis:
+            self.analysis_cache.put(content, analysis)
+        if self.near_duplicates is not None and analysis:
+            record = enriched.event
+            self.near_duplicates.set_analysis(record.platform, record.data.get('id'), analysis)
+    
+    async def chat_event(self, event: PipelineEvent):
+        """Chat lane stage: record the assistant request"""
+        start = time.perf_counter()
+        await self.process_assistant_request(event.value)
+        metrics.stage_timers['chat_write'].observe(time.perf_counter() - start)
     
     async def process_assistant_request(self, request: Dict[str, Any]):
         """Process assistant chat requests"""
@@ -139,29 +1051,67 @@ class EventConsumer:
         # For now, just log - actual Claude integration would go here
         logger.info(f"Assistant request from {creator_id}: {message}")
         
-        # Store chat memory
-        async with self.pg_pool.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO chat_memory (creator_id, ts, role, content)
-                VALUES ($1, NOW(), 'user', $2)
-            """, creator_id, message)
+        # Store chat memory (buffered, written in bulk)
+        await self.chat_writer.add((creator_id, datetime.utcnow(), 'user', message))
+    
+    def _kafka_consumers(self) -> List[AIOKafkaConsumer]:
+        consumers = [lane.consumer for lane in self.lanes if lane.consumer is not None]
+        return consumers + ([self.consumer] if self.consumer else [])
     
     async def stop(self):
         """Cleanup connections"""
         logger.info("Stopping consumer...")
         
-        if self.consumer:
-            await self.consumer.stop()
+        for consumer in self._kafka_consumers():
+            await consumer.stop()
+        if self.aggregation_task:
+            self.aggregation_task.cancel()
+            try:
+                # Windows still open cover events whose offsets are already committed
+                await self._send_aggregates(self.window_aggregator.flush())
+            except Exception as e:
+                logger.error(f"Failed to publish open aggregation windows: {e}")
         if self.producer:
             await self.producer.stop()
+        for writer in self.writers:
+            try:
+                await writer.close()
+            except Exception as e:
+                logger.error(f"Failed to flush {writer.name} on shutdown: {e}")
+        if self.partition_task:
+            self.partition_task.cancel()
+        if self.checkpoint_task:
+            self.checkpoint_task.cancel()
+            try:
+                await self.creator_state.checkpoint(self.pg_pool)
+            except Exception as e:
+                logger.error(f"Failed to checkpoint creator state on shutdown: {e}")
         if self.pg_pool:
             await self.pg_pool.close()
+        if self.analysis_pool:
+            await self.analysis_pool.close()
+        if self.sentiment_backend:
+            await self.sentiment_backend.close()
+        if self.shared_cache:
+            await self.shared_cache.close()
         if self.mongo_client:
             self.mongo_client.close()
 
+async def serve(consumer: EventConsumer, signals: Tuple[int, ...] = (signal.SIGTERM, signal.SIGINT)):
+    """Run a consumer until one of signals arrives, then drain in-flight events and stop"""
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(consumer.start())
+    for sig in signals:
+        loop.add_signal_handler(sig, task.cancel)
+    
+    try:
+        await task
+    except asyncio.CancelledError:
+        logger.info("Consumer shut down")
+
 def main():
     consumer = EventConsumer()
-    asyncio.run(consumer.start())
+    asyncio.run(serve(consumer))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
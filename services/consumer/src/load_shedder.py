@@ -0,0 +1,99 @@
+import random
+import time
+from typing import Dict, Optional, Tuple
+from loguru import logger
+from . import metrics
+from .processors.creator_state import CreatorStateStore
+from .records import EnrichedEvent
+
+class LoadShedder:
+    """Degrade to metrics-only processing of low-reach events while the consumer falls behind.
+    
+    Consumer lag (summed over the partitions this process reads) and an
+    EWMA of per-event latency are compared with high and low watermarks.
+    Crossing either high mark starts shedding; it stops once both are back
+    under their low marks and min_hold seconds have passed, so the mode
+    doesn't flap around a threshold. A threshold of 0 disables that check.
+    
+    While shedding, events whose reach - or their creator's average reach -
+    is below min_reach skip content analysis, except a sample_rate fraction
+    of them. Their signals are computed from metrics alone and they are
+    stored marked analysis_deferred, for the backfill to complete later.
+    """
+    
+    def __init__(self, lag_high: int = 50000, lag_low: int = 5000, latency_high: float = 2.0,
+                 latency_low: float = 0.5, min_reach: float = 10000, sample_rate: float = 0.05,
+                 min_hold: float = 30, creator_state: Optional[CreatorStateStore] = None,
+                 latency_alpha: float = 0.05, lag_ttl: float = 30):
+        self.lag_high = lag_high
+        self.lag_low = lag_low
+        self.latency_high = latency_high
+        self.latency_low = latency_low
+        self.min_reach = min_reach
+        self.sample_rate = sample_rate
+        self.min_hold = min_hold
+        self.creator_state = creator_state
+        self.latency_alpha = latency_alpha
+        self.lag_ttl = lag_ttl
+        
+        self.active = False
+        self.latency = 0.0
+        self._lags: Dict[int, Tuple[int, float]] = {}
+        self._since = 0.0
+    
+    @property
+    def lag(self) -> int:
+        """Lag of the partitions reported within the last lag_ttl seconds (others stopped reporting)"""
+        cutoff = time.monotonic() - self.lag_ttl
+        return sum(lag for lag, seen in self._lags.values() if seen >= cutoff)
+    
+    def observe_lag(self, partition: int, lag: int):
+        self._lags[partition] = (lag, time.monotonic())
+        self._update()
+    
+    def forget_lag(self, partition: int):
+        """Stop counting a partition this process no longer reads"""
+        self._lags.pop(partition, None)
+        self._update()
+    
+    def observe_latency(self, seconds: float):
+        self.latency += self.latency_alpha * (seconds - self.latency)
+        self._update()
+    
+    def should_analyze(self, enriched: EnrichedEvent) -> bool:
+        """False if the event should get metrics-only signals for now"""
+        if not self.active or self.reach(enriched) >= self.min_reach:
+            return True
+        return random.random() < self.sample_rate
+    
+    def reach(self, enriched: EnrichedEvent) -> float:
+        counters = enriched.metrics
+        reach = max(counters.get('reach') or counters.get('impressions') or 0, counters.get('views') or 0)
+        if self.creator_state is not None:
+            event = enriched.event
+            stats = self.creator_state.get(str(event.creator_id), event.platform)
+            if stats is not None:
+                reach = max(reach, stats.ewma_reach)
+        return reach
+    
+    def _update(self):
+        now = time.monotonic()
+        if not self.active:
+            if self._over(self.lag_high, self.latency_high):
+                self.active = True
+                self._since = now
+                metrics.LOAD_SHEDDING.set(1)
+                logger.warning(
+                    f"Shedding load: lag {self.lag}, latency {self.latency * 1000:.0f}ms; "
+                    f"deferring analysis of events below reach {self.min_reach:g}"
+                )
+        elif now - self._since >= self.min_hold and not self._over(self.lag_low, self.latency_low):
+            self.active = False
+            metrics.LOAD_SHEDDING.set(0)
+            logger.info(
+                f"Caught up after {now - self._since:.0f}s (lag {self.lag}, "
+                f"latency {self.latency * 1000:.0f}ms); back to full processing"
+            )
+    
+    def _over(self, lag: int, latency: float) -> bool:
+        return (lag > 0 and self.lag > lag) or (latency > 0 and self.latency > latency)
@@ -0,0 +1,86 @@
+import time
+from typing import Optional
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from loguru import logger
+
+# Pipeline stages timed per event
+STAGES = (
+    'decode', 'social_processing', 'near_duplicate', 'content_analysis', 'signal_extraction',
+    'analysis_pool', 'sentiment_model', 'pg_write', 'mongo_write', 'publish', 'chat_write'
+)
+
+STAGE_SECONDS = Histogram(
+    'consumer_stage_seconds',
+    'Time spent in each pipeline stage per event',
+    ['stage'],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+             0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+EVENT_SECONDS = Histogram(
+    'consumer_event_seconds',
+    'Time from admission to leaving the pipeline, per consumption lane',
+    ['lane'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+MESSAGES = Counter('consumer_messages_total', 'Messages processed', ['topic'])
+ERRORS = Counter('consumer_errors_total', 'Messages that failed processing', ['topic', 'platform'])
+
+# Gauges are summed across live worker processes under the supervisor
+CONSUMER_LAG = Gauge('consumer_lag_messages', 'Messages behind the partition high watermark',
+                     ['topic', 'partition'], multiprocess_mode='livesum')
+INFLIGHT_BATCHES = Gauge('consumer_inflight_batches', 'Partition batches being processed',
+                         multiprocess_mode='livesum')
+
+BATCH_SIZE = Histogram('consumer_batch_size', 'Messages per partition batch',
+                       buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500))
+FLUSH_FAILURES = Counter('consumer_flush_failures_total', 'Failed sink flushes before an offset commit')
+STAGE_QUEUE_DEPTH = Gauge('consumer_stage_queue_depth', 'Events queued in front of each pipeline stage',
+                          ['lane', 'stage'], multiprocess_mode='livesum')
+PIPELINE_INFLIGHT = Gauge('consumer_pipeline_inflight', 'Events admitted to the pipeline and not yet done',
+                          ['lane'], multiprocess_mode='livesum')
+PARTITIONS_PAUSED = Gauge('consumer_partitions_paused', 'Consumers with fetching paused by backpressure',
+                          ['lane'], multiprocess_mode='livesum')
+FAILED_EVENTS = Counter('consumer_failed_events_total', 'Failed events handed to a retry or dead-letter topic',
+                        ['topic'])
+LOAD_SHEDDING = Gauge('consumer_load_shedding', 'Consumers deferring analysis of low-reach events',
+                      multiprocess_mode='livesum')
+DEFERRED_ANALYSES = Counter('consumer_deferred_analyses_total',
+                            'Events given metrics-only signals while shedding load')
+NEAR_DUPLICATES = Counter('consumer_near_duplicates_total',
+                          'Events whose text nearly repeats a recent post')
+DB_REJECTED = Counter('consumer_db_rejected_total', 'Rows or documents rejected by a sink and dead-lettered',
+                      ['sink'])
+
+# Pre-bound children keep label lookups off the hot path
+stage_timers = {stage: STAGE_SECONDS.labels(stage) for stage in STAGES}
+
+def forget_lag(topic: str, partition: int):
+    """Drop a revoked partition's lag, so it isn't summed with the new owner's"""
+    # Under the supervisor, remove() leaves the last value in this process's file; zero it first
+    CONSUMER_LAG.labels(topic, str(partition)).set(0)
+    CONSUMER_LAG.remove(topic, str(partition))
+
+def start_metrics_server(port: int):
+    """Serve /metrics for Prometheus; port 0 disables the endpoint"""
+    if port:
+        start_http_server(port)
+        logger.info(f"Metrics endpoint listening on :{port}")
+
+class LogSampler:
+    """Let through at most one log line per interval and count the rest"""
+    
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._next = 0.0
+        self._skipped = 0
+    
+    def sample(self) -> Optional[int]:
+        """Number of lines skipped since the last one, or None to skip this one"""
+        now = time.monotonic()
+        if now < self._next:
+            self._skipped += 1
+            return None
+        
+        self._next = now + self.interval
+        skipped, self._skipped = self._skipped, 0
+        return skipped
@@ -0,0 +1,266 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from aiokafka import TopicPartition
+from aiokafka.abc import ConsumerRebalanceListener
+from loguru import logger
+from .records import EnrichedEvent, Signals, SocialEvent
+
+class PipelineEvent:
+    """One consumed event and the state accumulated as it moves through the stages.
+    
+    Events read back from a retry topic carry the topic they first came
+    from, how many times they have failed and when they are due again.
+    Social events also carry their validated record, which the stages
+    read instead of the decoded value.
+    """
+    
+    __slots__ = ('value', 'tp', 'offset', 'key', 'admitted_at', 'origin', 'attempt', 'due',
+                 'record', 'enriched', 'parsed', 'signals', 'payload_json')
+    
+    def __init__(self, value: Dict[str, Any], tp: Optional[TopicPartition] = None,
+                 offset: int = -1, key: str = '', origin: Optional[str] = None,
+                 attempt: int = 0, due: float = 0.0, record: Optional[SocialEvent] = None):
+        self.value = value
+        self.tp = tp
+        self.offset = offset
+        self.key = key
+        self.admitted_at = time.perf_counter()
+        self.origin = origin or (tp.topic if tp is not None else None)
+        self.attempt = attempt
+        self.due = due
+        self.record = record
+        self.enriched: Optional[EnrichedEvent] = None
+        self.parsed = None
+        self.signals: Optional[Signals] = None
+        self.payload_json: Optional[str] = None
+    
+    @property
+    def topic(self) -> Optional[str]:
+        return self.tp.topic if self.tp is not None else None
+
+# A stage handler returns False when the event needs no further stages
+StageHandler = Callable[[PipelineEvent], Awaitable[Optional[bool]]]
+
+class Stage:
+    """One pipeline step run by `concurrency` workers.
+    
+    Each worker owns a bounded queue and events are routed to workers by
+    key, so events with the same key are handled one at a time and in order
+    at every stage. A full queue blocks the upstream stage.
+    """
+    
+    def __init__(self, name: str, handler: StageHandler, concurrency: int = 1, queue_size: int = 100):
+        self.name = name
+        self.handler = handler
+        self.queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(max(concurrency, 1))
+        ]
+    
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self.queues)
+    
+    @property
+    def capacity(self) -> int:
+        """Events the stage holds before blocking upstream: its queues plus one per worker"""
+        return sum(queue.maxsize + 1 for queue in self.queues)
+    
+    async def put(self, event: PipelineEvent):
+        await self.queues[hash(event.key) % len(self.queues)].put(event)
+
+class Pipeline:
+    """Stages connected by bounded queues.
+    
+    submit() hands an event to the first stage; each stage passes it on to
+    the next, and on_done is called once it leaves the pipeline, whether it
+    went through every stage, stopped early or failed. A failed event is
+    first given to on_error; if that raises too, the event leaves without
+    on_done, so its offset is never committed and it is consumed again
+    after a restart or rebalance. Callers watch
+    `saturated` to stop fetching once max_inflight events are admitted, and
+    resume once `has_capacity` (half of that has drained).
+    """
+    
+    def __init__(self, stages: List[Stage], on_done: Callable[[PipelineEvent], None],
+                 on_error: Callable[[PipelineEvent, Stage, Exception], Awaitable[None]],
+                 max_inflight: int = 1000):
+        self.stages = stages
+        self.on_done = on_done
+        self.on_error = on_error
+        self.max_inflight = max_inflight
+        
+        self.inflight = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._workers: List[asyncio.Task] = []
+    
+    @property
+    def saturated(self) -> bool:
+        return self.inflight >= self.max_inflight
+    
+    @property
+    def has_capacity(self) -> bool:
+        return self.inflight <= self.max_inflight // 2
+    
+    def start(self):
+        """Start the workers of every stage"""
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            for queue in stage.queues:
+                self._workers.append(asyncio.create_task(self._work(stage, queue, next_stage)))
+    
+    async def submit(self, event: PipelineEvent):
+        """Admit an event; blocks while the first stage's queue is full"""
+        self.inflight += 1
+        self._drained.clear()
+        await self.stages[0].put(event)
+    
+    async def drain(self):
+        """Wait until every admitted event has left the pipeline"""
+        await self._drained.wait()
+    
+    async def stop(self):
+        """Cancel the workers; events still queued are dropped"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+    
+    async def _work(self, stage: Stage, queue: asyncio.Queue, next_stage: Optional[Stage]):
+        while True:
+            event = await queue.get()
+            try:
+                proceed = await stage.handler(event) is not False
+            except Exception as e:
+                proceed = False
+                try:
+                    await self.on_error(event, stage, e)
+                except Exception as handler_error:
+                    logger.critical(
+                        f"Could not hand off failed event {event.topic}@{event.offset}, "
+                        f"holding back its offset: {handler_error}"
+                    )
+                    self._complete(event, done=False)
+                    continue
+            
+            if proceed and next_stage is not None:
+                await next_stage.put(event)
+            else:
+                self._complete(event)
+    
+    def _complete(self, event: PipelineEvent, done: bool = True):
+        self.inflight -= 1
+        if self.inflight == 0:
+            self._drained.set()
+        if not done:
+            return
+        try:
+            self.on_done(event)
+        except Exception as e:
+            logger.error(f"Pipeline completion callback failed: {e}")
+
+class OffsetTracker:
+    """Committable positions per partition for out-of-order completion.
+    
+    Offsets are tracked in the order they were consumed; a partition's
+    position only advances past an offset once it and every earlier offset
+    have completed.
+    """
+    
+    def __init__(self):
+        self._pending: Dict[TopicPartition, Deque[int]] = {}
+        self._completed: Dict[TopicPartition, Set[int]] = {}
+        self._positions: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+    
+    def track(self, tp: TopicPartition, offset: int):
+        self._pending.setdefault(tp, deque()).append(offset)
+    
+    def complete(self, tp: TopicPartition, offset: int):
+        pending = self._pending.get(tp)
+        if not pending:
+            return
+        
+        completed = self._completed.setdefault(tp, set())
+        completed.add(offset)
+        while pending and pending[0] in completed:
+            completed.discard(pending[0])
+            self._positions[tp] = pending.popleft() + 1
+    
+    def committable(self) -> Dict[TopicPartition, int]:
+        """Positions that moved since the last mark_committed()"""
+        return {
+            tp: position for tp, position in self._positions.items()
+            if position > self._committed.get(tp, -1)
+        }
+    
+    def mark_committed(self, offsets: Dict[TopicPartition, int]):
+        for tp, position in offsets.items():
+            self._committed[tp] = max(position, self._committed.get(tp, -1))
+    
+    def forget(self, partitions):
+        """Drop state for partitions that are no longer assigned"""
+        for tp in partitions:
+            for state in (self._pending, self._completed, self._positions, self._committed):
+                state.pop(tp, None)
+
+class RevocationListener(ConsumerRebalanceListener):
+    """Rebalance listener that hands revoked partitions to on_revoked.
+    
+    on_revoked runs before the partitions are reassigned, so it can still
+    commit their completed offsets before dropping their tracked state.
+    """
+    
+    def __init__(self, on_revoked: Callable[[Set[TopicPartition]], Awaitable[None]]):
+        self.on_revoked = on_revoked
+    
+    async def on_partitions_revoked(self, revoked):
+        await self.on_revoked(set(revoked))
+    
+    async def on_partitions_assigned(self, assigned):
+        pass
+
+class ConsumerLane:
+    """Topics consumed by their own Kafka consumer, pipeline and commit loop.
+    
+    Lanes share no queues, fetches or flushes, so a backlog on one lane
+    never delays events on another. Only `writers` are flushed before the
+    lane commits.
+    
+    On a delayed lane (retry topics), a partition whose next message is not
+    due yet is paused at that message and listed in `held` with its due
+    time, so the lane keeps polling while it waits.
+    
+    max_inflight must fit in the stages (queues plus workers); otherwise
+    a full first stage would block the fetch loop before the partitions
+    are paused. By default (0) it leaves room for one more fetched batch.
+    """
+    
+    def __init__(self, name: str, topics: Tuple[str, ...], stages: List[Stage], writers: List[Any],
+                 max_inflight: int = 0, max_batch_size: int = 500, fetch_timeout_ms: int = 100,
+                 commit_interval: float = 0.5, delayed: bool = False):
+        capacity = sum(stage.capacity for stage in stages)
+        if not max_inflight:
+            max_inflight = max(capacity - max_batch_size, 1)
+        elif max_inflight > capacity:
+            raise ValueError(
+                f"{name} lane: max_inflight {max_inflight} exceeds what its stages hold ({capacity}); "
+                f"lower it or raise the queue sizes or worker counts"
+            )
+        
+        self.name = name
+        self.topics = topics
+        self.stages = stages
+        self.writers = writers
+        self.max_inflight = max_inflight
+        self.max_batch_size = max_batch_size
+        self.fetch_timeout_ms = fetch_timeout_ms
+        self.commit_interval = commit_interval
+        self.delayed = delayed
+        
+        self.held: Dict[TopicPartition, float] = {}
+        self.consumer = None
+        self.pipeline: Optional[Pipeline] = None
+        self.offset_tracker = OffsetTracker()
@@ -0,0 +1,66 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class AnalysisCache:
+    """LRU + TTL memo of ContentAnalyzer results keyed by a content hash.
+    
+    The same post is re-sent every time its metrics change, with identical
+    text, so its analysis can be reused. Only a 16-byte digest of the text
+    is kept as the key, and at most max_entries results are held. Cached
+    results are shared between events and must be treated as read-only.
+    """
+    
+    def __init__(self, max_entries: int = 20000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        
+        self._entries: 'OrderedDict[bytes, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def key(content: str) -> bytes:
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+    
+    def get(self, content: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis for this content, if present and fresh"""
+        key = self.key(content)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def put(self, content: str, analysis: Dict[str, Any]):
+        key = self.key(content)
+        self._entries[key] = (time.monotonic() + self.ttl, analysis)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate
+        }
@@ -1,55 +1,82 @@
-from typing import Dict, Any, List
-import asyncio
-from loguru import logger
+from typing import Dict, Any, List, Optional
 import re
 from collections import Counter
+from .keyword_matcher import KeywordMatcher
+from .parsed_content import ParsedContent
+from .sentiment import SentimentBackend
+
+CAPITALIZED_PHRASE_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b')
 
 class ContentAnalyzer:
     """Analyze content for insights and signals"""
     
-    def __init__(self):
+    def __init__(self, sentiment_backend: Optional[SentimentBackend] = None):
         self.sentiment_keywords = {
             'positive': ['amazing', 'love', 'great', 'awesome', 'excellent', 'fantastic', 'wonderful', 'brilliant'],
             'negative': ['bad', 'hate', 'terrible', 'awful', 'horrible', 'worst', 'disappointed', 'poor'],
             'neutral': ['okay', 'fine', 'average', 'normal', 'decent', 'fair', 'moderate']
         }
+        self.known_brands = ['nike', 'apple', 'google', 'amazon', 'microsoft', 'coca-cola', 'pepsi']
+        self.cta_phrases = ['click', 'share', 'comment', 'like', 'follow', 'subscribe']
+        
+        # Every keyword table is matched in a single pass over the content
+        self.keyword_matcher = KeywordMatcher({
+            **self.sentiment_keywords,
+            'brands': self.known_brands,
+            'cta': self.cta_phrases
+        })
+        
+        # Optional model that replaces the keyword sentiment when it can answer in time
+        self.sentiment_backend = sentiment_backend
     
-    async def analyze(self, content: str) -> Dict[str, Any]:
+    async def analyze(self, content: str, parsed: Optional[ParsedContent] = None) -> Dict[str, Any]:
         """Analyze content for various signals"""
+        analysis = self.analyze_sync(content, parsed)
+        await self.apply_sentiment_backend(analysis, parsed.text if parsed is not None else content)
+        return analysis
+    
+    async def apply_sentiment_backend(self, analysis: Dict[str, Any], content: str) -> bool:
+        """Replace the keyword sentiment with the backend's, if it has one in time.
+        
+        Returns False when the backend fell back to keywords (model loading,
+        overloaded or too slow); such an analysis shouldn't be memoized.
+        """
+        if self.sentiment_backend is None or not analysis:
+            return True
+        
+        sentiment = await self.sentiment_backend.score(content)
+        if sentiment is None:
+            return False
+        analysis['sentiment'] = sentiment
+        return True
+    
+    def analyze_sync(self, content: str, parsed: Optional[ParsedContent] = None) -> Dict[str, Any]:
+        """Synchronous analysis, safe to run in a worker thread or process.
+        
+        Pass the event's ParsedContent when available so the text is not
+        tokenized again.
+        """
         if not content:
             return {}
         
-        # Run analyses concurrently
-        results = await asyncio.gather(
-            self._analyze_sentiment(content),
-            self._analyze_topics(content),
-            self._analyze_entities(content),
-            self._analyze_engagement_potential(content)
-        )
+        if parsed is None:
+            parsed = ParsedContent(content)
+        keyword_hits = self.keyword_matcher.scan(parsed.lower)
         
         return {
-            'sentiment': results[0],
-            'topics': results[1],
-            'entities': results[2],
-            'engagement_potential': results[3],
-            'content_length': len(content),
-            'word_count': len(content.split())
+            'sentiment': self._analyze_sentiment(parsed, keyword_hits),
+            'topics': self._analyze_topics(parsed),
+            'entities': self._analyze_entities(parsed, keyword_hits),
+            'engagement_potential': self._analyze_engagement_potential(parsed, keyword_hits),
+            'content_length': len(parsed.text),
+            'word_count': parsed.word_count
         }
     
-    async def _analyze_sentiment(self, content: str) -> Dict[str, Any]:
+    def _analyze_sentiment(self, parsed: ParsedContent, keyword_hits: Dict[int, int]) -> Dict[str, Any]:
         """Basic sentiment analysis"""
-        content_lower = content.lower()
-        
-        scores = {
-            'positive': 0,
-            'negative': 0,
-            'neutral': 0
-        }
-        
         # Count sentiment keywords
-        for sentiment, keywords in self.sentiment_keywords.items():
-            for keyword in keywords:
-                scores[sentiment] += content_lower.count(keyword)
+        group_counts = self.keyword_matcher.group_counts(keyword_hits)
+        scores = {sentiment: group_counts[sentiment] for sentiment in self.sentiment_keywords}
         
         # Determine overall sentiment
         total_score = sum(scores.values())
@@ -66,24 +93,23 @@ class ContentAnalyzer:
             'scores': scores
         }
     
-    async def _analyze_topics(self, content: str) -> List[str]:
+    def _analyze_topics(self, parsed: ParsedContent) -> List[str]:
         """Extract main topics from content"""
         # Simple topic extraction based on capitalized words and hashtags
         topics = []
         
-        # Extract hashtags
-        hashtags = re.findall(r'#\w+', content)
-        topics.extend([tag[1:].lower() for tag in hashtags])
+        # Hashtags
+        topics.extend([tag[1:].lower() for tag in parsed.hashtags])
         
         # Extract capitalized phrases (potential topics)
-        capitalized = re.findall(r'\b[A-Z][a-z]+(?:\s[A-Z][a-z]+)*\b', content)
+        capitalized = CAPITALIZED_PHRASE_PATTERN.findall(parsed.text)
         topics.extend([phrase.lower() for phrase in capitalized if len(phrase) > 3])
         
         # Count frequency and return top topics
         topic_counts = Counter(topics)
         return [topic for topic, _ in topic_counts.most_common(5)]
     
-    async def _analyze_entities(self, content: str) -> Dict[str, List[str]]:
+    def _analyze_entities(self, parsed: ParsedContent, keyword_hits: Dict[int, int]) -> Dict[str, List[str]]:
         """Extract entities from content"""
         entities = {
             'mentions': [],
@@ -91,48 +117,37 @@ class ContentAnalyzer:
             'brands': []
         }
         
-        # Extract mentions
-        mentions = re.findall(r'@\w+', content)
-        entities['mentions'] = list(set(mentions))
-        
-        # Extract links
-        links = re.findall(r'https?://[^\s]+', content)
-        entities['links'] = list(set(links))
+        # Mentions and links
+        entities['mentions'] = list(set(parsed.mentions))
+        entities['links'] = list(set(parsed.links))
         
         # Simple brand detection (would use NER in production)
-        known_brands = ['nike', 'apple', 'google', 'amazon', 'microsoft', 'coca-cola', 'pepsi']
-        content_lower = content.lower()
-        for brand in known_brands:
-            if brand in content_lower:
-                entities['brands'].append(brand)
+        entities['brands'] = self.keyword_matcher.matches(keyword_hits, 'brands')
         
         return entities
     
-    async def _analyze_engagement_potential(self, content: str) -> Dict[str, Any]:
+    def _analyze_engagement_potential(self, parsed: ParsedContent, keyword_hits: Dict[int, int]) -> Dict[str, Any]:
         """Estimate engagement potential"""
         score = 0
         factors = []
         
         # Questions tend to get more engagement
-        if '?' in content:
+        if '?' in parsed.text:
             score += 20
             factors.append('contains_question')
         
         # Emojis increase engagement
-        emoji_count = len(re.findall(r'[\U0001F600-\U0001F64F]', content))
-        if emoji_count > 0:
-            score += min(emoji_count * 5, 25)
+        if parsed.emoji_count > 0:
+            score += min(parsed.emoji_count * 5, 25)
             factors.append('contains_emojis')
         
         # Call to action
-        cta_phrases = ['click', 'share', 'comment', 'like', 'follow', 'subscribe']
-        if any(phrase in content.lower() for phrase in cta_phrases):
+        if self.keyword_matcher.has_match(keyword_hits, 'cta'):
             score += 15
             factors.append('has_cta')
         
         # Optimal length (not too short, not too long)
-        word_count = len(content.split())
-        if 10 <= word_count <= 50:
+        if 10 <= parsed.word_count <= 50:
             score += 10
             factors.append('optimal_length')
         
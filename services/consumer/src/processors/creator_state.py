@@ -0,0 +1,236 @@
+import math
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from loguru import logger
+
+CreatorKey = Tuple[str, str]
+
+STATE_COLUMNS = (
+    'creator_id', 'platform', 'events', 'posts', 'ewma_reach', 'ewma_growth',
+    'ewma_engagement', 'var_engagement', 'last_post_at', 'ewma_interval', 'var_interval'
+)
+
+class CreatorStats:
+    """Running aggregates for one creator on one platform"""
+    
+    __slots__ = STATE_COLUMNS[2:] + ('dirty',)
+    
+    def __init__(self, events: int = 0, posts: int = 0, ewma_reach: float = 0.0,
+                 ewma_growth: float = 0.0, ewma_engagement: float = 0.0, var_engagement: float = 0.0,
+                 last_post_at: Optional[float] = None, ewma_interval: float = 0.0,
+                 var_interval: float = 0.0):
+        self.events = events
+        self.posts = posts
+        self.ewma_reach = ewma_reach
+        self.ewma_growth = ewma_growth
+        self.ewma_engagement = ewma_engagement
+        self.var_engagement = var_engagement
+        self.last_post_at = last_post_at
+        self.ewma_interval = ewma_interval
+        self.var_interval = var_interval
+        self.dirty = False
+    
+    def as_row(self, key: CreatorKey) -> tuple:
+        return key + tuple(getattr(self, column) for column in STATE_COLUMNS[2:])
+    
+    def as_dict(self) -> Dict[str, float]:
+        """Aggregates that are set, as stored in the shared cache"""
+        values = {}
+        for column in STATE_COLUMNS[2:]:
+            value = getattr(self, column)
+            if value is not None:
+                values[column] = value
+        return values
+    
+    @classmethod
+    def from_dict(cls, values: Dict[str, float]) -> 'CreatorStats':
+        stats = cls(**{column: values[column] for column in STATE_COLUMNS[2:] if column in values})
+        stats.events = int(stats.events)
+        stats.posts = int(stats.posts)
+        return stats
+
+def _ewm_update(mean: float, var: float, value: float, alpha: float) -> Tuple[float, float]:
+    """Exponentially weighted mean and variance update"""
+    diff = value - mean
+    increment = alpha * diff
+    return mean + increment, (1 - alpha) * (var + diff * increment)
+
+def _stability(mean: float, var: float) -> float:
+    """1 for a perfectly steady series, falling towards 0 as it gets noisier"""
+    if mean <= 0:
+        return 0.0
+    return 1 / (1 + math.sqrt(max(var, 0.0)) / mean)
+
+class CreatorStateStore:
+    """In-process, memory-bounded per-creator aggregates.
+    
+    Keeps EWMA reach and growth, posting cadence and engagement variance per
+    (creator, platform), updated incrementally as events arrive so signals
+    never need to query historical rows. Least recently updated creators are
+    evicted once max_creators is reached, and changed entries are
+    periodically upserted to Postgres so state survives restarts.
+    """
+    
+    def __init__(self, max_creators: int = 100000, alpha: float = 0.2, min_history: int = 3,
+                 table: str = 'creator_state'):
+        self.max_creators = max_creators
+        self.alpha = alpha
+        self.min_history = min_history
+        self.table = table
+        
+        self._stats: 'OrderedDict[CreatorKey, CreatorStats]' = OrderedDict()
+        self._evicted_dirty: Dict[CreatorKey, CreatorStats] = {}
+    
+    def __len__(self) -> int:
+        return len(self._stats)
+    
+    def get(self, creator_id: str, platform: str) -> Optional[CreatorStats]:
+        return self._stats.get((creator_id, platform))
+    
+    def update(self, creator_id: str, platform: str, reach: float, engagement: float,
+               posted_at: Optional[float] = None) -> CreatorStats:
+        """Fold one event into the creator's aggregates"""
+        key = (creator_id, platform)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._insert(key)
+        else:
+            self._stats.move_to_end(key)
+        
+        alpha = self.alpha
+        if stats.events == 0:
+            stats.ewma_reach = reach
+            stats.ewma_engagement = engagement
+        else:
+            previous_reach = stats.ewma_reach
+            stats.ewma_reach += alpha * (reach - previous_reach)
+            if previous_reach > 0:
+                growth = (stats.ewma_reach - previous_reach) / previous_reach
+                stats.ewma_growth += alpha * (growth - stats.ewma_growth)
+            stats.ewma_engagement, stats.var_engagement = _ewm_update(
+                stats.ewma_engagement, stats.var_engagement, engagement, alpha
+            )
+        stats.events += 1
+        
+        # Metric refreshes of an already seen post don't move the cadence
+        if posted_at is not None and (stats.last_post_at is None or posted_at > stats.last_post_at):
+            if stats.last_post_at is not None:
+                interval = posted_at - stats.last_post_at
+                if stats.posts == 1:
+                    stats.ewma_interval = interval
+                else:
+                    stats.ewma_interval, stats.var_interval = _ewm_update(
+                        stats.ewma_interval, stats.var_interval, interval, alpha
+                    )
+            stats.last_post_at = posted_at
+            stats.posts += 1
+        
+        stats.dirty = True
+        return stats
+    
+    def adopt(self, creator_id: str, platform: str, values: Dict[str, float]) -> CreatorStats:
+        """Replace a creator's aggregates with ones kept elsewhere (e.g. by another replica)"""
+        key = (creator_id, platform)
+        stats = CreatorStats.from_dict(values)
+        self._evicted_dirty.pop(key, None)
+        if key not in self._stats:
+            self._insert(key)
+        self._stats[key] = stats
+        self._stats.move_to_end(key)
+        return stats
+    
+    def signals(self, stats: CreatorStats) -> Dict[str, Optional[float]]:
+        """Derived audience signals; None until there is enough history"""
+        has_history = stats.events >= self.min_history
+        has_cadence = stats.posts > self.min_history
+        return {
+            'audience_growth_rate': stats.ewma_growth if has_history else None,
+            'audience_quality_score': (
+                _stability(stats.ewma_engagement, stats.var_engagement) if has_history else None
+            ),
+            'creator_consistency': (
+                _stability(stats.ewma_interval, stats.var_interval) if has_cadence else None
+            )
+        }
+    
+    def _insert(self, key: CreatorKey) -> CreatorStats:
+        if len(self._stats) >= self.max_creators:
+            evicted_key, evicted = self._stats.popitem(last=False)
+            if evicted.dirty:
+                self._evicted_dirty[evicted_key] = evicted
+        
+        stats = self._evicted_dirty.pop(key, None) or CreatorStats()
+        self._stats[key] = stats
+        return stats
+    
+    async def ensure_table(self, pool):
+        async with pool.acquire() as conn:
+            await conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    creator_id TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    events BIGINT NOT NULL,
+                    posts BIGINT NOT NULL,
+                    ewma_reach DOUBLE PRECISION NOT NULL,
+                    ewma_growth DOUBLE PRECISION NOT NULL,
+                    ewma_engagement DOUBLE PRECISION NOT NULL,
+                    var_engagement DOUBLE PRECISION NOT NULL,
+                    last_post_at DOUBLE PRECISION,
+                    ewma_interval DOUBLE PRECISION NOT NULL,
+                    var_interval DOUBLE PRECISION NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (creator_id, platform)
+                )
+            """)
+    
+    async def restore(self, pool):
+        """Load the most recently updated creators, up to max_creators"""
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                f"SELECT {', '.join(STATE_COLUMNS)} FROM {self.table} ORDER BY updated_at DESC LIMIT $1",
+                self.max_creators
+            )
+        
+        # Oldest first, so the LRU order matches the update order
+        for row in reversed(rows):
+            values = tuple(row)
+            self._stats[values[:2]] = CreatorStats(*values[2:])
+        logger.info(f"Restored state for {len(rows)} creators")
+    
+    async def checkpoint(self, pool) -> int:
+        """Upsert every entry changed since the last checkpoint"""
+        dirty = [(key, stats) for key, stats in self._stats.items() if stats.dirty]
+        dirty.extend(self._evicted_dirty.items())
+        if not dirty:
+            return 0
+        
+        rows = [stats.as_row(key) for key, stats in dirty]
+        for _, stats in dirty:
+            stats.dirty = False
+        self._evicted_dirty = {}
+        
+        placeholders = ', '.join(f'${i + 1}' for i in range(len(STATE_COLUMNS)))
+        updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in STATE_COLUMNS[2:])
+        try:
+            async with pool.acquire() as conn:
+                await conn.executemany(f"""
+                    INSERT INTO {self.table} ({', '.join(STATE_COLUMNS)})
+                    VALUES ({placeholders})
+                    ON CONFLICT (creator_id, platform) DO UPDATE SET {updates}, updated_at = NOW()
+                """, rows)
+        except Exception:
+            # Retry these rows on the next checkpoint
+            for key, stats in dirty:
+                stats.dirty = True
+                if key not in self._stats:
+                    self._evicted_dirty[key] = stats
+            raise
+        
+        return len(rows)
+
+def epoch_seconds(posted_at: Optional[datetime]) -> Optional[float]:
+    """Naive UTC event time (SocialEvent.posted_at) as epoch seconds"""
+    if posted_at is None:
+        return None
+    return posted_at.replace(tzinfo=timezone.utc).timestamp()
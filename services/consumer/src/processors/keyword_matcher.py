@@ -0,0 +1,135 @@
+from typing import Dict, Hashable, Iterable, Iterator, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+class KeywordMatcher:
+    """Match many keyword tables against text in a single pass.
+    
+    All keywords are compiled into one Aho-Corasick automaton, so scan cost
+    depends on the text length and the number of hits, not on how many
+    keywords there are. Uses pyahocorasick when installed and a pure-Python
+    automaton otherwise.
+    
+    Counts follow str.count() semantics (non-overlapping occurrences of each
+    keyword) and matching is on substrings, like `keyword in text`.
+    """
+    
+    def __init__(self, tables: Dict[Hashable, Iterable[str]]):
+        self.keywords: List[str] = []
+        self.keyword_groups: List[List[Hashable]] = []
+        self.groups: Dict[Hashable, List[int]] = {}
+        
+        index: Dict[str, int] = {}
+        for group, words in tables.items():
+            ids = self.groups.setdefault(group, [])
+            for word in words:
+                word = word.lower()
+                if not word:
+                    continue
+                if word not in index:
+                    index[word] = len(self.keywords)
+                    self.keywords.append(word)
+                    self.keyword_groups.append([])
+                keyword_id = index[word]
+                if group not in self.keyword_groups[keyword_id]:
+                    self.keyword_groups[keyword_id].append(group)
+                    ids.append(keyword_id)
+        
+        self._lengths = [len(word) for word in self.keywords]
+        self._positions = {
+            group: {keyword_id: i for i, keyword_id in enumerate(ids)}
+            for group, ids in self.groups.items()
+        }
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword_id, word in enumerate(self.keywords):
+                self._automaton.add_word(word, keyword_id)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build_trie()
+    
+    def scan(self, text_lower: str) -> Dict[int, int]:
+        """Count occurrences per keyword id in already lowercased text"""
+        counts: Dict[int, int] = {}
+        if not self.keywords or not text_lower:
+            return counts
+        
+        next_start: Dict[int, int] = {}
+        lengths = self._lengths
+        for end, keyword_id in self._iter_matches(text_lower):
+            start = end - lengths[keyword_id] + 1
+            if start >= next_start.get(keyword_id, 0):
+                counts[keyword_id] = counts.get(keyword_id, 0) + 1
+                next_start[keyword_id] = end + 1
+        
+        return counts
+    
+    def group_counts(self, hits: Dict[int, int]) -> Dict[Hashable, int]:
+        """Total hits per table"""
+        totals = {group: 0 for group in self.groups}
+        for keyword_id, count in hits.items():
+            for group in self.keyword_groups[keyword_id]:
+                totals[group] += count
+        return totals
+    
+    def matches(self, hits: Dict[int, int], group: Hashable) -> List[str]:
+        """Keywords of one table found in the text, in table order"""
+        positions = self._positions.get(group, {})
+        found = [keyword_id for keyword_id in hits if keyword_id in positions]
+        return [self.keywords[keyword_id] for keyword_id in sorted(found, key=positions.__getitem__)]
+    
+    def has_match(self, hits: Dict[int, int], group: Hashable) -> bool:
+        """Whether any keyword of one table was found"""
+        positions = self._positions.get(group, {})
+        return any(keyword_id in positions for keyword_id in hits)
+    
+    def _iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        if self._automaton is not None:
+            return self._automaton.iter(text)
+        return self._iter_trie(text)
+    
+    def _build_trie(self):
+        """Build goto/fail/output tables for the pure-Python automaton"""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+        
+        for keyword_id, word in enumerate(self.keywords):
+            node = 0
+            for char in word:
+                if char not in goto[node]:
+                    goto.append({})
+                    output.append([])
+                    goto[node][char] = len(goto) - 1
+                node = goto[node][char]
+            output[node].append(keyword_id)
+        
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                output[child] = output[child] + output[fail[child]]
+        
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+    
+    def _iter_trie(self, text: str) -> Iterator[Tuple[int, int]]:
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword_id in output[node]:
+                yield end, keyword_id
@@ -0,0 +1,192 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .parsed_content import ParsedContent
+
+PostKey = Tuple[str, str]
+
+class NearDuplicate:
+    """A recent post whose text nearly matches the one checked"""
+    
+    __slots__ = ('creator_id', 'platform', 'post_id', 'similarity', 'analysis')
+    
+    def __init__(self, creator_id: Any, platform: str, post_id: Any, similarity: float = 1.0,
+                 analysis: Optional[Dict[str, Any]] = None):
+        self.creator_id = creator_id
+        self.platform = platform
+        self.post_id = post_id
+        self.similarity = similarity
+        self.analysis = analysis
+    
+    def to_signal(self) -> Dict[str, Any]:
+        return {
+            'creator_id': self.creator_id,
+            'platform': self.platform,
+            'post_id': self.post_id,
+            'similarity': round(self.similarity, 3)
+        }
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of recent post texts.
+    
+    Creators cross-post the same caption to several platforms and
+    engagement farms repost templated text; such copies can reuse the
+    analysis of the first post seen. Each text is reduced to a MinHash
+    signature over its word bigrams (lowercased, links dropped), split
+    into `bands` bands and bucketed by band, so a lookup only compares
+    against posts sharing a band instead of the whole index. A candidate
+    is a duplicate when its estimated Jaccard similarity reaches
+    `threshold`.
+    
+    Every post's outcome is remembered by (platform, post id), so metric
+    refreshes of a post are answered without hashing its text again.
+    Originals are indexed as soon as they are checked and get their
+    analysis once it is known. Posts without an id are compared but never
+    indexed, since a later refresh of one could not be told apart from a
+    copy. At most max_entries posts are kept, for ttl seconds, oldest first
+    out. Analyses are shared and read-only.
+    """
+    
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 8,
+                 max_entries: int = 50000, ttl: float = 86400.0, min_words: int = 6, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_words = min_words
+        
+        # Multiply-shift hashing: the top half of a * x (mod 2^64), for odd a
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)[:, None] * np.uint64(2) + np.uint64(1)
+        self._band_bytes = num_perm // bands * 4
+        
+        # post -> (expires, original it repeats or None); originals -> (expires, signature, entry)
+        self._posts: 'OrderedDict[PostKey, Tuple[float, Optional[NearDuplicate]]]' = OrderedDict()
+        self._entries: 'OrderedDict[int, Tuple[float, bytes, NearDuplicate]]' = OrderedDict()
+        self._ids: Dict[PostKey, int] = {}
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._next_id = 0
+        self.duplicates = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def check(self, parsed: ParsedContent, creator_id: Any, platform: str,
+              post_id: Any = None) -> Optional[NearDuplicate]:
+        """The recent post this one nearly repeats, or None if it is an original (indexed if it has an id)"""
+        self._expire()
+        key = (platform, str(post_id)) if post_id is not None else None
+        if key is not None and key in self._posts:
+            return self._posts[key][1]
+        
+        signature = self.signature(parsed)
+        if signature is None:
+            return None
+        bands = self._band_keys(signature)
+        duplicate = self._find(signature, bands, key)
+        if duplicate is not None:
+            self.duplicates += 1
+        elif key is not None and key not in self._ids:
+            self._add(signature, bands, NearDuplicate(creator_id, platform, post_id), key)
+        
+        if key is not None:
+            self._posts[key] = (time.monotonic() + self.ttl, duplicate)
+            while len(self._posts) > self.max_entries:
+                self._posts.popitem(last=False)
+        return duplicate
+    
+    def set_analysis(self, platform: str, post_id: Any, analysis: Dict[str, Any]):
+        """Record the analysis of an indexed original, for its duplicates to reuse"""
+        if post_id is None:
+            return
+        entry_id = self._ids.get((platform, str(post_id)))
+        if entry_id is not None:
+            self._entries[entry_id][2].analysis = analysis
+    
+    def signature(self, parsed: ParsedContent) -> Optional[bytes]:
+        """MinHash signature of a text; None if it is too short to compare"""
+        words = parsed.lower.split()
+        if parsed.links:
+            words = [word for word in words if not word.startswith(('http://', 'https://'))]
+        if len(words) < self.min_words:
+            return None
+        # str hashes are cached and only compared within this process
+        shingles = np.fromiter(map(hash, zip(words, words[1:])), dtype=np.int64, count=len(words) - 1)
+        minima = (self._a * shingles.view(np.uint64)).min(axis=1)
+        return (minima >> np.uint64(32)).astype(np.uint32).tobytes()
+    
+    def _find(self, signature: bytes, bands: List[bytes], key: Optional[PostKey]) -> Optional[NearDuplicate]:
+        candidates = set()
+        for band, bucket in zip(bands, self._buckets):
+            ids = bucket.get(band)
+            if ids is not None:
+                candidates.update(ids)
+        # The post itself, if it was indexed before its outcome was forgotten
+        candidates.discard(self._ids.get(key))
+        
+        if not candidates:
+            return None
+        
+        # Compare against every candidate at once
+        entries = [self._entries[entry_id] for entry_id in candidates]
+        signatures = np.frombuffer(b''.join(entry[1] for entry in entries), dtype=np.uint32)
+        matching = np.count_nonzero(
+            signatures.reshape(len(entries), self.num_perm) == np.frombuffer(signature, dtype=np.uint32), axis=1
+        )
+        best = int(matching.argmax())
+        similarity = matching[best] / self.num_perm
+        if similarity < self.threshold:
+            return None
+        entry = entries[best][2]
+        return NearDuplicate(entry.creator_id, entry.platform, entry.post_id, float(similarity), entry.analysis)
+    
+    def _add(self, signature: bytes, bands: List[bytes], entry: NearDuplicate, key: Optional[PostKey]):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (time.monotonic() + self.ttl, signature, entry)
+        if key is not None:
+            self._ids[key] = entry_id
+        for band, bucket in zip(bands, self._buckets):
+            ids = bucket.get(band)
+            if ids is None:
+                bucket[band] = [entry_id]
+            else:
+                ids.append(entry_id)
+        
+        while len(self._entries) > self.max_entries:
+            self._evict()
+    
+    def _band_keys(self, signature: bytes) -> List[bytes]:
+        width = self._band_bytes
+        return [signature[start:start + width] for start in range(0, len(signature), width)]
+    
+    def _expire(self):
+        now = time.monotonic()
+        while self._entries and next(iter(self._entries.values()))[0] < now:
+            self._evict()
+        while self._posts and next(iter(self._posts.values()))[0] < now:
+            self._posts.popitem(last=False)
+    
+    def _evict(self):
+        entry_id, (_, signature, entry) = self._entries.popitem(last=False)
+        if entry.post_id is not None:
+            del self._ids[(entry.platform, str(entry.post_id))]
+        for band, bucket in zip(self._band_keys(signature), self._buckets):
+            ids = bucket[band]
+            ids.remove(entry_id)
+            if not ids:
+                del bucket[band]
+        self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'posts': len(self._posts),
+            'duplicates': self.duplicates,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,25 @@
+import re
+from typing import List
+
+HASHTAG_PATTERN = re.compile(r'#\w+')
+MENTION_PATTERN = re.compile(r'@\w+')
+LINK_PATTERN = re.compile(r'https?://[^\s]+')
+EMOJI_PATTERN = re.compile(r'[\U0001F600-\U0001F64F]')
+
+class ParsedContent:
+    """Text of one event, tokenized once and shared by every processor"""
+    
+    __slots__ = ('text', 'lower', 'words', 'hashtags', 'mentions', 'links', 'emoji_count')
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.words: List[str] = text.split()
+        self.hashtags: List[str] = HASHTAG_PATTERN.findall(text)
+        self.mentions: List[str] = MENTION_PATTERN.findall(text)
+        self.links: List[str] = LINK_PATTERN.findall(text)
+        self.emoji_count = len(EMOJI_PATTERN.findall(text))
+    
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
@@ -0,0 +1,197 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+# Social-media tuned model with negative / neutral / positive labels
+DEFAULT_MODEL = 'cardiffnlp/twitter-roberta-base-sentiment-latest'
+
+class SentimentBackend:
+    """Pluggable sentiment scorer for ContentAnalyzer.
+    
+    score() returns a result shaped like the keyword scorer's
+    ({'sentiment', 'confidence', 'scores'}), or None when the backend
+    can't answer in time, in which case the keyword result is kept.
+    """
+    
+    async def score(self, text: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+    
+    async def close(self):
+        pass
+
+class TransformerSentiment(SentimentBackend):
+    """Transformer sentiment model on CPU with dynamic batching.
+    
+    The model is loaded on first use, in the background, so startup is not
+    slowed down and events fall back to keywords until it is ready. Texts
+    from concurrent events are collected until max_batch_size are waiting or
+    batch_wait has passed; while a batch is running the next one keeps
+    filling, so batches grow with load. Once max_pending texts are waiting,
+    or a result takes longer than timeout, score() returns None.
+    """
+    
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_batch_size: int = 32,
+                 batch_wait: float = 0.01, max_pending: int = 256, timeout: float = 0.5,
+                 max_length: int = 128, threads: Optional[int] = None):
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_length = max_length
+        self.threads = threads
+        
+        self._tokenizer = None
+        self._model = None
+        self._labels: List[str] = []
+        self._loading: Optional[asyncio.Future] = None
+        self._failed = False
+        
+        # One inference at a time; torch parallelizes within a batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sentiment')
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = 0
+        
+        self.batches = 0
+        self.scored = 0
+        self.fallbacks: Dict[str, int] = {'loading': 0, 'load': 0, 'timeout': 0, 'error': 0}
+    
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+    
+    async def score(self, text: str) -> Optional[Dict[str, Any]]:
+        if not self.ready:
+            self._start_loading()
+            self.fallbacks['loading'] += 1
+            return None
+        
+        if len(self._pending) + self._running >= self.max_pending:
+            self.fallbacks['load'] += 1
+            return None
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_wait, self._dispatch)
+        
+        try:
+            # The result still lands in the batch if we stop waiting for it
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.fallbacks['timeout'] += 1
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        except Exception as e:
+            self.fallbacks['error'] += 1
+            logger.warning(f"Sentiment model failed, using keywords: {e}")
+        return None
+    
+    def _start_loading(self):
+        if self._loading is not None or self._failed:
+            return
+        
+        loop = asyncio.get_running_loop()
+        self._loading = loop.run_in_executor(self._executor, self._load)
+        self._loading.add_done_callback(self._loaded)
+    
+    def _load(self):
+        # Imported here so the consumer starts quickly when the backend is off
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        model.to('cpu').eval()
+        
+        self._labels = [model.config.id2label[i].lower() for i in range(model.config.num_labels)]
+        self._tokenizer = tokenizer
+        self._model = model
+    
+    def _loaded(self, task: asyncio.Future):
+        error = task.exception() if not task.cancelled() else None
+        if error is not None:
+            # Keep using keywords rather than retrying a broken model on every event
+            self._failed = True
+            logger.error(f"Could not load sentiment model {self.model_name}: {error}")
+        else:
+            logger.info(f"Sentiment model {self.model_name} loaded")
+    
+    def _predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        import torch
+        
+        inputs = self._tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors='pt'
+        )
+        with torch.inference_mode():
+            probabilities = self._model(**inputs).logits.softmax(dim=-1).tolist()
+        
+        results = []
+        for row in probabilities:
+            scores = dict(zip(self._labels, row))
+            sentiment = max(scores, key=scores.get)
+            results.append({'sentiment': sentiment, 'confidence': scores[sentiment], 'scores': scores})
+        return results
+    
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running or not self._pending:
+            return
+        
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        self._running = len(batch)
+        self.batches += 1
+        
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self._executor, self._predict, [text for text, _ in batch])
+        task.add_done_callback(partial(self._resolve, [future for _, future in batch]))
+    
+    def _resolve(self, futures: List[asyncio.Future], task: asyncio.Future):
+        self._running = 0
+        error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+        for i, future in enumerate(futures):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(task.result()[i])
+        if error is None:
+            self.scored += len(futures)
+        
+        # Texts that arrived during inference have already waited long enough
+        self._dispatch()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'batches': self.batches,
+            'scored': self.scored,
+            'avg_batch_size': self.scored / self.batches if self.batches else 0.0,
+            'fallbacks': dict(self.fallbacks)
+        }
+    
+    async def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+def create_sentiment_backend(name: str, **options) -> Optional[SentimentBackend]:
+    """Backend for SENTIMENT_BACKEND; 'keyword' means no model"""
+    name = name.lower()
+    if name == 'keyword':
+        return None
+    if name == 'transformer':
+        return TransformerSentiment(**options)
+    raise ValueError(f"Unknown sentiment backend: {name}")
@@ -1,7 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
-import asyncio
 from loguru import logger
+from ..records import EnrichedEvent, SocialEvent
+from .parsed_content import ParsedContent
 
 class SocialProcessor:
     """Process and enrich social media data"""
@@ -13,27 +14,58 @@ class SocialProcessor:
             'instagram': self._process_instagram,
             'tiktok': self._process_tiktok
         }
+        
+        # Field of the platform payload holding the post text
+        self.content_fields = {
+            'twitter': 'text',
+            'youtube': 'title',
+            'instagram': 'caption',
+            'tiktok': 'desc'
+        }
     
-    async def process(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, event: SocialEvent) -> EnrichedEvent:
         """Process social event based on platform"""
-        platform = event.get('platform')
+        enriched, _ = await self.process_with_content(event)
+        return enriched
+    
+    async def process_with_content(self, event: SocialEvent) -> Tuple[EnrichedEvent, Optional[ParsedContent]]:
+        """Process social event and return it with its parsed content.
+        
+        The post text is parsed once here; later stages should read the
+        returned ParsedContent instead of rescanning the raw string.
+        """
+        return self.process_sync(event)
+    
+    def process_sync(self, event: SocialEvent) -> Tuple[EnrichedEvent, Optional[ParsedContent]]:
+        """Synchronous processing, safe to run in a worker process"""
+        platform = event.platform
         handler = self.platform_handlers.get(platform)
         
         if not handler:
             logger.warning(f"Unknown platform: {platform}")
-            return event
+            return self._passthrough(event), None
         
         try:
-            enriched = await handler(event)
-            enriched['processed_at'] = datetime.utcnow().isoformat()
-            return enriched
+            parsed = ParsedContent(event.data.get(self.content_fields[platform]) or '')
+            enriched = handler(event, parsed)
+            enriched.processed_at = datetime.utcnow().isoformat()
+            return enriched, parsed
         except Exception as e:
             logger.error(f"Error processing {platform} event: {e}")
-            return event
+            return self._passthrough(event), None
+    
+    def _passthrough(self, event: SocialEvent) -> EnrichedEvent:
+        """An event no handler could enrich, with whatever counters it carries"""
+        raw = event.raw
+        metrics = {**(raw.get('engagement') or {}), **(raw.get('metrics') or {})}
+        return EnrichedEvent(
+            event, metrics, engagement_rate=raw.get('engagement_rate'),
+            content=raw.get('content'), media_type=raw.get('media_type'), hashtags=raw.get('hashtags')
+        )
     
-    async def _process_twitter(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_twitter(self, event: SocialEvent, parsed: ParsedContent) -> EnrichedEvent:
         """Process Twitter-specific data"""
-        data = event.get('data', {})
+        data = event.data
         
         # Extract engagement metrics
         engagement = {
@@ -47,27 +79,23 @@ class SocialProcessor:
         # Calculate engagement rate
         total_impressions = engagement['impressions']
         if total_impressions > 0:
-            engagement_rate = sum([
-                engagement['likes'],
-                engagement['retweets'],
-                engagement['replies'],
-                engagement['quotes']
-            ]) / total_impressions * 100
+            engagement_rate = (
+                engagement['likes'] + engagement['retweets'] + engagement['replies'] + engagement['quotes']
+            ) / total_impressions * 100
         else:
             engagement_rate = 0
         
-        return {
-            **event,
-            'engagement': engagement,
-            'engagement_rate': engagement_rate,
-            'content': data.get('text', ''),
-            'media_type': self._detect_media_type(data),
-            'hashtags': self._extract_hashtags(data.get('text', ''))
-        }
+        return EnrichedEvent(
+            event, engagement, metrics_field='engagement',
+            engagement_rate=engagement_rate,
+            content=parsed.text,
+            media_type=self._detect_media_type(data),
+            hashtags=parsed.hashtags
+        )
     
-    async def _process_youtube(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_youtube(self, event: SocialEvent, parsed: ParsedContent) -> EnrichedEvent:
         """Process YouTube-specific data"""
-        data = event.get('data', {})
+        data = event.data
         
         # Extract video metrics
         metrics = {
@@ -81,18 +109,20 @@ class SocialProcessor:
         avg_watch_percentage = 0.4  # Industry average
         estimated_watch_time = metrics['views'] * metrics['duration'] * avg_watch_percentage
         
-        return {
-            **event,
-            'metrics': metrics,
-            'estimated_watch_time': estimated_watch_time,
-            'content': data.get('title', ''),
-            'description': data.get('description', ''),
-            'tags': data.get('tags', [])
-        }
+        return EnrichedEvent(
+            event, metrics,
+            engagement_rate=event.raw.get('engagement_rate'),
+            content=parsed.text,
+            extra={
+                'estimated_watch_time': estimated_watch_time,
+                'description': data.get('description', ''),
+                'tags': data.get('tags', [])
+            }
+        )
     
-    async def _process_instagram(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_instagram(self, event: SocialEvent, parsed: ParsedContent) -> EnrichedEvent:
         """Process Instagram-specific data"""
-        data = event.get('data', {})
+        data = event.data
         
         # Extract post metrics
         metrics = {
@@ -103,17 +133,17 @@ class SocialProcessor:
             'reach': data.get('reach', 0)
         }
         
-        return {
-            **event,
-            'metrics': metrics,
-            'content': data.get('caption', ''),
-            'media_type': data.get('media_type', 'photo'),
-            'hashtags': self._extract_hashtags(data.get('caption', ''))
-        }
+        return EnrichedEvent(
+            event, metrics,
+            engagement_rate=event.raw.get('engagement_rate'),
+            content=parsed.text,
+            media_type=data.get('media_type', 'photo'),
+            hashtags=parsed.hashtags
+        )
     
-    async def _process_tiktok(self, event: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_tiktok(self, event: SocialEvent, parsed: ParsedContent) -> EnrichedEvent:
         """Process TikTok-specific data"""
-        data = event.get('data', {})
+        data = event.data
         
         # Extract video metrics
         metrics = {
@@ -123,13 +153,13 @@ class SocialProcessor:
             'comments': data.get('comment_count', 0)
         }
         
-        return {
-            **event,
-            'metrics': metrics,
-            'content': data.get('desc', ''),
-            'music': data.get('music', {}),
-            'hashtags': self._extract_hashtags(data.get('desc', ''))
-        }
+        return EnrichedEvent(
+            event, metrics,
+            engagement_rate=event.raw.get('engagement_rate'),
+            content=parsed.text,
+            hashtags=parsed.hashtags,
+            extra={'music': data.get('music', {})}
+        )
     
     def _detect_media_type(self, data: Dict[str, Any]) -> str:
         """Detect media type from post data"""
@@ -137,9 +167,4 @@ class SocialProcessor:
             return 'video'
         elif data.get('photos') or data.get('media'):
             return 'photo'
-        return 'text'
-    
-    def _extract_hashtags(self, text: str) -> list:
-        """Extract hashtags from text"""
-        import re
-        return re.findall(r'#\w+', text)
\ No newline at end of file
+        return 'text'
\ No newline at end of file
@@ -0,0 +1,133 @@
+import heapq
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Rescale stored counts before the decay weight (2 ** half-lives) loses precision
+MAX_HALF_LIVES = 40
+
+class TrendDetector:
+    """Streaming heavy-hitters over hashtags and topics.
+    
+    Keeps at most `capacity` counters using the Space-Saving algorithm, with
+    exponential time decay so old activity fades out after a few half-lives.
+    Counts are stored pre-scaled by the current decay weight, which makes each
+    update O(log capacity) and lets the whole table decay without touching
+    every counter.
+    
+    A term is trending when its guaranteed count (count minus Space-Saving
+    error) is at least min_count and it is among the top_n terms. The top_n
+    cutoff is refreshed every refresh_every observations, so is_trending() is
+    a dictionary lookup.
+    """
+    
+    def __init__(self, capacity: int = 5000, half_life: float = 3600.0, top_n: int = 100,
+                 min_count: float = 5.0, refresh_every: int = 500):
+        self.capacity = capacity
+        self.half_life = half_life
+        self.top_n = top_n
+        self.min_count = min_count
+        self.refresh_every = refresh_every
+        
+        self._counts: Dict[str, float] = {}
+        self._errors: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._epoch: Optional[float] = None
+        self._cutoff = 0.0
+        self._since_refresh = 0
+    
+    @staticmethod
+    def normalize(term: str) -> str:
+        return term.lstrip('#').lower()
+    
+    def observe(self, terms: Iterable[str], now: Optional[float] = None):
+        """Count one occurrence of each term"""
+        weight = self._weight(now)
+        for term in terms:
+            term = self.normalize(term)
+            if term:
+                self._increment(term, weight)
+                self._since_refresh += 1
+        
+        if self._since_refresh >= self.refresh_every:
+            self._refresh_cutoff()
+    
+    def is_trending(self, term: str, now: Optional[float] = None) -> bool:
+        """Whether a term is currently a heavy hitter"""
+        term = self.normalize(term)
+        count = self._counts.get(term)
+        if count is None:
+            return False
+        
+        guaranteed = count - self._errors[term]
+        return guaranteed >= self._cutoff and guaranteed >= self.min_count * self._weight(now)
+    
+    def count(self, term: str, now: Optional[float] = None) -> float:
+        """Decayed count estimate for a term (may overestimate by its error)"""
+        count = self._counts.get(self.normalize(term), 0.0)
+        return count / self._weight(now) if count else 0.0
+    
+    def top(self, n: int = 10, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """The n terms with the highest decayed counts"""
+        weight = self._weight(now)
+        return [
+            (term, count / weight)
+            for term, count in heapq.nlargest(n, self._counts.items(), key=lambda item: item[1])
+        ]
+    
+    def _weight(self, now: Optional[float]) -> float:
+        now = time.time() if now is None else now
+        if self._epoch is None:
+            self._epoch = now
+        
+        half_lives = (now - self._epoch) / self.half_life
+        if half_lives > MAX_HALF_LIVES:
+            self._rescale(half_lives, now)
+            return 1.0
+        return 2.0 ** half_lives
+    
+    def _rescale(self, half_lives: float, now: float):
+        factor = 2.0 ** -half_lives
+        for term in self._counts:
+            self._counts[term] *= factor
+            self._errors[term] *= factor
+        self._cutoff *= factor
+        self._epoch = now
+        self._rebuild_heap()
+    
+    def _increment(self, term: str, weight: float):
+        if term in self._counts:
+            self._counts[term] += weight
+        elif len(self._counts) < self.capacity:
+            self._counts[term] = weight
+            self._errors[term] = 0.0
+        else:
+            # Replace the smallest counter; its count becomes the new term's error
+            evicted, floor = self._pop_min()
+            del self._counts[evicted]
+            del self._errors[evicted]
+            self._counts[term] = floor + weight
+            self._errors[term] = floor
+        
+        heapq.heappush(self._heap, (self._counts[term], term))
+        if len(self._heap) > self.capacity * 4:
+            self._rebuild_heap()
+    
+    def _pop_min(self) -> Tuple[str, float]:
+        # Heap entries go stale when a counter grows; skip those
+        while True:
+            count, term = heapq.heappop(self._heap)
+            if self._counts.get(term) == count:
+                return term, count
+    
+    def _rebuild_heap(self):
+        self._heap = [(count, term) for term, count in self._counts.items()]
+        heapq.heapify(self._heap)
+    
+    def _refresh_cutoff(self):
+        self._since_refresh = 0
+        if len(self._counts) < self.top_n:
+            self._cutoff = 0.0
+            return
+        
+        guaranteed = (count - self._errors[term] for term, count in self._counts.items())
+        self._cutoff = heapq.nlargest(self.top_n, guaranteed)[-1]
@@ -0,0 +1,195 @@
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from ..records import Scores, Signals
+
+CreatorKey = Tuple[str, str]
+
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+class WindowStats:
+    """Mergeable summary of the signals of one creator's events"""
+    
+    __slots__ = ('events', 'score_sums', 'max_viral_potential', 'max_total_engagement',
+                 'engagement_rate_sum', 'engagement_velocity_sum', 'sentiments', 'hashtags',
+                 'topics', 'recommendations')
+    
+    def __init__(self):
+        self.events = 0
+        self.score_sums: Dict[str, float] = {}
+        self.max_viral_potential = 0.0
+        self.max_total_engagement = 0.0
+        self.engagement_rate_sum = 0.0
+        self.engagement_velocity_sum = 0.0
+        self.sentiments: Counter = Counter()
+        self.hashtags: Counter = Counter()
+        self.topics: Counter = Counter()
+        # (type, action) -> [recommendation, times it was made]
+        self.recommendations: Dict[Tuple[Any, Any], List[Any]] = {}
+    
+    def add(self, signals: Signals):
+        self.events += 1
+        scores = signals.scores
+        if scores is not None:
+            for name in Scores.__slots__:
+                self.score_sums[name] = self.score_sums.get(name, 0.0) + (getattr(scores, name) or 0)
+            self.max_viral_potential = max(self.max_viral_potential, scores.viral_potential or 0)
+        
+        engagement = signals.engagement
+        self.max_total_engagement = max(self.max_total_engagement, engagement.total_engagement or 0)
+        self.engagement_rate_sum += engagement.engagement_rate or 0
+        self.engagement_velocity_sum += engagement.engagement_velocity or 0
+        
+        sentiment = signals.content.sentiment
+        if sentiment:
+            self.sentiments[sentiment] += 1
+        
+        self.hashtags.update(signals.trends.trending_hashtags)
+        self.topics.update(signals.trends.trending_topics)
+        
+        for recommendation in signals.recommendations:
+            key = (recommendation.get('type'), recommendation.get('action'))
+            entry = self.recommendations.get(key)
+            if entry is None:
+                self.recommendations[key] = [recommendation, 1]
+            else:
+                entry[1] += 1
+    
+    def merge(self, other: 'WindowStats'):
+        self.events += other.events
+        for name, value in other.score_sums.items():
+            self.score_sums[name] = self.score_sums.get(name, 0.0) + value
+        self.max_viral_potential = max(self.max_viral_potential, other.max_viral_potential)
+        self.max_total_engagement = max(self.max_total_engagement, other.max_total_engagement)
+        self.engagement_rate_sum += other.engagement_rate_sum
+        self.engagement_velocity_sum += other.engagement_velocity_sum
+        self.sentiments.update(other.sentiments)
+        self.hashtags.update(other.hashtags)
+        self.topics.update(other.topics)
+        for key, (recommendation, count) in other.recommendations.items():
+            entry = self.recommendations.get(key)
+            if entry is None:
+                self.recommendations[key] = [recommendation, count]
+            else:
+                entry[1] += count
+    
+    def copy(self) -> 'WindowStats':
+        merged = WindowStats()
+        merged.merge(self)
+        return merged
+    
+    def summary(self, max_recommendations: int, max_terms: int) -> Dict[str, Any]:
+        events = self.events
+        recommendations = sorted(
+            self.recommendations.values(),
+            key=lambda entry: (PRIORITY_RANK.get(entry[0].get('priority'), len(PRIORITY_RANK)), -entry[1])
+        )
+        return {
+            'events': events,
+            'scores': {name: total / events for name, total in self.score_sums.items()},
+            'max_viral_potential': self.max_viral_potential,
+            'engagement': {
+                'max_total_engagement': self.max_total_engagement,
+                'avg_engagement_rate': self.engagement_rate_sum / events,
+                'avg_engagement_velocity': self.engagement_velocity_sum / events
+            },
+            'sentiment': dict(self.sentiments),
+            'trending_hashtags': [tag for tag, _ in self.hashtags.most_common(max_terms)],
+            'trending_topics': [topic for topic, _ in self.topics.most_common(max_terms)],
+            'recommendations': [
+                {**recommendation, 'count': count}
+                for recommendation, count in recommendations[:max_recommendations]
+            ]
+        }
+
+class WindowAggregator:
+    """Per-creator rollups of extracted signals over tumbling or sliding windows.
+    
+    Events are folded into buckets of `slide` seconds of processing time.
+    Once a bucket closes, one record is produced per creator and platform
+    seen in the `window` seconds ending with it. With slide equal to window
+    (the default) windows are tumbling and every event is counted once;
+    with a shorter slide they overlap, and records come out every slide.
+    """
+    
+    def __init__(self, window: float = 60.0, slide: Optional[float] = None,
+                 max_recommendations: int = 5, max_terms: int = 10):
+        self.window = window
+        self.slide = slide or window
+        self.span = round(window / self.slide)
+        if self.span < 1 or abs(self.span * self.slide - window) > 1e-9:
+            raise ValueError("Aggregation window must be a multiple of the slide")
+        self.max_recommendations = max_recommendations
+        self.max_terms = max_terms
+        
+        self._buckets: Dict[int, Dict[CreatorKey, WindowStats]] = {}
+        self._next_end: Optional[int] = None
+    
+    def add(self, creator_id: str, platform: str, signals: Signals, now: Optional[float] = None):
+        """Fold one event's signals into the current bucket"""
+        index = self._index(now)
+        bucket = self._buckets.setdefault(index, {})
+        stats = bucket.get((creator_id, platform))
+        if stats is None:
+            stats = bucket[(creator_id, platform)] = WindowStats()
+        stats.add(signals)
+        if self._next_end is None:
+            self._next_end = index
+    
+    def due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Records of every window that closed since the last call"""
+        current = self._index(now)
+        if self._next_end is None or not self._buckets:
+            self._next_end = current
+            return []
+        
+        records = []
+        # Skip windows that can't contain any bucket we still hold
+        start = max(self._next_end, min(self._buckets))
+        for end in range(start, current):
+            records.extend(self._records(end))
+            # No later window needs the oldest bucket of this one
+            self._buckets.pop(end - self.span + 1, None)
+        self._next_end = max(self._next_end, current)
+        return records
+    
+    def flush(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Records of every window up to and including the open one, e.g. on shutdown"""
+        current = self._index(now)
+        records = self.due(now)
+        if current in self._buckets:
+            records.extend(self._records(current))
+        self._buckets = {}
+        self._next_end = None
+        return records
+    
+    def _index(self, now: Optional[float]) -> int:
+        return int((time.time() if now is None else now) // self.slide)
+    
+    def _records(self, end: int) -> List[Dict[str, Any]]:
+        first = end - self.span + 1
+        merged: Dict[CreatorKey, WindowStats] = {}
+        for index in range(first, end + 1):
+            for key, stats in self._buckets.get(index, {}).items():
+                if key in merged:
+                    merged[key].merge(stats)
+                else:
+                    # Buckets are shared by overlapping windows; don't merge into them
+                    merged[key] = stats.copy() if self.span > 1 else stats
+        
+        window_start = _isoformat(first * self.slide)
+        window_end = _isoformat((end + 1) * self.slide)
+        return [
+            {
+                'creatorId': creator_id,
+                'platform': platform,
+                'window_start': window_start,
+                'window_end': window_end,
+                **stats.summary(self.max_recommendations, self.max_terms)
+            }
+            for (creator_id, platform), stats in merged.items()
+        ]
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
@@ -0,0 +1,232 @@
+"""Typed records passed between pipeline stages.
+
+Events are validated once, when they are admitted, and every stage after
+that reads and fills in these slot-based records instead of copying nested
+dicts. Records are turned into dicts only where they leave the process (the
+sinks and published results), with the same shape the dict-based pipeline
+produced.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+class InvalidEvent(ValueError):
+    """A social event that is missing required fields or has the wrong types"""
+
+class Record:
+    """Base for slot records; to_dict() returns every slot that is not None"""
+    
+    __slots__ = ()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        values = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                values[name] = value
+        return values
+    
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+def parse_event_time(timestamp: Any) -> Optional[datetime]:
+    """ISO 8601 timestamp as a naive UTC datetime; naive input is taken as UTC.
+    
+    The Node producer serializes Dates with a Z suffix, which would
+    otherwise give aware datetimes that can't be compared with utcnow().
+    """
+    if not timestamp or not isinstance(timestamp, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+class SocialEvent(Record):
+    """A validated social-events message; raw is the decoded message itself.
+    
+    posted_at is timestamp parsed once, as naive UTC (see parse_event_time).
+    """
+    
+    __slots__ = ('creator_id', 'platform', 'timestamp', 'data', 'raw', 'posted_at')
+    
+    def __init__(self, creator_id: Any, platform: str, timestamp: Optional[str],
+                 data: Dict[str, Any], raw: Dict[str, Any]):
+        self.creator_id = creator_id
+        self.platform = platform
+        self.timestamp = timestamp
+        self.data = data
+        self.raw = raw
+        self.posted_at = parse_event_time(timestamp)
+    
+    @classmethod
+    def from_dict(cls, value: Any) -> 'SocialEvent':
+        if not isinstance(value, dict):
+            raise InvalidEvent(f"Expected an object, got {type(value).__name__}")
+        
+        creator_id = value.get('creatorId')
+        if creator_id is None or creator_id == '':
+            raise InvalidEvent("Missing creatorId")
+        platform = value.get('platform')
+        if not isinstance(platform, str) or not platform:
+            raise InvalidEvent("Missing platform")
+        timestamp = value.get('timestamp')
+        if timestamp is not None and not isinstance(timestamp, str):
+            raise InvalidEvent("timestamp must be an ISO 8601 string")
+        if timestamp and parse_event_time(timestamp) is None:
+            raise InvalidEvent(f"Invalid timestamp: {timestamp!r}")
+        data = value.get('data')
+        if data is None:
+            data = {}
+        elif not isinstance(data, dict):
+            raise InvalidEvent("data must be an object")
+        
+        return cls(creator_id, platform, timestamp, data, value)
+
+class EnrichedEvent(Record):
+    """A social event after platform-specific enrichment.
+    
+    metrics holds the platform's counters; metrics_field says whether the
+    dict form calls them 'engagement' (Twitter) or 'metrics'. Fields a
+    platform doesn't produce stay None and are left out of to_dict().
+    analysis_deferred marks events whose content analysis was skipped
+    under load, to be completed later; duplicate_of identifies the recent
+    post whose text this one nearly repeats.
+    """
+    
+    __slots__ = ('event', 'metrics', 'metrics_field', 'engagement_rate', 'content', 'media_type',
+                 'hashtags', 'extra', 'processed_at', 'analysis', 'analysis_deferred', 'duplicate_of')
+    
+    def __init__(self, event: SocialEvent, metrics: Optional[Dict[str, Any]] = None,
+                 metrics_field: str = 'metrics', engagement_rate: Optional[float] = None,
+                 content: Optional[str] = None, media_type: Optional[str] = None,
+                 hashtags: Optional[List[str]] = None, extra: Optional[Dict[str, Any]] = None,
+                 processed_at: Optional[str] = None):
+        self.event = event
+        self.metrics = metrics if metrics is not None else {}
+        self.metrics_field = metrics_field
+        self.engagement_rate = engagement_rate
+        self.content = content
+        self.media_type = media_type
+        self.hashtags = hashtags
+        self.extra = extra
+        self.processed_at = processed_at
+        self.analysis: Optional[Dict[str, Any]] = None
+        self.analysis_deferred = False
+        self.duplicate_of: Optional[Dict[str, Any]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The enriched event as the dict-based processors returned it"""
+        enriched = dict(self.event.raw)
+        if self.metrics:
+            enriched[self.metrics_field] = self.metrics
+        for name in ('engagement_rate', 'content', 'media_type', 'hashtags', 'processed_at', 'analysis',
+                     'duplicate_of'):
+            value = getattr(self, name)
+            if value is not None:
+                enriched[name] = value
+        if self.extra:
+            enriched.update(self.extra)
+        if self.analysis_deferred:
+            enriched['analysis_deferred'] = True
+        return enriched
+
+class EngagementSignals(Record):
+    __slots__ = ('total_engagement', 'engagement_rate', 'engagement_velocity',
+                 'viral_coefficient', 'engagement_quality')
+    
+    def __init__(self, total_engagement: float = 0, engagement_rate: float = 0,
+                 engagement_velocity: float = 0, viral_coefficient: float = 0,
+                 engagement_quality: float = 0):
+        self.total_engagement = total_engagement
+        self.engagement_rate = engagement_rate
+        self.engagement_velocity = engagement_velocity
+        self.viral_coefficient = viral_coefficient
+        self.engagement_quality = engagement_quality
+
+class ContentSignals(Record):
+    __slots__ = ('sentiment', 'sentiment_confidence', 'topics', 'entities', 'content_type',
+                 'hashtag_count', 'engagement_potential', 'duplicate_of')
+    
+    def __init__(self, sentiment: str = 'neutral', sentiment_confidence: float = 0,
+                 topics: Optional[List[str]] = None, entities: Optional[Dict[str, List[str]]] = None,
+                 content_type: str = 'text', hashtag_count: int = 0, engagement_potential: float = 0,
+                 duplicate_of: Optional[Dict[str, Any]] = None):
+        self.sentiment = sentiment
+        self.sentiment_confidence = sentiment_confidence
+        self.topics = topics if topics is not None else []
+        self.entities = entities if entities is not None else {}
+        self.content_type = content_type
+        self.hashtag_count = hashtag_count
+        self.engagement_potential = engagement_potential
+        # Only set for near-duplicates of a recent post
+        self.duplicate_of = duplicate_of
+
+class AudienceSignals(Record):
+    __slots__ = ('audience_size', 'audience_growth_rate', 'audience_quality_score', 'creator_consistency',
+                 'audience_overlap', 'creator_event_count', 'avg_interactions')
+    
+    def __init__(self, audience_size: float = 0, audience_growth_rate: float = 0,
+                 audience_quality_score: float = 0.7, creator_consistency: Optional[float] = None):
+        self.audience_size = audience_size
+        self.audience_growth_rate = audience_growth_rate
+        self.audience_quality_score = audience_quality_score
+        self.creator_consistency = creator_consistency
+        self.audience_overlap: List[str] = []
+        # Only set when a shared cache is configured
+        self.creator_event_count: Optional[int] = None
+        self.avg_interactions: Optional[float] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        audience = super().to_dict()
+        # Consumers expect the key even before there is enough history
+        audience['creator_consistency'] = self.creator_consistency
+        return audience
+
+class TrendSignals(Record):
+    __slots__ = ('trending_hashtags', 'trending_topics', 'trend_alignment_score', 'seasonality_match')
+    
+    def __init__(self, trending_hashtags: List[str], trending_topics: List[str],
+                 trend_alignment_score: float, seasonality_match: bool):
+        self.trending_hashtags = trending_hashtags
+        self.trending_topics = trending_topics
+        self.trend_alignment_score = trend_alignment_score
+        self.seasonality_match = seasonality_match
+
+class Scores(Record):
+    __slots__ = ('viral_potential', 'brand_safety', 'engagement_quality', 'creator_value')
+    
+    def __init__(self, viral_potential: float, brand_safety: float, engagement_quality: float,
+                 creator_value: float):
+        self.viral_potential = viral_potential
+        self.brand_safety = brand_safety
+        self.engagement_quality = engagement_quality
+        self.creator_value = creator_value
+
+class Signals(Record):
+    """Everything SignalExtractor derives for one event"""
+    
+    __slots__ = ('engagement', 'content', 'audience', 'trends', 'scores', 'recommendations')
+    
+    def __init__(self, engagement: EngagementSignals, content: ContentSignals, audience: AudienceSignals,
+                 trends: TrendSignals, scores: Optional[Scores] = None,
+                 recommendations: Optional[List[Dict[str, str]]] = None):
+        self.engagement = engagement
+        self.content = content
+        self.audience = audience
+        self.trends = trends
+        self.scores = scores
+        self.recommendations = recommendations if recommendations is not None else []
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'engagement_signals': self.engagement.to_dict(),
+            'content_signals': self.content.to_dict(),
+            'audience_signals': self.audience.to_dict(),
+            'trend_signals': self.trends.to_dict(),
+            'scores': self.scores.to_dict() if self.scores is not None else {},
+            'recommendations': self.recommendations
+        }
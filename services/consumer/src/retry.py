@@ -0,0 +1,155 @@
+import asyncio
+import base64
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncpg
+from aiokafka.errors import KafkaError
+from loguru import logger
+from pymongo import errors as mongo_errors
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+# Errors worth retrying in place: the same write is expected to succeed shortly
+TRANSIENT_DB_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.ConnectionDoesNotExistError,
+    asyncpg.exceptions.CannotConnectNowError,
+    asyncpg.exceptions.TooManyConnectionsError,
+    asyncpg.exceptions.SerializationError,
+    asyncpg.exceptions.DeadlockDetectedError,
+    mongo_errors.AutoReconnect,
+    mongo_errors.ExecutionTimeout,
+    mongo_errors.WTimeoutError
+)
+
+RETRY_ATTEMPT_HEADER = 'x-retry-attempt'
+RETRY_DUE_HEADER = 'x-retry-due'
+ORIGINAL_TOPIC_HEADER = 'x-original-topic'
+ERROR_HEADER = 'x-error'
+SOURCE_HEADER = 'x-source'
+
+Headers = List[Tuple[str, bytes]]
+
+def is_transient_db_error(error: BaseException) -> bool:
+    return isinstance(error, TRANSIENT_DB_ERRORS)
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a later attempt may succeed: transient database or Kafka errors, not bugs or bad data"""
+    return is_transient_db_error(error) or isinstance(error, KafkaError)
+
+def transient_db_retry(attempts: int = 3, max_wait: float = 2.0) -> AsyncRetrying:
+    """tenacity policy for transient Postgres/Mongo errors; anything else is raised at once"""
+    return AsyncRetrying(
+        retry=retry_if_exception(is_transient_db_error),
+        stop=stop_after_attempt(attempts),
+        wait=wait_exponential_jitter(initial=0.1, max=max_wait),
+        before_sleep=lambda state: logger.warning(
+            f"Transient database error, retrying (attempt {state.attempt_number}): {state.outcome.exception()}"
+        ),
+        reraise=True
+    )
+
+def retry_metadata(headers: Optional[Iterable[Tuple[str, bytes]]]) -> Tuple[int, float, Optional[str]]:
+    """(attempt, due time, original topic) of a message from a retry topic"""
+    attempt, due, origin = 0, 0.0, None
+    for key, value in headers or ():
+        if key == RETRY_ATTEMPT_HEADER:
+            attempt = int(value)
+        elif key == RETRY_DUE_HEADER:
+            due = float(value)
+        elif key == ORIGINAL_TOPIC_HEADER:
+            origin = value.decode()
+    return attempt, due, origin
+
+def _jsonable(value: Any) -> Any:
+    """Rows and documents as plain JSON values (bytes as base64, datetimes as ISO 8601)"""
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+class RetryRouter:
+    """Send failed events to retry topics with increasing delays, then to a dead-letter topic.
+    
+    Attempt n of a retryable topic goes to `<topic>-retry-<n>` and becomes
+    due delays[n - 1] seconds later; once every tier is used up, or for
+    topics without retry tiers, it goes to `<topic>-dlq`. Rows and documents
+    a database rejects go to storage_topic. Sends wait for the broker's
+    acknowledgement, so the event's offset can be committed safely
+    afterwards.
+    """
+    
+    def __init__(self, producer, codec, delays: Sequence[float] = (5, 30, 300),
+                 retry_topics: Iterable[str] = ('social-events',), storage_topic: str = 'storage-dlq'):
+        self.producer = producer
+        self.codec = codec
+        self.delays = list(delays)
+        self.retry_topics = set(retry_topics)
+        self.storage_topic = storage_topic
+    
+    @staticmethod
+    def retry_topic(topic: str, attempt: int) -> str:
+        return f'{topic}-retry-{attempt}'
+    
+    @staticmethod
+    def dead_letter_topic(topic: str) -> str:
+        return f'{topic}-dlq'
+    
+    def tiers(self, topic: str) -> List[Tuple[str, float]]:
+        """(retry topic, delay) for every tier of a topic"""
+        if topic not in self.retry_topics:
+            return []
+        return [(self.retry_topic(topic, i + 1), delay) for i, delay in enumerate(self.delays)]
+    
+    async def route(self, topic: str, value: Any, attempt: int, error: BaseException,
+                    retry: bool = True) -> str:
+        """Send a failed event to its next tier and return the topic it went to.
+        
+        With retry=False the event goes straight to the dead-letter topic,
+        for failures a later attempt can't fix.
+        """
+        tiers = self.tiers(topic) if retry else []
+        headers = [
+            (ORIGINAL_TOPIC_HEADER, topic.encode()),
+            (RETRY_ATTEMPT_HEADER, str(attempt + 1).encode()),
+            (ERROR_HEADER, repr(error)[:500].encode())
+        ]
+        if attempt < len(tiers):
+            target, delay = tiers[attempt]
+            headers.append((RETRY_DUE_HEADER, str(time.time() + delay).encode()))
+        else:
+            target = self.dead_letter_topic(topic)
+        
+        payload, content_headers = self.codec.encode(value)
+        await self.producer.send_and_wait(target, payload, headers=content_headers + headers)
+        return target
+    
+    async def dead_letter_raw(self, topic: str, value: bytes, headers: Optional[Headers],
+                              error: BaseException) -> str:
+        """Send a message that can't be decoded to the dead-letter topic as-is"""
+        target = self.dead_letter_topic(topic)
+        headers = list(headers or []) + [
+            (ORIGINAL_TOPIC_HEADER, topic.encode()),
+            (ERROR_HEADER, repr(error)[:500].encode())
+        ]
+        await self.producer.send_and_wait(target, value, headers=headers)
+        return target
+    
+    async def dead_letter_record(self, source: str, record: Dict[str, Any], error: Any) -> str:
+        """Send a row or document a sink rejected to the storage dead-letter topic"""
+        payload, headers = self.codec.encode(_jsonable(record))
+        headers += [
+            (SOURCE_HEADER, source.encode()),
+            (ERROR_HEADER, repr(error)[:500].encode())
+        ]
+        await self.producer.send_and_wait(self.storage_topic, payload, headers=headers)
+        return self.storage_topic
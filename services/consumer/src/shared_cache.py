@@ -0,0 +1,375 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from loguru import logger
+from .processors.trend_detector import TrendDetector
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+CreatorKey = Tuple[str, str]
+
+class SharedCache:
+    """Cross-replica creator aggregates and term counters in Redis, behind a near-cache.
+    
+    Nothing on the hot path waits for Redis. Increments are buffered and
+    sent every flush_interval in one pipelined round trip, which also reads
+    back every creator that was updated or whose near-cache entry is older
+    than near_ttl. Reads return the near-cache entry plus this replica's
+    unsent increments, and schedule a refresh when it is stale.
+    
+    Per-creator EWMA state (CreatorStats) is written through the same way,
+    last write wins: a creator's events come from one partition, so its
+    state has one writer at a time, and a replica that takes the partition
+    over after a rebalance picks the state up instead of starting again.
+    
+    Term counts go into one sorted set per trend_bucket seconds. Every
+    trend_refresh seconds one replica, elected with SET NX, merges the
+    buckets of the last trend_window into a shared top-terms set; every
+    replica reads that set back at the same interval.
+    """
+    
+    def __init__(self, client, prefix: str = 'veri:consumer:', near_ttl: float = 1.0,
+                 flush_interval: float = 0.1, creator_ttl: int = 7 * 86400, trend_window: int = 3600,
+                 trend_bucket: int = 60, trend_refresh: float = 10.0, top_n: int = 100,
+                 min_count: float = 5.0, max_entries: int = 100000):
+        self.client = client
+        self.prefix = prefix
+        self.near_ttl = near_ttl
+        self.flush_interval = flush_interval
+        self.creator_ttl = creator_ttl
+        self.trend_window = trend_window
+        self.trend_bucket = trend_bucket
+        self.trend_refresh = trend_refresh
+        self.top_n = top_n
+        self.min_count = min_count
+        self.max_entries = max_entries
+        
+        self._near: 'OrderedDict[CreatorKey, Tuple[float, Dict[str, float]]]' = OrderedDict()
+        self._pending: Dict[CreatorKey, Dict[str, float]] = {}
+        self._stale: Set[CreatorKey] = set()
+        self._near_state: 'OrderedDict[CreatorKey, Tuple[float, Dict[str, float]]]' = OrderedDict()
+        self._pending_state: Dict[CreatorKey, Dict[str, float]] = {}
+        self._stale_state: Set[CreatorKey] = set()
+        self._pending_terms: Dict[str, float] = {}
+        self._trending: Dict[str, float] = {}
+        self._trends_fetched_at: Optional[float] = None
+        self._trends_read_at: Optional[float] = None
+        self._flusher: Optional[asyncio.Task] = None
+        
+        self.round_trips = 0
+        self.failures = 0
+        self.trend_merges = 0
+    
+    @property
+    def ready(self) -> bool:
+        """Whether global term counts have been fetched at least once"""
+        return self._trends_fetched_at is not None
+    
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+    
+    def incr_creator(self, creator_id: str, platform: str, deltas: Dict[str, float]):
+        """Add to a creator's shared counters"""
+        pending = self._pending.setdefault((creator_id, platform), {})
+        for field, delta in deltas.items():
+            pending[field] = pending.get(field, 0.0) + delta
+    
+    def creator(self, creator_id: str, platform: str) -> Dict[str, float]:
+        """A creator's shared counters as last seen, including unsent increments"""
+        key = (creator_id, platform)
+        entry = self._near.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.near_ttl:
+            self._stale.add(key)
+        
+        values = dict(entry[1]) if entry is not None else {}
+        for field, delta in self._pending.get(key, {}).items():
+            values[field] = values.get(field, 0.0) + delta
+        return values
+    
+    def put_creator_state(self, creator_id: str, platform: str, state: Dict[str, float]):
+        """Replace a creator's shared EWMA state; only the latest value is sent"""
+        self._pending_state[(creator_id, platform)] = state
+    
+    def creator_state(self, creator_id: str, platform: str) -> Optional[Dict[str, float]]:
+        """A creator's shared EWMA state as last seen: {} if none is stored, None until fetched"""
+        key = (creator_id, platform)
+        pending = self._pending_state.get(key)
+        if pending is not None:
+            return pending
+        entry = self._near_state.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.near_ttl:
+            self._stale_state.add(key)
+        return entry[1] if entry is not None else None
+    
+    def observe_terms(self, terms: Iterable[str]):
+        """Count one occurrence of each hashtag or topic"""
+        for term in terms:
+            term = TrendDetector.normalize(term)
+            if term:
+                self._pending_terms[term] = self._pending_terms.get(term, 0.0) + 1
+    
+    def is_trending(self, term: str) -> bool:
+        """Whether a term is among the top terms across every replica"""
+        return self._trending.get(TrendDetector.normalize(term), 0.0) >= self.min_count
+    
+    def trending(self) -> Dict[str, float]:
+        return dict(self._trending)
+    
+    def _creator_key(self, key: CreatorKey) -> str:
+        return f'{self.prefix}creator:{key[1]}:{key[0]}'
+    
+    def _state_key(self, key: CreatorKey) -> str:
+        return f'{self.prefix}state:{key[1]}:{key[0]}'
+    
+    def _bucket_key(self, bucket: int) -> str:
+        return f'{self.prefix}terms:{bucket}'
+    
+    async def flush(self):
+        """Send buffered writes and refresh stale entries in one round trip"""
+        pending, self._pending = self._pending, {}
+        states, self._pending_state = self._pending_state, {}
+        terms, self._pending_terms = self._pending_terms, {}
+        refresh = list(set(pending) | self._stale)
+        self._stale = set()
+        refresh_state = list(self._stale_state - set(states))
+        self._stale_state = set()
+        
+        now = time.time()
+        refresh_trends = (
+            self._trends_read_at is None or time.monotonic() - self._trends_read_at >= self.trend_refresh
+        )
+        if not (pending or states or terms or refresh or refresh_state or refresh_trends):
+            return
+        
+        pipe = self.client.pipeline(transaction=False)
+        for key, deltas in pending.items():
+            name = self._creator_key(key)
+            for field, delta in deltas.items():
+                pipe.hincrbyfloat(name, field, delta)
+            pipe.expire(name, self.creator_ttl)
+        for key, state in states.items():
+            name = self._state_key(key)
+            pipe.hset(name, mapping=state)
+            pipe.expire(name, self.creator_ttl)
+        
+        # Commands queued so far only return write acknowledgements
+        first_read = sum(len(deltas) + 1 for deltas in pending.values()) + 2 * len(states)
+        for key in refresh:
+            pipe.hgetall(self._creator_key(key))
+        for key in refresh_state:
+            pipe.hgetall(self._state_key(key))
+        
+        bucket = int(now // self.trend_bucket)
+        if terms:
+            name = self._bucket_key(bucket)
+            for term, count in terms.items():
+                pipe.zincrby(name, count, term)
+            pipe.expire(name, self.trend_window + self.trend_bucket)
+        if refresh_trends:
+            # Whoever takes the lock merges the window for everyone this interval
+            pipe.set(f'{self.prefix}terms:merge-lock', '1', nx=True, px=int(self.trend_refresh * 1000))
+            pipe.zrevrange(self._window_key(), 0, self.top_n - 1, withscores=True)
+        
+        try:
+            results = await pipe.execute()
+        except Exception:
+            self.failures += 1
+            self._restore(pending, states, terms, refresh, refresh_state)
+            raise
+        self.round_trips += 1
+        
+        fetched_at = time.monotonic()
+        for key, state in states.items():
+            self._remember(self._near_state, key, fetched_at, state)
+        for index, key in enumerate(refresh):
+            self._remember(self._near, key, fetched_at, results[first_read + index])
+        first_state = first_read + len(refresh)
+        for index, key in enumerate(refresh_state):
+            self._remember(self._near_state, key, fetched_at, results[first_state + index])
+        
+        if refresh_trends:
+            self._trends_read_at = fetched_at
+            elected, top = results[-2], results[-1]
+            if elected:
+                top = await self._merge_trend_window(bucket)
+            # Until a merged window exists, trends come from this replica's own detector
+            if top or elected or self.ready:
+                self._trending = {
+                    term if isinstance(term, str) else term.decode(): float(score)
+                    for term, score in top
+                }
+                self._trends_fetched_at = fetched_at
+    
+    async def _merge_trend_window(self, bucket: int) -> List[Tuple[Any, float]]:
+        """Rebuild the shared top-terms set from the buckets in the window"""
+        window = self._window_key()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zunionstore(window, self._bucket_key_range(bucket))
+        pipe.expire(window, self.trend_window)
+        pipe.zrevrange(window, 0, self.top_n - 1, withscores=True)
+        results = await pipe.execute()
+        self.round_trips += 1
+        self.trend_merges += 1
+        return results[-1]
+    
+    def _window_key(self) -> str:
+        return f'{self.prefix}terms:window'
+    
+    def _bucket_key_range(self, bucket: int) -> List[str]:
+        buckets = max(self.trend_window // self.trend_bucket, 1)
+        return [self._bucket_key(bucket - offset) for offset in range(buckets)]
+    
+    def _remember(self, near: 'OrderedDict[CreatorKey, Tuple[float, Dict[str, float]]]', key: CreatorKey,
+                  fetched_at: float, values: Dict[Any, Any]):
+        near[key] = (fetched_at, {
+            field if isinstance(field, str) else field.decode(): float(value)
+            for field, value in values.items()
+        })
+        near.move_to_end(key)
+        while len(near) > self.max_entries:
+            near.popitem(last=False)
+    
+    def _restore(self, pending: Dict[CreatorKey, Dict[str, float]], states: Dict[CreatorKey, Dict[str, float]],
+                 terms: Dict[str, float], refresh: List[CreatorKey], refresh_state: List[CreatorKey]):
+        """Put back a failed flush, merging writes made since"""
+        for key, deltas in pending.items():
+            self.incr_creator(key[0], key[1], deltas)
+        for key, state in states.items():
+            self._pending_state.setdefault(key, state)
+        for term, count in terms.items():
+            self._pending_terms[term] = self._pending_terms.get(term, 0.0) + count
+        self._stale.update(refresh)
+        self._stale_state.update(refresh_state)
+    
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Shared cache flush failed, serving near-cache values: {e}")
+    
+    async def close(self):
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Could not send final shared cache updates: {e}")
+        await self.client.close()
+
+class LocalRedis:
+    """In-process stand-in for the Redis commands SharedCache uses.
+    
+    For tests and single-replica runs; state is not shared between
+    processes. Expiry is applied lazily when a key is read.
+    """
+    
+    def __init__(self):
+        self._data: Dict[str, Dict[str, float]] = {}
+        self._expires: Dict[str, float] = {}
+    
+    def pipeline(self, transaction: bool = False) -> '_LocalPipeline':
+        return _LocalPipeline(self)
+    
+    def _get(self, name: str, create: bool = False) -> Optional[Dict[str, float]]:
+        expires = self._expires.get(name)
+        if expires is not None and expires <= time.time():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        if create:
+            return self._data.setdefault(name, {})
+        return self._data.get(name)
+    
+    def hincrbyfloat(self, name: str, key: str, amount: float = 1.0) -> float:
+        values = self._get(name, create=True)
+        values[key] = values.get(key, 0.0) + amount
+        return values[key]
+    
+    def hset(self, name: str, mapping: Dict[str, Any]) -> int:
+        values = self._get(name, create=True)
+        added = len(set(mapping) - set(values))
+        values.update(mapping)
+        return added
+    
+    def set(self, name: str, value: Any, nx: bool = False, px: Optional[int] = None) -> Optional[bool]:
+        if nx and self._get(name) is not None:
+            return None
+        self._data[name] = {'': value}
+        if px is not None:
+            self._expires[name] = time.time() + px / 1000
+        else:
+            self._expires.pop(name, None)
+        return True
+    
+    def hgetall(self, name: str) -> Dict[str, float]:
+        return dict(self._get(name) or {})
+    
+    def zincrby(self, name: str, amount: float, value: str) -> float:
+        return self.hincrbyfloat(name, value, amount)
+    
+    def zunionstore(self, dest: str, keys: List[str]) -> int:
+        union: Dict[str, float] = {}
+        for name in keys:
+            for member, score in (self._get(name) or {}).items():
+                union[member] = union.get(member, 0.0) + score
+        self._data[dest] = union
+        self._expires.pop(dest, None)
+        return len(union)
+    
+    def zrevrange(self, name: str, start: int, end: int, withscores: bool = False) -> List[Any]:
+        ranked = sorted((self._get(name) or {}).items(), key=lambda item: item[1], reverse=True)
+        ranked = ranked[start:end + 1 if end >= 0 else None]
+        return ranked if withscores else [member for member, _ in ranked]
+    
+    def expire(self, name: str, seconds: int) -> bool:
+        if self._get(name) is None:
+            return False
+        self._expires[name] = time.time() + seconds
+        return True
+    
+    async def close(self):
+        pass
+
+class _LocalPipeline:
+    """Queues LocalRedis commands and runs them on execute(), like a Redis pipeline"""
+    
+    def __init__(self, redis: LocalRedis):
+        self.redis = redis
+        self.commands: List[Tuple[Any, tuple, dict]] = []
+    
+    def __getattr__(self, name: str):
+        command = getattr(self.redis, name)
+        
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+        return queue
+    
+    async def execute(self) -> List[Any]:
+        commands, self.commands = self.commands, []
+        return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+def create_shared_cache(mode: str, url: Optional[str] = None, **options) -> Optional[SharedCache]:
+    """Cache for SHARED_CACHE; 'off' means in-process state only"""
+    mode = mode.lower()
+    if mode == 'off':
+        return None
+    if mode == 'local':
+        return SharedCache(LocalRedis(), **options)
+    if mode == 'redis':
+        if aioredis is None:
+            raise RuntimeError("SHARED_CACHE=redis requires the redis package")
+        return SharedCache(aioredis.from_url(url or 'redis://localhost:6379', decode_responses=True), **options)
+    raise ValueError(f"Unknown shared cache mode: {mode}")
@@ -0,0 +1 @@
+# Storage sinks
\ No newline at end of file
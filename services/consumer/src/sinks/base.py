@@ -0,0 +1,157 @@
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from loguru import logger
+from ..retry import transient_db_retry
+
+# Called with an item the database rejected and the error; may be async
+FailureHandler = Callable[[Any, Any], Optional[Awaitable[None]]]
+
+class PartialWriteError(Exception):
+    """Raised by _write() when a write failed after its first `written` items were
+    written or set aside; only the rest are buffered again"""
+    
+    def __init__(self, written: int, error: BaseException):
+        super().__init__(str(error))
+        self.written = written
+        self.error = error
+
+class BufferedWriter:
+    """Base class for sinks that buffer items and write them in bulk.
+    
+    Items are flushed once max_items are buffered, once the buffered size
+    reaches max_bytes, or after max_delay seconds, whichever comes first. A
+    failed flush puts its items back at the head of the buffer so the next
+    flush retries them; callers that need durability (e.g. before committing
+    Kafka offsets) await flush() and only proceed if it succeeds.
+    
+    Buffered and in-flight items are capped at four times max_items (twice
+    max_bytes): add() flushes until there is room, and if that flush fails
+    the item is not buffered and the error is raised to the caller, which
+    owns the item from then on.
+    
+    Transient database errors are retried in place with backoff. Items the
+    database rejects outright are handed to on_failure once the rest are
+    written; if on_failure raises, they are kept and handed over again on
+    the next flush, which fails until then.
+    """
+    
+    def __init__(self, name: str, max_items: int = 500, max_delay: float = 0.05,
+                 max_bytes: Optional[int] = None, on_failure: Optional[FailureHandler] = None,
+                 retry_attempts: int = 3, retry_max_wait: float = 2.0):
+        self.name = name
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.on_failure = on_failure
+        self.retry_attempts = retry_attempts
+        self.retry_max_wait = retry_max_wait
+        self.failed_count = 0
+        
+        self._buffer: List[Tuple[Any, int]] = []
+        self._rejected: List[Tuple[Any, Any]] = []
+        self._buffered_bytes = 0
+        self._writing_items = 0
+        self._writing_bytes = 0
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+    
+    @property
+    def pending(self) -> int:
+        return len(self._buffer) + len(self._rejected)
+    
+    def start(self):
+        """Start the background flush task"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+    
+    async def add(self, item: Any, size: int = 0):
+        """Buffer an item, waking the flusher once a limit is reached"""
+        # Apply backpressure if flushes are falling behind
+        while self._at_capacity():
+            await self.flush()
+        
+        self._buffer.append((item, size))
+        self._buffered_bytes += size
+        
+        if len(self._buffer) >= self.max_items or self._over_bytes(1):
+            self._wakeup.set()
+    
+    async def flush(self):
+        """Write every buffered item; raises if the write fails"""
+        async with self._lock:
+            if self._buffer:
+                entries, self._buffer = self._buffer, []
+                entries_bytes, self._buffered_bytes = self._buffered_bytes, 0
+                self._writing_items, self._writing_bytes = len(entries), entries_bytes
+                try:
+                    await self._write([item for item, _ in entries])
+                except PartialWriteError as e:
+                    unwritten = entries[e.written:]
+                    self._buffer[:0] = unwritten
+                    self._buffered_bytes += sum(size for _, size in unwritten)
+                    raise e.error
+                except Exception:
+                    self._buffer[:0] = entries
+                    self._buffered_bytes += entries_bytes
+                    raise
+                finally:
+                    self._writing_items = self._writing_bytes = 0
+            
+            await self._hand_off_rejected()
+    
+    async def _write(self, items: List[Any]):
+        raise NotImplementedError
+    
+    async def _with_retry(self, write: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run a write, retrying transient database errors with backoff"""
+        async for attempt in transient_db_retry(self.retry_attempts, self.retry_max_wait):
+            with attempt:
+                return await write(*args, **kwargs)
+    
+    def _reject(self, item: Any, error: Any):
+        """Set aside an item the database will not accept"""
+        self.failed_count += 1
+        self._rejected.append((item, error))
+    
+    async def _hand_off_rejected(self):
+        while self._rejected:
+            item, error = self._rejected[0]
+            result = self.on_failure(item, error)
+            if inspect.isawaitable(result):
+                await result
+            self._rejected.pop(0)
+    
+    def _over_bytes(self, factor: int) -> bool:
+        return self.max_bytes is not None and self._buffered_bytes >= self.max_bytes * factor
+    
+    def _at_capacity(self) -> bool:
+        items = len(self._buffer) + self._writing_items
+        size = self._buffered_bytes + self._writing_bytes
+        return items >= self.max_items * 4 or (self.max_bytes is not None and size >= self.max_bytes * 2)
+    
+    async def _flush_periodically(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Bulk write to {self.name} failed, {self.pending} items pending: {e}")
+    
+    async def close(self):
+        """Stop the flusher and write any remaining items"""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        
+        await self.flush()
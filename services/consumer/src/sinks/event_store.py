@@ -0,0 +1,211 @@
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, List, Optional
+import asyncpg
+from loguru import logger
+from ..records import EnrichedEvent, Signals, SocialEvent
+
+# Columns derived from the raw event by enrichment and signal extraction
+SIGNAL_COLUMNS = (
+    'audience_size', 'total_engagement', 'engagement_rate', 'engagement_velocity',
+    'viral_coefficient', 'engagement_quality', 'sentiment', 'sentiment_confidence',
+    'engagement_potential', 'trend_alignment', 'viral_potential', 'brand_safety',
+    'creator_value', 'audience_quality', 'hashtags', 'topics', 'analysis_deferred'
+)
+
+# Signal inputs that came from stream state when the event was processed
+STREAM_COLUMNS = ('engagement_velocity', 'trend_alignment', 'audience_quality')
+
+# Typed columns, in insert order; the raw event goes last, compressed
+EVENT_COLUMNS = (
+    ('created_at', 'event_time', 'creator_id', 'platform', 'post_id') + SIGNAL_COLUMNS + ('payload',)
+)
+
+# Raised when another worker runs the same CREATE ... IF NOT EXISTS at the same moment
+CONCURRENT_DDL_ERRORS = (
+    asyncpg.exceptions.DuplicateTableError,
+    asyncpg.exceptions.DuplicateObjectError,
+    asyncpg.exceptions.UniqueViolationError
+)
+
+async def _create_if_missing(conn, statement: str) -> bool:
+    """Run an idempotent CREATE; False if a concurrent worker created the object first"""
+    try:
+        await conn.execute(statement)
+    except CONCURRENT_DDL_ERRORS:
+        return False
+    return True
+
+def _event_time(posted_at: Optional[datetime]) -> Optional[datetime]:
+    return posted_at.replace(tzinfo=timezone.utc) if posted_at is not None else None
+
+class CompactEventLayout:
+    """Compact row layout for enriched social events.
+    
+    The signals and scores that get queried go into typed columns. The raw
+    event is stored once, zlib-compressed; everything else SocialProcessor
+    derives can be rebuilt from it. The table is range-partitioned by day
+    on created_at, so old days can be detached or dropped without bloat.
+    A default partition catches rows if maintenance falls behind; they are
+    moved out when their day's partition is created.
+    """
+    
+    def __init__(self, encode: Callable[[Any], bytes], table: str = 'social_events',
+                 compression_level: int = 6, days_ahead: int = 3):
+        self.encode = encode
+        self.table = table
+        self.compression_level = compression_level
+        self.days_ahead = days_ahead
+    
+    @property
+    def columns(self) -> tuple:
+        return EVENT_COLUMNS
+    
+    def row(self, event: SocialEvent, enriched: EnrichedEvent, signals: Signals,
+            created_at: datetime) -> tuple:
+        """One row for an event, its enrichment and its signals"""
+        post_id = event.data.get('id')
+        return (
+            created_at,
+            _event_time(event.posted_at),
+            str(event.creator_id),
+            event.platform,
+            str(post_id) if post_id is not None else None
+        ) + self.signal_values(enriched, signals) + (
+            zlib.compress(self.encode(event.raw), self.compression_level),
+        )
+    
+    def signal_values(self, enriched: EnrichedEvent, signals: Signals) -> tuple:
+        """Values of SIGNAL_COLUMNS for an event"""
+        engagement = signals.engagement
+        content = signals.content
+        scores = signals.scores
+        return (
+            int(signals.audience.audience_size or 0),
+            int(engagement.total_engagement or 0),
+            float(engagement.engagement_rate or 0),
+            float(engagement.engagement_velocity or 0),
+            float(engagement.viral_coefficient or 0),
+            float(engagement.engagement_quality or 0),
+            content.sentiment,
+            float(content.sentiment_confidence or 0),
+            float(content.engagement_potential or 0),
+            float(signals.trends.trend_alignment_score or 0),
+            float(scores.viral_potential or 0),
+            float(scores.brand_safety or 0),
+            float(scores.creator_value or 0),
+            float(signals.audience.audience_quality_score),
+            list(enriched.hashtags or []),
+            list(content.topics or []),
+            enriched.analysis_deferred
+        )
+    
+    @staticmethod
+    def decode_payload(payload: bytes, decode: Callable[[bytes], Any]) -> Any:
+        """Raw event back from a payload column"""
+        return decode(zlib.decompress(payload))
+    
+    async def ensure_schema(self, pool):
+        async with pool.acquire() as conn:
+            await _create_if_missing(conn, f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    created_at TIMESTAMPTZ NOT NULL,
+                    event_time TIMESTAMPTZ,
+                    creator_id TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    post_id TEXT,
+                    audience_size BIGINT NOT NULL,
+                    total_engagement BIGINT NOT NULL,
+                    engagement_rate REAL NOT NULL,
+                    engagement_velocity REAL NOT NULL,
+                    viral_coefficient REAL NOT NULL,
+                    engagement_quality REAL NOT NULL,
+                    sentiment TEXT,
+                    sentiment_confidence REAL NOT NULL,
+                    engagement_potential REAL NOT NULL,
+                    trend_alignment REAL NOT NULL,
+                    viral_potential REAL NOT NULL,
+                    brand_safety REAL NOT NULL,
+                    creator_value REAL NOT NULL,
+                    audience_quality REAL,
+                    hashtags TEXT[] NOT NULL,
+                    topics TEXT[] NOT NULL,
+                    analysis_deferred BOOLEAN NOT NULL DEFAULT false,
+                    payload BYTEA NOT NULL
+                ) PARTITION BY RANGE (created_at)
+            """)
+            # Added after the first release; rows written before it have NULL
+            await conn.execute(f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS audience_quality REAL")
+            await conn.execute(
+                f"ALTER TABLE {self.table} "
+                f"ADD COLUMN IF NOT EXISTS analysis_deferred BOOLEAN NOT NULL DEFAULT false"
+            )
+            await _create_if_missing(
+                conn,
+                f"CREATE INDEX IF NOT EXISTS {self.table}_creator_idx "
+                f"ON {self.table} (creator_id, platform, created_at)"
+            )
+            # Rows still waiting for content analysis (see LoadShedder)
+            await _create_if_missing(
+                conn,
+                f"CREATE INDEX IF NOT EXISTS {self.table}_deferred_idx "
+                f"ON {self.table} (created_at) WHERE analysis_deferred"
+            )
+            await _create_if_missing(
+                conn, f"CREATE TABLE IF NOT EXISTS {self.table}_default PARTITION OF {self.table} DEFAULT"
+            )
+    
+    async def ensure_partitions(self, pool, today: Optional[date] = None) -> List[str]:
+        """Create daily partitions from yesterday to days_ahead days from now.
+        
+        Safe to run from several workers at once; a partition another
+        worker created first is skipped. Rows of a day that already went to
+        the default partition are moved into the new one. A day that still
+        fails is logged and left to the next run, without holding up the
+        days after it.
+        """
+        today = today or datetime.now(timezone.utc).date()
+        created = []
+        async with pool.acquire() as conn:
+            for offset in range(-1, self.days_ahead + 1):
+                day = today + timedelta(days=offset)
+                name = f"{self.table}_{day:%Y%m%d}"
+                try:
+                    if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name):
+                        continue
+                    if await self._create_partition(conn, name, day):
+                        created.append(name)
+                except Exception as e:
+                    logger.error(f"Could not create partition {name}: {e}")
+        
+        if created:
+            logger.info(f"Created partitions {', '.join(created)}")
+        return created
+    
+    async def _create_partition(self, conn, name: str, day: date) -> bool:
+        bounds = f"FROM ('{day} 00:00+00') TO ('{day + timedelta(days=1)} 00:00+00')"
+        try:
+            return await _create_if_missing(
+                conn, f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {self.table} FOR VALUES {bounds}"
+            )
+        except asyncpg.exceptions.CheckViolationError:
+            # The default partition holds rows of this day (maintenance fell behind)
+            pass
+        
+        async with conn.transaction():
+            # Workers splitting the same day take turns; the later ones find it done
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", name)
+            if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name):
+                return False
+            await conn.execute(f"CREATE TABLE {name} (LIKE {self.table} INCLUDING DEFAULTS)")
+            moved = await conn.execute(f"""
+                WITH moved AS (
+                    DELETE FROM {self.table}_default
+                    WHERE created_at >= '{day} 00:00+00' AND created_at < '{day + timedelta(days=1)} 00:00+00'
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            """)
+            await conn.execute(f"ALTER TABLE {self.table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+        logger.info(f"Moved rows of {day} out of {self.table}_default into {name} ({moved})")
+        return True
@@ -0,0 +1,44 @@
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from pymongo.errors import BulkWriteError
+from .base import BufferedWriter, FailureHandler
+
+# Duplicate key: the document was already written by an earlier attempt
+DUPLICATE_KEY_ERROR = 11000
+
+class MongoBulkWriter(BufferedWriter):
+    """Buffer documents and write them with unordered insert_many().
+    
+    Unordered inserts let the server write every valid document even when
+    some fail. Per-document failures are handed to on_failure instead of
+    failing the batch, so one bad document never causes the rest to be
+    retried; only connection-level errors put the whole batch back.
+    """
+    
+    def __init__(self, collection, max_docs: int = 500, max_delay: float = 0.05,
+                 max_bytes: int = 16 * 1024 * 1024, on_failure: Optional[FailureHandler] = None,
+                 retry_attempts: int = 3, retry_max_wait: float = 2.0):
+        super().__init__(
+            collection.name, max_items=max_docs, max_delay=max_delay, max_bytes=max_bytes,
+            on_failure=on_failure, retry_attempts=retry_attempts, retry_max_wait=retry_max_wait
+        )
+        self.collection = collection
+        if self.on_failure is None:
+            self.on_failure = self._log_failure
+    
+    async def _write(self, docs: List[Dict[str, Any]]):
+        try:
+            # insert_many() assigns _ids on the first attempt, so a retry only
+            # reports documents that already landed as duplicates
+            await self._with_retry(self.collection.insert_many, docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                if error.get('code') == DUPLICATE_KEY_ERROR:
+                    continue
+                self._reject(docs[error['index']], error)
+    
+    def _log_failure(self, doc: Dict[str, Any], error: Dict[str, Any]):
+        logger.error(
+            f"Mongo insert into {self.name} failed for creator {doc.get('creator_id', 'unknown')}: "
+            f"[{error.get('code')}] {error.get('errmsg')}"
+        )
@@ -0,0 +1,65 @@
+from typing import Any, List, Optional, Sequence, Tuple
+from ..retry import is_transient_db_error
+from .base import BufferedWriter, FailureHandler, PartialWriteError
+
+class PostgresBulkWriter(BufferedWriter):
+    """Buffer rows for one table and write them with executemany() or COPY.
+    
+    A batch is written atomically, so one bad row fails all of them. With
+    an on_failure handler, a rejected batch is split in halves until the
+    rows that fail on their own are found; those go to on_failure and the
+    rest are written. Without one, the whole batch stays buffered. If a
+    transient error interrupts that search, only the rows not yet written
+    stay buffered.
+    """
+    
+    def __init__(self, pool, table: str, columns: Sequence[str],
+                 max_rows: int = 500, max_delay: float = 0.05, use_copy: bool = False,
+                 on_failure: Optional[FailureHandler] = None,
+                 retry_attempts: int = 3, retry_max_wait: float = 2.0):
+        super().__init__(
+            table, max_items=max_rows, max_delay=max_delay, on_failure=on_failure,
+            retry_attempts=retry_attempts, retry_max_wait=retry_max_wait
+        )
+        self.pool = pool
+        self.table = table
+        self.columns = list(columns)
+        self.use_copy = use_copy
+        
+        placeholders = ', '.join(f'${i + 1}' for i in range(len(self.columns)))
+        self.insert_sql = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES ({placeholders})"
+    
+    async def _write(self, rows: List[Tuple[Any, ...]]):
+        try:
+            await self._with_retry(self._insert, rows)
+        except Exception as e:
+            if self.on_failure is None or is_transient_db_error(e):
+                raise
+            await self._isolate(rows, e)
+    
+    async def _isolate(self, rows: List[Tuple[Any, ...]], error: Exception, offset: int = 0):
+        """Write rows half by half, rejecting the ones that fail alone.
+        
+        offset is the position of rows[0] in the flushed batch. Halves are
+        written in order, so when one hits a transient error every row
+        before it is written or rejected and every row from it on is not.
+        """
+        if len(rows) == 1:
+            self._reject(rows[0], error)
+            return
+        
+        middle = len(rows) // 2
+        for start, half in ((0, rows[:middle]), (middle, rows[middle:])):
+            try:
+                await self._with_retry(self._insert, half)
+            except Exception as e:
+                if is_transient_db_error(e):
+                    raise PartialWriteError(offset + start, e) from e
+                await self._isolate(half, e, offset + start)
+    
+    async def _insert(self, rows: List[Tuple[Any, ...]]):
+        async with self.pool.acquire() as conn:
+            if self.use_copy:
+                await conn.copy_records_to_table(self.table, records=rows, columns=self.columns)
+            else:
+                await conn.executemany(self.insert_sql, rows)
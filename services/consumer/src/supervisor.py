@@ -0,0 +1,175 @@
+"""Run several EventConsumer processes in one container.
+
+Each worker is a separate process with its own event loop and its own
+member of the enrichment-consumer group, so Kafka spreads partitions across
+them. Run with:
+    
+    python -m src.supervisor
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from loguru import logger
+from prometheus_client import CollectorRegistry, start_http_server
+from prometheus_client import multiprocess
+
+WORKER_LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "worker {extra[worker]} | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
+)
+
+# A worker that ran at least this long is considered healthy again
+STABLE_RUN_S = 60
+
+def _run_worker(index: int, config: Dict[str, str]):
+    """Worker process entry point"""
+    os.environ.update(config)
+    logger.configure(extra={'worker': index})
+    logger.remove()
+    logger.add(sys.stderr, format=WORKER_LOG_FORMAT)
+    
+    # Imported here so prometheus_client sees PROMETHEUS_MULTIPROC_DIR
+    from .consumer import EventConsumer, serve
+    
+    # The supervisor decides when to stop; SIGINT from a terminal goes to the whole group,
+    # so workers ignore it and only drain on the SIGTERM the supervisor sends
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(serve(EventConsumer(), signals=(signal.SIGTERM,)))
+
+class WorkerSlot:
+    """One supervised worker and its restart bookkeeping"""
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.restart_at = 0.0
+        self.backoff = 0.0
+
+class Supervisor:
+    """Start N consumer processes, restart crashed ones and drain them on SIGTERM.
+    
+    Workers get the supervisor's configuration (environment plus .env) and
+    write their metrics to a shared directory, which the supervisor serves
+    combined on METRICS_PORT.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, metrics_port: int = 9100,
+                 shutdown_timeout: float = 60.0, max_backoff: float = 30.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.metrics_port = metrics_port
+        self.shutdown_timeout = shutdown_timeout
+        self.max_backoff = max_backoff
+        
+        self.context = multiprocessing.get_context('spawn')
+        self.slots = [WorkerSlot(index) for index in range(self.workers)]
+        self.metrics_dir: Optional[str] = None
+        self._stopping = False
+    
+    def worker_config(self) -> Dict[str, str]:
+        config = dict(os.environ)
+        config['PROMETHEUS_MULTIPROC_DIR'] = self.metrics_dir
+        # Only the supervisor serves /metrics
+        config['METRICS_PORT'] = '0'
+        # Worker processes already use every core; don't multiply analysis pools by default
+        config.setdefault('ANALYSIS_WORKERS', '1')
+        return config
+    
+    def run(self):
+        """Supervise workers until SIGTERM or SIGINT"""
+        self.metrics_dir = tempfile.mkdtemp(prefix='consumer-metrics-')
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = self.metrics_dir
+        if self.metrics_port:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry, path=self.metrics_dir)
+            start_http_server(self.metrics_port, registry=registry)
+            logger.info(f"Combined metrics endpoint listening on :{self.metrics_port}")
+        
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        
+        logger.info(f"Starting {self.workers} consumer workers")
+        config = self.worker_config()
+        for slot in self.slots:
+            self._start(slot, config)
+        
+        try:
+            while not self._stopping:
+                self._check_workers(config)
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+    
+    def _request_stop(self, signum, frame):
+        logger.info(f"Received signal {signum}, draining workers")
+        self._stopping = True
+    
+    def _start(self, slot: WorkerSlot, config: Dict[str, str]):
+        slot.process = self.context.Process(
+            target=_run_worker, args=(slot.index, config), name=f'consumer-worker-{slot.index}'
+        )
+        slot.process.start()
+        slot.started_at = time.monotonic()
+        logger.info(f"Worker {slot.index} started (pid {slot.process.pid})")
+    
+    def _check_workers(self, config: Dict[str, str]):
+        now = time.monotonic()
+        for slot in self.slots:
+            process = slot.process
+            if process is not None and process.is_alive():
+                continue
+            
+            if process is not None:
+                # Drops the worker's live gauges (lag, in-flight events) from the combined sums
+                multiprocess.mark_process_dead(process.pid, self.metrics_dir)
+                slot.process = None
+                
+                # Back off exponentially while a worker keeps crashing soon after start
+                if now - slot.started_at >= STABLE_RUN_S:
+                    slot.backoff = 0.0
+                slot.backoff = min(max(slot.backoff * 2, 1.0), self.max_backoff)
+                slot.restart_at = now + slot.backoff
+                logger.error(
+                    f"Worker {slot.index} exited with code {process.exitcode}, "
+                    f"restarting in {slot.backoff:.0f}s"
+                )
+            
+            if now >= slot.restart_at:
+                self._start(slot, config)
+    
+    def _shutdown(self):
+        """Send SIGTERM to every worker and wait for them to drain"""
+        running = [slot.process for slot in self.slots if slot.process is not None and slot.process.is_alive()]
+        for process in running:
+            process.terminate()
+        
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in running:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"Worker pid {process.pid} did not drain in time, killing it")
+                process.kill()
+                process.join()
+        logger.info("All workers stopped")
+
+def main():
+    load_dotenv()
+    supervisor = Supervisor(
+        workers=int(os.getenv('WORKER_PROCESSES', '0')) or None,
+        metrics_port=int(os.getenv('METRICS_PORT', '9100')),
+        shutdown_timeout=float(os.getenv('SUPERVISOR_SHUTDOWN_TIMEOUT_S', '60')),
+        max_backoff=float(os.getenv('SUPERVISOR_MAX_RESTART_BACKOFF_S', '30'))
+    )
+    supervisor.run()
+
+if __name__ == "__main__":
+    main()
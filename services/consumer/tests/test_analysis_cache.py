@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+import pytest
+from src.processors import analysis_cache
+from src.processors.analysis_cache import AnalysisCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(analysis_cache, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+def test_entries_expire_after_ttl(clock):
+    cache = AnalysisCache(ttl=60)
+    cache.put('hello #ai', {'topics': ['ai']})
+    
+    clock.now += 60
+    assert cache.get('hello #ai') == {'topics': ['ai']}
+    clock.now += 1
+    assert cache.get('hello #ai') is None
+    assert len(cache) == 0
+
+def test_put_refreshes_ttl(clock):
+    cache = AnalysisCache(ttl=60)
+    cache.put('post', {'v': 1})
+    clock.now += 50
+    cache.put('post', {'v': 2})
+    clock.now += 50
+    
+    assert cache.get('post') == {'v': 2}
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = AnalysisCache(max_entries=2)
+    cache.put('a', {'v': 'a'})
+    cache.put('b', {'v': 'b'})
+    cache.get('a')
+    cache.put('c', {'v': 'c'})
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == {'v': 'a'}
+    assert cache.get('c') == {'v': 'c'}
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+def test_hit_rate_counts_expired_lookups_as_misses(clock):
+    cache = AnalysisCache(ttl=10)
+    assert cache.hit_rate == 0.0
+    
+    cache.get('a')
+    cache.put('a', {'v': 'a'})
+    cache.get('a')
+    cache.get('a')
+    clock.now += 11
+    cache.get('a')
+    
+    assert cache.stats() == {'entries': 0, 'hits': 2, 'misses': 2, 'evictions': 0, 'hit_rate': 0.5}
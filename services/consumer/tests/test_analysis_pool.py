@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+import pytest
+from src import analysis_pool
+from src.analysis_pool import AnalysisPool, run_analysis_batch
+from src.processors.content_analyzer import ContentAnalyzer
+from src.processors.signal_extractor import SignalExtractor
+from src.records import EnrichedEvent, SocialEvent
+
+def make_event(creator_id: str, timestamp: str, likes=10) -> EnrichedEvent:
+    event = SocialEvent(creator_id, 'twitter', timestamp, {}, {})
+    return EnrichedEvent(event, metrics={'likes': likes, 'comments': 2}, content='Loving this new #ai tool')
+
+HOUR_AGO = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+
+def broken_event(creator_id: str) -> EnrichedEvent:
+    # Metrics that can't be summed make signal extraction raise TypeError
+    return make_event(creator_id, HOUR_AGO, likes='ten')
+
+def test_failing_event_does_not_fail_its_batch():
+    batch = [(make_event('a', HOUR_AGO), None), (broken_event('b'), None), (make_event('c', HOUR_AGO), None)]
+    
+    results = run_analysis_batch(ContentAnalyzer(), SignalExtractor(), batch)
+    
+    assert isinstance(results[1], TypeError)
+    for analysis, signals in (results[0], results[2]):
+        assert analysis is not None
+        assert signals.engagement.total_engagement == 12
+
+def test_pool_resolves_each_future_on_its_own():
+    async def run():
+        pool = AnalysisPool(mode='thread', workers=2, batch_size=3, batch_wait=0.01)
+        pool.start()
+        try:
+            return await asyncio.gather(
+                pool.submit(make_event('a', HOUR_AGO)),
+                pool.submit(broken_event('b')),
+                pool.submit(make_event('c', HOUR_AGO)),
+                return_exceptions=True
+            )
+        finally:
+            await pool.close()
+    
+    first, failed, last = asyncio.run(run())
+    assert isinstance(failed, TypeError)
+    assert first[1].engagement.total_engagement == 12
+    assert last[1].engagement.total_engagement == 12
+
+def test_thread_workers_get_their_own_extractor(monkeypatch):
+    extractors = {}
+    run = analysis_pool._run_batch_in_thread
+    
+    def record(batch):
+        extractors[threading.get_ident()] = analysis_pool._thread_state.extractor
+        threading.Event().wait(0.05)
+        return run(batch)
+    
+    monkeypatch.setattr(analysis_pool, '_run_batch_in_thread', record)
+    
+    async def submit_batches():
+        pool = AnalysisPool(mode='thread', workers=2, batch_size=1)
+        pool.start()
+        try:
+            await asyncio.gather(*(pool.submit(make_event(str(i), HOUR_AGO)) for i in range(4)))
+        finally:
+            await pool.close()
+    
+    asyncio.run(submit_batches())
+    assert len(extractors) == 2
+    assert len({id(extractor) for extractor in extractors.values()}) == 2
+
+def test_aware_timestamp_gets_a_velocity():
+    # The Node producer sends Dates as ISO strings with a Z suffix
+    two_hours_ago = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat().replace('+00:00', 'Z')
+    batch = [(make_event('a', two_hours_ago), None)]
+    
+    (_, signals), = run_analysis_batch(ContentAnalyzer(), SignalExtractor(), batch)
+    
+    assert signals.engagement.engagement_velocity == pytest.approx(6, rel=0.01)
@@ -0,0 +1,38 @@
+import asyncio
+import json
+import pytest
+from src.backfill import Backfill, RateLimiter, Rescorer
+
+def test_json_rescore_clears_processing_marks():
+    stored = {
+        'creatorId': 'c1',
+        'platform': 'twitter',
+        'timestamp': '2024-05-01T12:00:00',
+        'data': {'id': '42', 'text': 'Great new #ai launch today', 'public_metrics': {'like_count': 3}},
+        'analysis_deferred': True,
+        'duplicate_of': {'post_id': '41', 'platform': 'twitter', 'similarity': 0.9}
+    }
+    
+    results, skipped = Rescorer('json').rescore([((0, 1), json.dumps(stored))])
+    
+    assert skipped == 0
+    [(ctid, payload)] = results
+    rescored = json.loads(payload)
+    assert ctid == (0, 1)
+    assert 'analysis_deferred' not in rescored
+    assert 'duplicate_of' not in rescored
+    assert rescored['analysis']['sentiment']
+
+def test_json_rescore_skips_invalid_rows():
+    results, skipped = Rescorer('json').rescore([((0, 1), json.dumps({'platform': 'twitter'}))])
+    assert results == [] and skipped == 1
+
+def test_rate_limiter_disabled_by_default():
+    asyncio.run(RateLimiter(0).acquire(10 ** 6))
+
+def test_json_layout_refuses_to_rescore_signals():
+    with pytest.raises(ValueError, match='stores no signals'):
+        Backfill(None, layout='json', table='raw_social_data')
+    assert Backfill(None, layout='json', table='raw_social_data', analysis_only=True).write_columns == (
+        'payload_json',
+    )
@@ -0,0 +1,46 @@
+import json
+import pytest
+from src import codec
+from src.codec import CodecRegistry, JsonCodec
+
+EVENT = {'creatorId': 'c1', 'platform': 'twitter', 'data': {'text': 'héllo #ai', 'likes': 3, 'tags': ['a', 'b']}}
+
+@pytest.mark.parametrize('wire_format', ['json', 'msgpack'])
+def test_round_trip_through_headers(wire_format):
+    registry = CodecRegistry(wire_format)
+    data, headers = registry.encode(EVENT)
+    
+    assert headers == [('content-type', registry.encoder.content_type.encode('ascii'))]
+    assert registry.decode(data, headers) == EVENT
+    # A reader configured for the other format still decodes it by its header
+    assert CodecRegistry().decode(data, headers) == EVENT
+
+def test_missing_content_type_is_json():
+    registry = CodecRegistry('msgpack')
+    data = json.dumps(EVENT).encode()
+    
+    assert registry.decode(data) == EVENT
+    assert registry.decode(data, [('trace-id', b'1'), ('content-type', b'')]) == EVENT
+
+def test_content_type_parameters_and_case_are_ignored():
+    data = json.dumps(EVENT).encode()
+    
+    assert CodecRegistry().decode(data, [('Content-Type', b'Application/JSON; charset=utf-8')]) == EVENT
+
+def test_unknown_content_type_is_rejected():
+    with pytest.raises(ValueError, match='application/avro'):
+        CodecRegistry().decode(b'\x00', [('content-type', b'application/avro')])
+
+def test_unavailable_wire_format_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(codec, 'msgpack', None)
+    registry = CodecRegistry('msgpack')
+    data, headers = registry.encode(EVENT)
+    
+    assert headers == [('content-type', b'application/json')]
+    assert json.loads(data) == EVENT
+
+def test_json_encodes_integers_wider_than_64_bits():
+    value = {'views': 2 ** 70, 3: 'non-string key'}
+    
+    assert JsonCodec().decode(JsonCodec().encode(value))['views'] == 2 ** 70
+    assert json.loads(JsonCodec().encode_text({'a': 1})) == {'a': 1}
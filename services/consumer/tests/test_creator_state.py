@@ -0,0 +1,69 @@
+import pytest
+from src.processors.creator_state import CreatorStateStore
+
+HOUR = 3600.0
+
+def test_ewma_reach_growth_and_engagement():
+    store = CreatorStateStore(alpha=0.5, min_history=2)
+    store.update('c1', 'twitter', reach=100, engagement=10)
+    stats = store.update('c1', 'twitter', reach=200, engagement=20)
+    
+    assert stats.events == 2
+    assert stats.ewma_reach == pytest.approx(150)
+    # Reach grew 50% this step; half of that moves the growth average
+    assert stats.ewma_growth == pytest.approx(0.25)
+    assert stats.ewma_engagement == pytest.approx(15)
+    assert stats.var_engagement == pytest.approx(25)
+    
+    signals = store.signals(stats)
+    assert signals['audience_growth_rate'] == pytest.approx(0.25)
+    assert signals['audience_quality_score'] == pytest.approx(1 / (1 + 5 / 15))
+
+def test_signals_wait_for_history():
+    store = CreatorStateStore(min_history=3)
+    stats = store.update('c1', 'tiktok', reach=100, engagement=10, posted_at=0)
+    
+    assert store.signals(stats) == {
+        'audience_growth_rate': None, 'audience_quality_score': None, 'creator_consistency': None
+    }
+
+def test_steady_cadence_is_consistent():
+    steady = CreatorStateStore(min_history=3)
+    erratic = CreatorStateStore(min_history=3)
+    for i in range(5):
+        steady.update('c1', 'youtube', reach=100, engagement=10, posted_at=i * 6 * HOUR)
+    posted_at = 0.0
+    for gap in [1, 20, 2, 30, 1]:
+        posted_at += gap * HOUR
+        erratic.update('c1', 'youtube', reach=100, engagement=10, posted_at=posted_at)
+    
+    assert steady.signals(steady.get('c1', 'youtube'))['creator_consistency'] == pytest.approx(1.0)
+    assert erratic.signals(erratic.get('c1', 'youtube'))['creator_consistency'] < 0.7
+
+def test_metric_refreshes_do_not_move_cadence():
+    store = CreatorStateStore()
+    store.update('c1', 'instagram', reach=100, engagement=10, posted_at=0)
+    store.update('c1', 'instagram', reach=100, engagement=10, posted_at=2 * HOUR)
+    stats = store.update('c1', 'instagram', reach=120, engagement=15, posted_at=2 * HOUR)
+    stats = store.update('c1', 'instagram', reach=130, engagement=18, posted_at=HOUR)
+    
+    assert stats.events == 4
+    assert stats.posts == 2
+    assert stats.ewma_interval == pytest.approx(2 * HOUR)
+    assert stats.last_post_at == 2 * HOUR
+
+def test_least_recently_updated_creator_is_evicted():
+    store = CreatorStateStore(max_creators=2)
+    store.update('a', 'twitter', reach=1, engagement=1)
+    store.update('b', 'twitter', reach=1, engagement=1)
+    store.update('a', 'twitter', reach=1, engagement=1)
+    store.update('c', 'twitter', reach=1, engagement=1)
+    
+    assert len(store) == 2
+    assert store.get('b', 'twitter') is None
+    assert store.get('a', 'twitter').events == 2
+    
+    # Not yet checkpointed, so the evicted aggregates come back with the creator
+    stats = store.update('b', 'twitter', reach=1, engagement=1)
+    assert stats.events == 2
+    assert store.get('a', 'twitter') is None
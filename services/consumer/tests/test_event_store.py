@@ -0,0 +1,98 @@
+import asyncio
+import json
+from datetime import date
+import asyncpg
+from src.sinks.event_store import CompactEventLayout
+
+class RacingPool:
+    """asyncpg pool stand-in where another worker has just created `taken`"""
+    
+    def __init__(self, taken):
+        self.taken = set(taken)
+        self.executed = []
+    
+    def acquire(self):
+        return self
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def fetchval(self, query, name):
+        # The check runs before the other worker's CREATE commits
+        return False
+    
+    async def execute(self, statement):
+        name = statement.split()[5]
+        if name in self.taken:
+            raise asyncpg.exceptions.DuplicateTableError(f'relation "{name}" already exists')
+        self.executed.append(statement)
+
+def test_partitions_created_concurrently_are_skipped():
+    pool = RacingPool(taken={'social_events_20240102'})
+    layout = CompactEventLayout(lambda value: json.dumps(value).encode(), days_ahead=1)
+    
+    created = asyncio.run(layout.ensure_partitions(pool, today=date(2024, 1, 2)))
+    
+    assert created == ['social_events_20240101', 'social_events_20240103']
+    assert all('IF NOT EXISTS' in statement for statement in pool.executed)
+
+class BackloggedConnection:
+    """Connection whose default partition already holds rows of `backlogged` days"""
+    
+    def __init__(self, backlogged, broken=()):
+        self.backlogged = set(backlogged)
+        self.broken = set(broken)
+        self.tables = set()
+        self.executed = []
+    
+    def acquire(self):
+        return self
+    
+    def transaction(self):
+        return self
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def fetchval(self, query, name):
+        return name in self.tables
+    
+    async def execute(self, statement, *args):
+        self.executed.append(statement)
+        words = statement.split()
+        if words[:2] != ['CREATE', 'TABLE']:
+            return 'INSERT 0 3' if 'DELETE' in statement else 'OK'
+        name = words[5] if words[2] == 'IF' else words[2]
+        if name in self.broken:
+            raise asyncpg.exceptions.InsufficientPrivilegeError('permission denied')
+        if 'PARTITION OF' in statement and name in self.backlogged:
+            raise asyncpg.exceptions.CheckViolationError(
+                'updated partition constraint for default partition would be violated by some row'
+            )
+        self.tables.add(name)
+
+def make_layout():
+    return CompactEventLayout(lambda value: json.dumps(value).encode(), days_ahead=1)
+
+def test_rows_in_default_partition_are_moved_to_their_day():
+    conn = BackloggedConnection(backlogged={'social_events_20240101'})
+    
+    created = asyncio.run(make_layout().ensure_partitions(conn, today=date(2024, 1, 2)))
+    
+    assert created == ['social_events_20240101', 'social_events_20240102', 'social_events_20240103']
+    moves = [statement for statement in conn.executed if 'DELETE FROM social_events_default' in statement]
+    assert len(moves) == 1 and "'2024-01-01 00:00+00'" in moves[0]
+    assert any('ATTACH PARTITION social_events_20240101' in statement for statement in conn.executed)
+
+def test_failing_day_does_not_stop_later_days():
+    conn = BackloggedConnection(backlogged=(), broken={'social_events_20240101'})
+    
+    created = asyncio.run(make_layout().ensure_partitions(conn, today=date(2024, 1, 2)))
+    
+    assert created == ['social_events_20240102', 'social_events_20240103']
@@ -0,0 +1,40 @@
+import pytest
+from src.processors import keyword_matcher
+from src.processors.keyword_matcher import KeywordMatcher
+
+TABLES = {
+    'positive': ['love', 'lovely', 'great'],
+    'negative': ['hate', 'awful'],
+    'brands': ['nike', 'apple', 'love']
+}
+TEXT = 'i love this lovely nike drop, love love love. apple is great, lovelove'
+
+@pytest.fixture(params=['pyahocorasick', 'python'])
+def matcher(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(keyword_matcher, 'ahocorasick', None)
+    elif keyword_matcher.ahocorasick is None:
+        pytest.skip('pyahocorasick is not installed')
+    return KeywordMatcher(TABLES)
+
+def test_counts_follow_str_count(matcher):
+    hits = matcher.scan(TEXT)
+    counts = {matcher.keywords[keyword_id]: count for keyword_id, count in hits.items()}
+    assert counts == {word: TEXT.count(word) for word in matcher.keywords if word in TEXT}
+
+def test_shared_keyword_counts_for_every_table(matcher):
+    totals = matcher.group_counts(matcher.scan(TEXT))
+    assert totals == {
+        'positive': TEXT.count('love') + TEXT.count('lovely') + TEXT.count('great'),
+        'negative': 0,
+        'brands': TEXT.count('nike') + TEXT.count('apple') + TEXT.count('love')
+    }
+
+def test_matches_are_in_table_order(matcher):
+    hits = matcher.scan(TEXT)
+    assert matcher.matches(hits, 'brands') == ['nike', 'apple', 'love']
+    assert not matcher.has_match(hits, 'negative')
+
+def test_overlapping_occurrences_are_not_double_counted(matcher):
+    laughs = KeywordMatcher({'laugh': ['haha']})
+    assert laughs.scan('hahahaha') == {0: 'hahahaha'.count('haha')}
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+import pytest
+from src import load_shedder
+from src.load_shedder import LoadShedder
+from src.processors.creator_state import CreatorStateStore
+from src.records import EnrichedEvent, SocialEvent
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(load_shedder, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+def make_shedder(**kwargs):
+    return LoadShedder(**{'lag_high': 1000, 'lag_low': 100, 'latency_high': 0, 'latency_low': 0,
+                          'min_hold': 30, **kwargs})
+
+def test_lag_hysteresis(clock):
+    shedder = make_shedder()
+    shedder.observe_lag(0, 600)
+    shedder.observe_lag(1, 400)
+    assert not shedder.active
+    
+    shedder.observe_lag(1, 401)
+    assert shedder.active
+    
+    # Between the watermarks the mode holds
+    shedder.observe_lag(0, 50)
+    shedder.observe_lag(1, 200)
+    clock.now += 60
+    shedder.observe_lag(1, 200)
+    assert shedder.active
+    
+    shedder.observe_lag(1, 40)
+    assert not shedder.active
+
+def test_exit_waits_for_min_hold(clock):
+    shedder = make_shedder()
+    shedder.observe_lag(0, 5000)
+    clock.now += 10
+    shedder.observe_lag(0, 0)
+    assert shedder.active
+    
+    clock.now += 20
+    shedder.observe_lag(0, 0)
+    assert not shedder.active
+
+def test_latency_watermarks(clock):
+    shedder = make_shedder(lag_high=0, lag_low=0, latency_high=2.0, latency_low=0.5,
+                           latency_alpha=1.0, min_hold=0)
+    shedder.observe_latency(1.5)
+    assert not shedder.active
+    shedder.observe_latency(2.5)
+    assert shedder.active
+    shedder.observe_latency(1.0)
+    assert shedder.active
+    shedder.observe_latency(0.4)
+    assert not shedder.active
+
+def test_lag_of_silent_partitions_expires(clock):
+    shedder = make_shedder(lag_ttl=30)
+    shedder.observe_lag(0, 700)
+    clock.now += 20
+    shedder.observe_lag(1, 500)
+    assert shedder.lag == 1200 and shedder.active
+    
+    # Partition 0 stopped reporting (e.g. moved to another worker)
+    clock.now += 11
+    assert shedder.lag == 500
+    clock.now += 20
+    shedder.observe_lag(1, 80)
+    assert shedder.lag == 80
+    assert not shedder.active
+
+def test_only_low_reach_events_are_deferred(clock, monkeypatch):
+    monkeypatch.setattr(load_shedder, 'random', SimpleNamespace(random=lambda: 0.5))
+    state = CreatorStateStore()
+    shedder = make_shedder(min_reach=10000, sample_rate=0.05, creator_state=state)
+    
+    def event(creator_id, views):
+        raw = {'creatorId': creator_id, 'platform': 'tiktok'}
+        return EnrichedEvent(SocialEvent.from_dict(raw), {'views': views})
+    
+    assert shedder.should_analyze(event('small', 10))
+    shedder.observe_lag(0, 5000)
+    assert not shedder.should_analyze(event('small', 10))
+    assert shedder.should_analyze(event('small', 20000))
+    
+    # A creator's usual reach counts even for a post that hasn't picked up views yet
+    state.update('big', 'tiktok', reach=50000, engagement=100)
+    assert shedder.should_analyze(event('big', 10))
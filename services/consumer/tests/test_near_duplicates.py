@@ -0,0 +1,36 @@
+from src.processors.near_duplicates import NearDuplicateIndex
+from src.processors.parsed_content import ParsedContent
+
+CAPTION = ParsedContent('Huge thanks to everyone who came out to the live stream last night')
+
+def test_cross_post_reuses_original_analysis():
+    index = NearDuplicateIndex()
+    assert index.check(CAPTION, 'c1', 'twitter', '1') is None
+    index.set_analysis('twitter', '1', {'topics': ['music']})
+    
+    duplicate = index.check(CAPTION, 'c1', 'instagram', '9')
+    
+    assert duplicate.to_signal() == {'creator_id': 'c1', 'platform': 'twitter', 'post_id': '1', 'similarity': 1.0}
+    assert duplicate.analysis == {'topics': ['music']}
+
+def test_refresh_of_a_post_is_not_its_own_duplicate():
+    index = NearDuplicateIndex()
+    assert index.check(CAPTION, 'c1', 'twitter', '1') is None
+    assert index.check(CAPTION, 'c1', 'twitter', '1') is None
+
+def test_post_without_id_never_matches_itself():
+    index = NearDuplicateIndex()
+    assert index.check(CAPTION, 'c1', 'tiktok') is None
+    assert index.check(CAPTION, 'c1', 'tiktok') is None
+    assert len(index) == 0
+
+def test_different_text_is_not_a_duplicate():
+    index = NearDuplicateIndex()
+    index.check(CAPTION, 'c1', 'twitter', '1')
+    other = ParsedContent('New recipe video is up, a quick weeknight pasta with garlic and lemon')
+    assert index.check(other, 'c2', 'twitter', '2') is None
+
+def test_short_texts_are_not_compared():
+    index = NearDuplicateIndex(min_words=6)
+    assert index.check(ParsedContent('gm everyone'), 'c1', 'twitter', '1') is None
+    assert len(index) == 0
@@ -0,0 +1,251 @@
+import asyncio
+import pytest
+from aiokafka import TopicPartition
+from aiokafka.errors import IllegalStateError
+from src import metrics
+from src.consumer import EventConsumer
+from src.load_shedder import LoadShedder
+from src.pipeline import ConsumerLane, OffsetTracker, Stage
+
+TP0 = TopicPartition('social-events', 0)
+TP1 = TopicPartition('social-events', 1)
+UNROUTED = TopicPartition('unrouted', 0)
+
+class FakeConsumer:
+    """Kafka consumer stand-in with a fixed assignment"""
+    
+    def __init__(self, assigned, error=None):
+        self.assigned = set(assigned)
+        self.error = error
+        self.commits = []
+    
+    def assignment(self):
+        return set(self.assigned)
+    
+    def highwater(self, tp):
+        return None
+    
+    async def commit(self, offsets):
+        if self.error is not None:
+            raise self.error
+        self.commits.append(dict(offsets))
+
+class FakeMessage:
+    """Decodable message on a topic process_message() ignores"""
+    
+    def __init__(self, tp, offset):
+        self.topic = 'unrouted'
+        self.partition = tp.partition
+        self.offset = offset
+        self.key = None
+        self.value = b'{}'
+        self.headers = ()
+
+def make_lane(consumer):
+    lane = ConsumerLane('enrichment', ('social-events',), [], [], commit_interval=0.01)
+    lane.consumer = consumer
+    return lane
+
+def complete(tracker, tp, *offsets):
+    for offset in offsets:
+        tracker.track(tp, offset)
+    for offset in offsets:
+        tracker.complete(tp, offset)
+
+def test_offset_tracker_waits_for_earlier_offsets():
+    tracker = OffsetTracker()
+    for offset in (5, 6, 7):
+        tracker.track(TP0, offset)
+    tracker.complete(TP0, 7)
+    assert tracker.committable() == {}
+    tracker.complete(TP0, 5)
+    assert tracker.committable() == {TP0: 6}
+    tracker.complete(TP0, 6)
+    assert tracker.committable() == {TP0: 8}
+    
+    tracker.mark_committed({TP0: 8})
+    assert tracker.committable() == {}
+
+def test_commit_skips_revoked_partitions():
+    consumer = FakeConsumer([TP0])
+    lane = make_lane(consumer)
+    complete(lane.offset_tracker, TP0, 1)
+    complete(lane.offset_tracker, TP1, 3)
+    
+    asyncio.run(EventConsumer()._commit_completed(lane))
+    
+    assert consumer.commits == [{TP0: 2}]
+
+def test_commit_survives_illegal_state_error():
+    consumer = FakeConsumer([TP0], error=IllegalStateError('Partition is not assigned'))
+    lane = make_lane(consumer)
+    complete(lane.offset_tracker, TP0, 1)
+    
+    async def run():
+        task = asyncio.create_task(EventConsumer().commit_offsets(lane))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        # Commits go through again once the error clears
+        consumer.error = None
+        await asyncio.sleep(0.05)
+        task.cancel()
+    
+    asyncio.run(run())
+    assert consumer.commits == [{TP0: 2}]
+
+def test_revoked_partitions_are_committed_then_forgotten():
+    consumer = FakeConsumer([TP0, TP1])
+    lane = make_lane(consumer)
+    complete(lane.offset_tracker, TP1, 3)
+    lane.offset_tracker.track(TP1, 4)
+    
+    asyncio.run(EventConsumer()._partitions_revoked(lane, {TP1}))
+    
+    assert consumer.commits == [{TP1: 4}]
+    lane.offset_tracker.complete(TP1, 4)
+    assert lane.offset_tracker.committable() == {}
+
+def test_revoked_partition_lag_is_forgotten():
+    events = EventConsumer()
+    events.load_shedder = LoadShedder(lag_high=100, lag_low=10)
+    lane = make_lane(FakeConsumer([TP0, TP1]))
+    for tp in (TP0, TP1):
+        metrics.CONSUMER_LAG.labels(tp.topic, str(tp.partition)).set(80)
+        events.load_shedder.observe_lag(tp.partition, 80)
+    assert events.load_shedder.active
+    
+    asyncio.run(events._partitions_revoked(lane, {TP1}))
+    
+    samples = {
+        sample.labels['partition']: sample.value
+        for metric in metrics.CONSUMER_LAG.collect() for sample in metric.samples
+    }
+    assert samples == {'0': 80}
+    assert events.load_shedder.lag == 80
+
+def test_batch_of_revoked_partition_is_not_committed():
+    consumer = EventConsumer()
+    consumer.consumer = FakeConsumer([TP0])
+    
+    asyncio.run(consumer._process_partition_batch(TP1, []))
+    
+    assert consumer.consumer.commits == []
+
+def test_batch_commit_illegal_state_is_a_lost_commit():
+    consumer = EventConsumer()
+    consumer.consumer = FakeConsumer([TP0], error=IllegalStateError('Partition is not assigned'))
+    
+    # Must not raise: consume_batches re-raises batch errors and would stop
+    asyncio.run(consumer._process_partition_batch(TP0, [FakeMessage(TP0, 9)]))
+
+class MessageStream(FakeConsumer):
+    """FakeConsumer that also yields a fixed list of messages"""
+    
+    def __init__(self, assigned, messages):
+        super().__init__(assigned)
+        self.messages = messages
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for msg in self.messages:
+            yield msg
+
+class FlushRecorder:
+    """Writer stand-in that logs flushes alongside the consumer's commits"""
+    
+    def __init__(self, log, fail=False):
+        self.log = log
+        self.fail = fail
+    
+    async def flush(self):
+        if self.fail:
+            raise OSError('database down')
+        self.log.append('flush')
+
+def test_message_loop_commits_after_flush():
+    consumer = EventConsumer()
+    consumer.commit_interval = 0
+    consumer.consumer = MessageStream([UNROUTED], [FakeMessage(UNROUTED, offset) for offset in (3, 4)])
+    log = []
+    consumer.writers = [FlushRecorder(log)]
+    
+    asyncio.run(consumer.consume_messages())
+    
+    assert consumer.consumer.commits == [{UNROUTED: 4}, {UNROUTED: 5}]
+    assert log == ['flush', 'flush']
+
+def test_message_loop_holds_offsets_while_flush_fails():
+    consumer = EventConsumer()
+    consumer.commit_interval = 0
+    consumer.consumer = MessageStream([UNROUTED], [FakeMessage(UNROUTED, 3)])
+    consumer.writers = [FlushRecorder([], fail=True)]
+    
+    asyncio.run(consumer.consume_messages())
+    
+    assert consumer.consumer.commits == []
+
+class SubmitRecorder:
+    def __init__(self):
+        self.events = []
+    
+    async def submit(self, event):
+        self.events.append(event)
+
+class ChatMessage(FakeMessage):
+    def __init__(self, offset, value):
+        super().__init__(CHAT, offset)
+        self.topic = CHAT.topic
+        self.value = value
+
+CHAT = TopicPartition('assistant-requests', 0)
+
+def test_chat_lane_admits_json_that_is_not_an_object():
+    events = EventConsumer()
+    lane = make_lane(FakeConsumer([CHAT]))
+    lane.pipeline = SubmitRecorder()
+    
+    async def admit_all():
+        for offset, value in enumerate((b'null', b'[]', b'"hi"')):
+            # Every line gets past the log sampler
+            events.log_sampler._next = 0
+            await events._admit(lane, CHAT, ChatMessage(offset, value))
+    asyncio.run(admit_all())
+    
+    assert [event.value for event in lane.pipeline.events] == [None, [], 'hi']
+
+class DeadLetters:
+    def __init__(self):
+        self.routed = []
+    
+    async def route(self, topic, value, attempt, error, retry=True):
+        self.routed.append((topic, value, retry))
+        return f'{topic}-dlq'
+
+def test_admission_bug_dead_letters_instead_of_stopping_the_lane():
+    events = EventConsumer()
+    events.retry_router = DeadLetters()
+    lane = make_lane(FakeConsumer([CHAT]))
+    lane.pipeline = SubmitRecorder()
+    
+    def broken_key(msg, value):
+        raise AttributeError('no key')
+    events._ordering_key = broken_key
+    asyncio.run(events._admit(lane, CHAT, ChatMessage(0, b'{"q": 1}')))
+    
+    assert events.retry_router.routed == [('assistant-requests', {'q': 1}, False)]
+    assert lane.offset_tracker.committable() == {CHAT: 1}
+
+def stages(queue_size=10):
+    async def handle(event):
+        pass
+    return [Stage('enrich', handle, 2, queue_size), Stage('persist', handle, 1, queue_size)]
+
+def test_lane_max_inflight_defaults_below_stage_capacity():
+    lane = ConsumerLane('enrichment', ('social-events',), stages(), [], max_batch_size=5)
+    assert lane.max_inflight == 33 - 5
+
+def test_lane_rejects_max_inflight_its_stages_cannot_hold():
+    with pytest.raises(ValueError, match='exceeds'):
+        ConsumerLane('enrichment', ('social-events',), stages(), [], max_inflight=34)
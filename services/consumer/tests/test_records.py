@@ -0,0 +1,71 @@
+from datetime import datetime
+import pytest
+from src.processors.social_processor import SocialProcessor
+from src.records import InvalidEvent, SocialEvent
+
+def test_timestamps_are_parsed_as_naive_utc():
+    for timestamp in ('2024-01-01T12:00:00Z', '2024-01-01T14:00:00+02:00', '2024-01-01T12:00:00'):
+        event = SocialEvent.from_dict({'creatorId': 'c1', 'platform': 'twitter', 'timestamp': timestamp})
+        assert event.posted_at == datetime(2024, 1, 1, 12)
+
+def test_unparseable_timestamp_is_invalid():
+    with pytest.raises(InvalidEvent):
+        SocialEvent.from_dict({'creatorId': 'c1', 'platform': 'twitter', 'timestamp': 'yesterday'})
+
+def message(platform, data):
+    return {'creatorId': 'c1', 'platform': platform, 'timestamp': '2024-01-01T12:00:00Z', 'data': data}
+
+# What the dict-based SocialProcessor returned for each platform, minus processed_at
+PLATFORM_SHAPES = [
+    (
+        message('twitter', {'text': 'Big news #AI', 'favorite_count': 8, 'retweet_count': 2, 'impression_count': 200,
+                            'video': True}),
+        {
+            'engagement': {'likes': 8, 'retweets': 2, 'replies': 0, 'quotes': 0, 'impressions': 200},
+            'engagement_rate': 5.0, 'content': 'Big news #AI', 'media_type': 'video', 'hashtags': ['#AI']
+        }
+    ),
+    (
+        message('youtube', {'title': 'My vlog', 'view_count': 100, 'like_count': 5, 'duration': 60,
+                            'description': 'desc', 'tags': ['vlog']}),
+        {
+            'metrics': {'views': 100, 'likes': 5, 'comments': 0, 'duration': 60},
+            'estimated_watch_time': 2400.0, 'content': 'My vlog', 'description': 'desc', 'tags': ['vlog']
+        }
+    ),
+    (
+        message('instagram', {'caption': 'Sunset #travel', 'like_count': 3, 'reach': 50}),
+        {
+            'metrics': {'likes': 3, 'comments': 0, 'saves': 0, 'shares': 0, 'reach': 50},
+            'content': 'Sunset #travel', 'media_type': 'photo', 'hashtags': ['#travel']
+        }
+    ),
+    (
+        message('tiktok', {'desc': 'dance', 'play_count': 900, 'digg_count': 90, 'music': {'title': 'song'}}),
+        {
+            'metrics': {'views': 900, 'likes': 90, 'shares': 0, 'comments': 0},
+            'content': 'dance', 'music': {'title': 'song'}, 'hashtags': []
+        }
+    )
+]
+
+@pytest.mark.parametrize('raw, fields', PLATFORM_SHAPES, ids=[raw['platform'] for raw, _ in PLATFORM_SHAPES])
+def test_enriched_dict_keeps_the_dict_pipeline_shape(raw, fields):
+    enriched, _ = SocialProcessor().process_sync(SocialEvent.from_dict(raw))
+    result = enriched.to_dict()
+    
+    assert datetime.fromisoformat(result.pop('processed_at'))
+    assert result == {**raw, **fields}
+
+def test_analysis_and_unknown_platforms_keep_their_shape():
+    raw = message('twitter', {'text': 'hi'})
+    enriched, _ = SocialProcessor().process_sync(SocialEvent.from_dict(raw))
+    enriched.analysis = {'topics': []}
+    enriched.analysis_deferred = True
+    result = enriched.to_dict()
+    assert result['analysis'] == {'topics': []} and result['analysis_deferred'] is True
+    
+    # Unknown platforms were passed through untouched
+    raw = {**message('mastodon', {'text': 'toot'}), 'metrics': {'boosts': 1}, 'content': 'toot'}
+    enriched, _ = SocialProcessor().process_sync(SocialEvent.from_dict(raw))
+    assert enriched.to_dict() == raw
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from aiokafka import TopicPartition
+from aiokafka.errors import KafkaTimeoutError
+from src.codec import CodecRegistry
+from src.consumer import EventConsumer
+from src.pipeline import ConsumerLane
+from src.records import InvalidEvent
+from src.retry import RETRY_DUE_HEADER, RetryRouter, retry_metadata
+
+RETRY_TP = TopicPartition('social-events-retry-1', 0)
+
+class RecordingProducer:
+    def __init__(self):
+        self.sent = []
+    
+    async def send_and_wait(self, topic, value, headers=None):
+        self.sent.append((topic, value, headers))
+
+def route(router, topic, attempt, retry=True):
+    return asyncio.run(router.route(topic, {'id': 1}, attempt, ValueError('boom'), retry=retry))
+
+def make_router(producer):
+    return RetryRouter(producer, CodecRegistry(), delays=(5, 30))
+
+def test_attempts_move_through_tiers_then_dlq():
+    router = make_router(RecordingProducer())
+    assert [route(router, 'social-events', attempt) for attempt in range(3)] == [
+        'social-events-retry-1', 'social-events-retry-2', 'social-events-dlq'
+    ]
+
+def test_non_retryable_failures_and_topics_go_to_dlq():
+    router = make_router(RecordingProducer())
+    assert route(router, 'social-events', 0, retry=False) == 'social-events-dlq'
+    assert route(router, 'assistant-requests', 0) == 'assistant-requests-dlq'
+
+def test_retry_headers_round_trip():
+    producer = RecordingProducer()
+    router = make_router(producer)
+    route(router, 'social-events', 1)
+    
+    topic, value, headers = producer.sent[0]
+    attempt, due, origin = retry_metadata(headers)
+    
+    assert (attempt, origin) == (2, 'social-events')
+    # Second tier: due after its 30 s delay
+    assert time.time() + 25 < due <= time.time() + 30
+    assert CodecRegistry().decode(value, headers) == {'id': 1}
+
+def test_dead_lettered_rows_are_json_safe():
+    producer = RecordingProducer()
+    router = make_router(producer)
+    asyncio.run(router.dead_letter_record('postgres', {'payload': b'\x00\x01'}, 'rejected'))
+    
+    topic, value, headers = producer.sent[0]
+    assert topic == 'storage-dlq'
+    assert CodecRegistry().decode(value, headers) == {'payload': 'AAE='}
+
+class PausingConsumer:
+    def __init__(self, assigned):
+        self.assigned = set(assigned)
+        self.paused_partitions = set()
+        self.positions = {}
+    
+    def assignment(self):
+        return set(self.assigned)
+    
+    def paused(self):
+        return set(self.paused_partitions)
+    
+    def pause(self, *partitions):
+        self.paused_partitions.update(partitions)
+    
+    def resume(self, *partitions):
+        self.paused_partitions.difference_update(partitions)
+    
+    def seek(self, tp, offset):
+        self.positions[tp] = offset
+
+class RetryMessage:
+    def __init__(self, offset, due):
+        self.offset = offset
+        self.headers = [(RETRY_DUE_HEADER, str(due).encode())]
+
+def make_retry_lane(consumer):
+    lane = ConsumerLane('retry-1', ('social-events-retry-1',), [], [], delayed=True)
+    lane.consumer = consumer
+    return lane
+
+def test_retry_partition_is_held_until_due():
+    consumer = PausingConsumer([RETRY_TP])
+    lane = make_retry_lane(consumer)
+    events = EventConsumer()
+    
+    assert not events._hold_until_due(lane, RETRY_TP, RetryMessage(4, time.time() - 1))
+    assert events._hold_until_due(lane, RETRY_TP, RetryMessage(5, time.time() + 300))
+    assert consumer.paused() == {RETRY_TP}
+    assert consumer.positions == {RETRY_TP: 5}
+    
+    # Not due yet: still held
+    events._release_due(lane)
+    assert consumer.paused() == {RETRY_TP}
+    
+    lane.held[RETRY_TP] = time.time() - 1
+    events._release_due(lane)
+    assert consumer.paused() == set()
+    assert lane.held == {}
+
+def test_due_partition_stays_paused_while_lane_is_saturated():
+    consumer = PausingConsumer([RETRY_TP])
+    lane = make_retry_lane(consumer)
+    consumer.pause(RETRY_TP)
+    lane.held[RETRY_TP] = time.time() - 1
+    
+    EventConsumer()._release_due(lane, resume=False)
+    
+    assert consumer.paused() == {RETRY_TP}
+    assert lane.held == {}
+
+def route_failure(error, attempt=0):
+    producer = RecordingProducer()
+    events = EventConsumer()
+    events.retry_router = make_router(producer)
+    asyncio.run(events._route_failure('social-events', {'id': 1}, attempt, error, 'enrich stage'))
+    return producer.sent[0][0]
+
+def test_only_transient_failures_are_retried():
+    assert route_failure(ConnectionResetError()) == 'social-events-retry-1'
+    assert route_failure(asyncio.TimeoutError()) == 'social-events-retry-1'
+    assert route_failure(KafkaTimeoutError(), attempt=1) == 'social-events-retry-2'
+    for bug in (TypeError('x'), KeyError('x'), AttributeError('x'), InvalidEvent('x')):
+        assert route_failure(bug) == 'social-events-dlq'
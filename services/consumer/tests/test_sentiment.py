@@ -0,0 +1,42 @@
+import asyncio
+from src.consumer import EventConsumer
+from src.pipeline import PipelineEvent
+from src.processors.content_analyzer import ContentAnalyzer
+from src.processors.sentiment import SentimentBackend
+from src.records import SocialEvent
+
+MODEL_SENTIMENT = {'sentiment': 'positive', 'confidence': 0.97, 'scores': {'positive': 0.97}}
+
+class StubBackend(SentimentBackend):
+    """Falls back (None) until ready is set"""
+    
+    def __init__(self):
+        self.ready = False
+    
+    async def score(self, text):
+        return MODEL_SENTIMENT if self.ready else None
+
+def analyze(events, text):
+    raw = {'creatorId': 'c1', 'platform': 'twitter', 'data': {'id': '1', 'text': text}}
+    event = PipelineEvent(raw, record=SocialEvent.from_dict(raw))
+    
+    async def run():
+        await events.enrich_event(event)
+        await events.analyze_event(event)
+    asyncio.run(run())
+    return event.enriched.analysis
+
+def test_keyword_fallback_is_not_cached():
+    backend = StubBackend()
+    events = EventConsumer()
+    events.sentiment_backend = backend
+    events.content_analyzer = ContentAnalyzer(backend)
+    text = 'Loving the new studio setup, best week ever'
+    
+    assert analyze(events, text)['sentiment'] != MODEL_SENTIMENT
+    assert len(events.analysis_cache) == 0
+    
+    # Once the model answers, its result is used and memoized
+    backend.ready = True
+    assert analyze(events, text)['sentiment'] == MODEL_SENTIMENT
+    assert events.analysis_cache.get(text)['sentiment'] == MODEL_SENTIMENT
@@ -0,0 +1,47 @@
+import asyncio
+from src.processors.signal_extractor import SignalExtractor
+from src.records import EnrichedEvent, SocialEvent
+from src.shared_cache import LocalRedis, SharedCache
+
+def make_event(reach: int) -> EnrichedEvent:
+    event = SocialEvent('c1', 'twitter', '2024-01-01T00:00:00', {}, {})
+    return EnrichedEvent(event, metrics={'reach': reach, 'likes': 10}, content='gm')
+
+def test_trend_window_is_merged_once_per_interval():
+    async def run():
+        redis = LocalRedis()
+        replicas = [SharedCache(redis, trend_refresh=60, min_count=1) for _ in range(3)]
+        for replica in replicas:
+            replica.observe_terms(['#ai'])
+            await replica.flush()
+        # Already refreshed this interval: nothing else is merged
+        for replica in replicas:
+            replica.observe_terms(['#ai'])
+            await replica.flush()
+        return replicas
+
+    replicas = asyncio.run(run())
+
+    assert sum(replica.trend_merges for replica in replicas) == 1
+    assert replicas[0].is_trending('#AI')
+
+def test_new_owner_adopts_creator_state():
+    async def run():
+        redis = LocalRedis()
+        first = SignalExtractor(shared_cache=SharedCache(redis))
+        for reach in (1000, 1100, 1200, 1300):
+            first.extract_sync(make_event(reach))
+        await first.shared_cache.flush()
+
+        # The partition moved: another replica sees the creator for the first time
+        second = SignalExtractor(shared_cache=SharedCache(redis))
+        second.extract_sync(make_event(1400))
+        await second.shared_cache.flush()
+        return first, second.extract_sync(make_event(1500)), second
+
+    first, signals, second = asyncio.run(run())
+
+    # The event seen before the shared state arrived is dropped, not written over it
+    assert second.creator_state.get('c1', 'twitter').events == 5
+    assert signals.audience.audience_growth_rate is not None
+    assert second.creator_state.get('c1', 'twitter').ewma_reach > first.creator_state.get('c1', 'twitter').ewma_reach
@@ -0,0 +1,80 @@
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from benchmarks.synthetic import SyntheticEventGenerator
+from src.processors import signal_extractor, trend_detector
+from src.processors.content_analyzer import ContentAnalyzer
+from src.processors.signal_extractor import SignalExtractor
+from src.processors.social_processor import SocialProcessor
+from src.records import SocialEvent
+
+NOW = datetime(2024, 1, 15, 12, 0)
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    # Velocity and trend decay read the clock; pin it so both paths see the same instant
+    monkeypatch.setattr(signal_extractor, 'datetime', FrozenDatetime)
+    monkeypatch.setattr(trend_detector, 'time', SimpleNamespace(time=lambda: NOW.timestamp()))
+
+def synthetic_events(count, seed=7):
+    processor = SocialProcessor()
+    analyzer = ContentAnalyzer()
+    events = []
+    for raw in SyntheticEventGenerator(seed=seed, creators=50, now=NOW).events(count):
+        enriched, parsed = processor.process_sync(SocialEvent.from_dict(raw))
+        enriched.analysis = analyzer.analyze_sync(enriched.content, parsed)
+        events.append((enriched, parsed))
+    return events
+
+def flatten(value, path=''):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f'{path}.{key}')
+    elif isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        for i, item in enumerate(value):
+            yield from flatten(item, f'{path}[{i}]')
+    else:
+        yield path, value
+
+def assert_same_signals(batch, single):
+    assert len(batch) == len(single)
+    for i, (left, right) in enumerate(zip(batch, single)):
+        expected = dict(flatten(right.to_dict()))
+        actual = dict(flatten(left.to_dict()))
+        assert actual.keys() == expected.keys(), i
+        for path, value in expected.items():
+            if isinstance(value, float):
+                assert actual[path] == pytest.approx(value), (i, path)
+            else:
+                assert actual[path] == value, (i, path)
+
+def test_batch_extraction_matches_per_event(frozen_clock):
+    events = synthetic_events(400)
+    
+    # Creator state and trends evolve with the stream, so each path gets its own extractor
+    batch = SignalExtractor().extract_batch(events)
+    extractor = SignalExtractor()
+    single = [extractor.extract_sync(enriched, parsed) for enriched, parsed in events]
+    
+    assert_same_signals(batch, single)
+    assert any(signals.engagement.engagement_velocity > 0 for signals in single)
+
+def test_stored_batch_matches_per_event(frozen_clock):
+    events = synthetic_events(200, seed=11)
+    velocity = [i * 3.5 for i in range(len(events))]
+    alignment = [(i % 5) / 4 for i in range(len(events))]
+    quality = [None if i % 3 else i / len(events) for i in range(len(events))]
+    
+    extractor = SignalExtractor()
+    batch = extractor.extract_stored_batch(events, velocity, alignment, quality)
+    single = [
+        extractor.extract_stored(enriched, parsed, velocity[i], alignment[i], quality[i])
+        for i, (enriched, parsed) in enumerate(events)
+    ]
+    
+    assert_same_signals(batch, single)
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from src.sinks.mongo_sink import MongoBulkWriter
+from src.sinks.postgres_sink import PostgresBulkWriter
+
+class FlakyCollection:
+    """Motor collection stand-in that fails every insert while `down`"""
+    
+    def __init__(self):
+        self.name = 'interactions'
+        self.down = True
+        self.documents = []
+    
+    async def insert_many(self, documents, ordered=True):
+        if self.down:
+            raise OSError('connection refused')
+        self.documents.extend(documents)
+
+def test_buffer_stays_bounded_during_outage():
+    async def run():
+        collection = FlakyCollection()
+        writer = MongoBulkWriter(collection, max_docs=10, max_bytes=1000, retry_attempts=1, retry_max_wait=0)
+        accepted, refused = [], []
+        for i in range(500):
+            try:
+                await writer.add({'n': i}, size=100)
+                accepted.append(i)
+            except OSError:
+                refused.append(i)
+            assert writer.pending <= 40
+            assert writer._buffered_bytes <= 2000
+        
+        collection.down = False
+        await writer.flush()
+        return collection.documents, accepted, refused
+    
+    documents, accepted, refused = asyncio.run(run())
+    assert refused
+    # Items the caller got an error for are never written on its behalf
+    assert sorted(doc['n'] for doc in documents) == accepted
+
+class FlakyPool:
+    """asyncpg pool stand-in: rows marked 'bad' fail every insert they are in,
+    and the inserts listed in `transient` raise a connection error once"""
+    
+    def __init__(self, transient=()):
+        self.rows = []
+        self.transient = set(transient)
+    
+    def acquire(self):
+        return self
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def executemany(self, query, rows):
+        first = rows[0][0]
+        if first in self.transient:
+            self.transient.discard(first)
+            raise OSError('connection reset')
+        if any(row[1] == 'bad' for row in rows):
+            raise ValueError('invalid row')
+        self.rows.extend(rows)
+
+def test_isolation_rebuffers_only_unwritten_rows():
+    rejected = []
+    
+    async def run():
+        # Row 1 is rejected; the second half of the isolation hits a transient error
+        pool = FlakyPool(transient={4})
+        writer = PostgresBulkWriter(
+            pool, 'raw_social_data', ('n', 'state'), max_rows=100,
+            on_failure=lambda row, error: rejected.append(row), retry_attempts=1, retry_max_wait=0
+        )
+        for n in range(8):
+            await writer.add((n, 'bad' if n == 1 else 'ok'))
+        
+        with pytest.raises(OSError):
+            await writer.flush()
+        assert writer.pending == 4 + 1
+        
+        await writer.flush()
+        return pool.rows
+    
+    rows = asyncio.run(run())
+    assert sorted(n for n, _ in rows) == [0, 2, 3, 4, 5, 6, 7]
+    assert rejected == [(1, 'bad')]
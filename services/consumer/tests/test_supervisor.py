@@ -0,0 +1,25 @@
+import asyncio
+import os
+import signal
+from src.consumer import serve
+
+class WaitingConsumer:
+    """Records the SIGINT disposition serve() left, then asks to be stopped"""
+    
+    def __init__(self):
+        self.sigint = None
+    
+    async def start(self):
+        self.sigint = signal.getsignal(signal.SIGINT)
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.Event().wait()
+
+def test_worker_keeps_ignoring_sigint():
+    previous = signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        consumer = WaitingConsumer()
+        asyncio.run(serve(consumer, signals=(signal.SIGTERM,)))
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    
+    assert consumer.sigint is signal.SIG_IGN
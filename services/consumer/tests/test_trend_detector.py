@@ -0,0 +1,40 @@
+import pytest
+from src.processors.trend_detector import TrendDetector
+
+def test_heavy_hitters_survive_a_full_table():
+    detector = TrendDetector(capacity=10, top_n=3, min_count=5, refresh_every=1)
+    for i in range(200):
+        detector.observe(['#AI', f'noise{i}'], now=0)
+        if i % 2:
+            detector.observe(['music'], now=0)
+    
+    assert detector.is_trending('ai', now=0)
+    assert detector.is_trending('#Music', now=0)
+    assert not detector.is_trending('noise199', now=0)
+    assert [term for term, _ in detector.top(2, now=0)] == ['ai', 'music']
+    assert len(detector._counts) == 10
+
+def test_space_saving_never_underestimates():
+    detector = TrendDetector(capacity=4, refresh_every=1)
+    stream = ['a', 'b', 'a', 'c', 'd', 'e', 'a', 'f', 'b', 'a']
+    for term in stream:
+        detector.observe([term], now=0)
+    
+    for term in detector._counts:
+        assert detector.count(term, now=0) >= stream.count(term)
+    assert detector.count('a', now=0) - detector._errors['a'] <= stream.count('a')
+
+def test_counts_decay_by_half_life():
+    detector = TrendDetector(half_life=60, min_count=5, refresh_every=1)
+    detector.observe(['ai'] * 8, now=0)
+    
+    assert detector.count('ai', now=60) == pytest.approx(4)
+    assert detector.is_trending('ai', now=0)
+    assert not detector.is_trending('ai', now=60)
+
+def test_rescaling_keeps_counts():
+    detector = TrendDetector(half_life=1, refresh_every=1)
+    detector.observe(['ai'] * 4, now=0)
+    detector.observe(['ai'], now=50)
+    
+    assert detector.count('ai', now=50) == pytest.approx(1 + 4 * 2.0 ** -50)
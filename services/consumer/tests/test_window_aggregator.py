@@ -0,0 +1,96 @@
+import asyncio
+import json
+import pytest
+from src.consumer import EventConsumer
+from src.processors.window_aggregator import WindowAggregator
+from src.records import AudienceSignals, ContentSignals, EngagementSignals, Scores, Signals, TrendSignals
+
+def make_signals(viral=0.5, engagement=100):
+    return Signals(
+        EngagementSignals(total_engagement=engagement, engagement_rate=2.0),
+        ContentSignals(sentiment='positive'),
+        AudienceSignals(),
+        TrendSignals(['#ai'], [], 1.0, False),
+        Scores(viral, 0.9, 0.4, 0.6),
+        [{'type': 'viral_opportunity', 'priority': 'high', 'action': 'Boost'}]
+    )
+
+def windows(records):
+    return [(r['window_start'][11:19], r['window_end'][11:19], r['events']) for r in records]
+
+def test_tumbling_window_closes_at_its_boundary():
+    aggregator = WindowAggregator(window=60)
+    aggregator.add('c1', 'twitter', make_signals(0.2), now=0)
+    aggregator.add('c1', 'twitter', make_signals(0.8), now=59.999)
+    aggregator.add('c1', 'twitter', make_signals(0.5), now=60)
+    
+    assert aggregator.due(now=59.999) == []
+    records = aggregator.due(now=60)
+    assert windows(records) == [('00:00:00', '00:01:00', 2)]
+    assert records[0]['scores']['viral_potential'] == pytest.approx(0.5)
+    assert records[0]['max_viral_potential'] == 0.8
+    assert records[0]['recommendations'] == [
+        {'type': 'viral_opportunity', 'priority': 'high', 'action': 'Boost', 'count': 2}
+    ]
+    # Already emitted windows don't come out again
+    assert aggregator.due(now=61) == []
+    assert windows(aggregator.due(now=120)) == [('00:01:00', '00:02:00', 1)]
+
+def test_sliding_windows_count_each_bucket_once_per_window():
+    aggregator = WindowAggregator(window=30, slide=10)
+    aggregator.add('c1', 'tiktok', make_signals(), now=5)
+    aggregator.add('c1', 'tiktok', make_signals(), now=25)
+    
+    assert windows(aggregator.due(now=40)) == [
+        ('23:59:40', '00:00:10', 1),
+        ('23:59:50', '00:00:20', 1),
+        ('00:00:00', '00:00:30', 2),
+        ('00:00:10', '00:00:40', 1)
+    ]
+    assert windows(aggregator.due(now=60)) == [('00:00:20', '00:00:50', 1)]
+    assert aggregator.due(now=70) == []
+
+def test_flush_emits_the_open_sliding_window():
+    aggregator = WindowAggregator(window=30, slide=10)
+    aggregator.add('c1', 'youtube', make_signals(), now=5)
+    aggregator.add('c2', 'youtube', make_signals(), now=25)
+    
+    records = aggregator.flush(now=27)
+    assert windows(records) == [
+        ('23:59:40', '00:00:10', 1),
+        ('23:59:50', '00:00:20', 1),
+        ('00:00:00', '00:00:30', 1),
+        ('00:00:00', '00:00:30', 1)
+    ]
+    assert {r['creatorId'] for r in records[2:]} == {'c1', 'c2'}
+    # Nothing is emitted twice after a flush
+    assert aggregator.due(now=100) == []
+    assert aggregator.flush(now=100) == []
+
+def test_window_must_be_a_multiple_of_the_slide():
+    with pytest.raises(ValueError):
+        WindowAggregator(window=60, slide=25)
+
+class RecordingProducer:
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, topic, value, key=None, headers=None):
+        self.sent.append((topic, json.loads(value)))
+    
+    async def stop(self):
+        pass
+
+def test_stop_publishes_open_windows():
+    async def run():
+        consumer = EventConsumer()
+        consumer.window_aggregator = WindowAggregator(window=300, slide=60)
+        consumer.window_aggregator.add('c1', 'instagram', make_signals())
+        consumer.producer = RecordingProducer()
+        consumer.aggregation_task = asyncio.create_task(asyncio.sleep(3600))
+        await consumer.stop()
+        return consumer.producer.sent
+    
+    sent = asyncio.run(run())
+    assert sent and all(topic == 'creator-aggregates' for topic, _ in sent)
+    assert sent[-1][1]['creatorId'] == 'c1' and sent[-1][1]['events'] == 1